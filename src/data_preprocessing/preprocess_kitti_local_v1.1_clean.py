@@ -4,8 +4,10 @@ Convert KITTI tracking labels → YOLO format + triplet list for GhostDet v1.1_c
 
 Inputs:
   - Images: E:/KITTI/tracking/0006/image_02/0006/*.png
-  - Labels: E:/KITTI/tracking/0006/label_02/0006.txt
+            (or read in place from E:/KITTI/data_tracking_image_2.zip — no extraction)
+  - Labels: E:/KITTI/tracking/0006/label_02/0006.txt (or data_tracking_label_2.zip)
   - Per-frame labels: E:/KITTI/_temp_extract/lbl/training/label_02/0006/*.txt
+            (map_labels_to_seq06_v1.1_clean.py; optional — label_02 is split here otherwise)
 
 Outputs:
   - data/kitti_yolo_v1.1_clean/
@@ -15,6 +17,7 @@ Outputs:
     └── kitti_ghostdet_v1.1_clean.yaml
 
 USB-safe: processes 1 frame at a time (low RAM).
+Run from the repo root: python -m src.ghostdet preprocess kitti
 Author: Ken Byrne (Dec 2025)
 """
 
@@ -23,8 +26,10 @@ import cv2
 import numpy as np
 from pathlib import Path
 
+from src.utils.kitti_io import KITTI_ROOT, find_label_file, list_frames, read_image
+
 # ── Paths ───────────────────────────────────────────────────────────────────────
-IMG_SRC = Path("E:/KITTI/tracking/0006/image_02/0006")           # 270 PNGs
+SEQ = "0006"                                                      # 270 PNGs (folder or zip)
 LBL_SRC = Path("E:/KITTI/_temp_extract/lbl/training/label_02/0006")  # From map_labels_to_seq06_v1.1_clean.py
 OUT_ROOT = Path("data/kitti_yolo_v1.1_clean")
 IMG_OUT = OUT_ROOT / "images/val"
@@ -63,12 +68,26 @@ def kitti_to_yolo(line: str) -> str | None:
     except Exception:
         return None
 
+def load_frame_labels(stems: list) -> dict:
+    """Per-frame KITTI label lines (type trunc occ alpha bbox ...): map_labels output, else label_02 (folder / zip)."""
+    if LBL_SRC.is_dir():
+        return {s: (LBL_SRC / f"{s}.txt").read_text().splitlines()
+                for s in stems if (LBL_SRC / f"{s}.txt").exists()}
+    frame_labels = {}
+    for line in find_label_file(SEQ, KITTI_ROOT).read_text().splitlines():
+        parts = line.strip().split()
+        if len(parts) >= 16:
+            frame_labels.setdefault(f"{int(parts[0]):06d}", []).append(" ".join(parts[2:]))
+    return frame_labels
+
 # ── Main Processing ────────────────────────────────────────────────────────────
-print(f" Source images: {IMG_SRC}")
-print(f" Source labels: {LBL_SRC}")
+frames = list_frames(SEQ, KITTI_ROOT)     # extracted folder, else members of the image zip
+print(f" Source images: {frames[0].parent if isinstance(frames[0], Path) else frames[0].zip}")
+print(f" Source labels: {LBL_SRC if LBL_SRC.is_dir() else find_label_file(SEQ, KITTI_ROOT)}")
 
 # Get sorted frame stems (e.g., '000000', '000001', ..., '000269')
-stems = sorted([f.stem for f in IMG_SRC.glob("*.png")])
+stems = [f.stem for f in frames]
+frame_labels = load_frame_labels(stems)
 print(f" Found {len(stems)} frames")
 
 triplets = []
@@ -77,12 +96,8 @@ processed = 0
 for i in range(1, len(stems) - 1):
     t0, t1, t2 = stems[i-1], stems[i], stems[i+1]
 
-    # Process center frame (t1)
-    img_path = IMG_SRC / f"{t1}.png"
-    label_path = LBL_SRC / f"{t1}.txt"
-
-    # Load & resize image
-    img = cv2.imread(str(img_path))
+    # Process center frame (t1): load & resize image
+    img = read_image(frames[i])
     if img is None:
         print(f"⚠️  Skip {t1}: image read failed")
         continue
@@ -92,12 +107,10 @@ for i in range(1, len(stems) - 1):
 
     # Process labels
     yolo_lines = []
-    if label_path.exists():
-        with open(label_path) as f:
-            for line in f:
-                yolo_line = kitti_to_yolo(line)
-                if yolo_line:
-                    yolo_lines.append(yolo_line)
+    for line in frame_labels.get(t1, []):
+        yolo_line = kitti_to_yolo(line)
+        if yolo_line:
+            yolo_lines.append(yolo_line)
 
     out_lbl_path = LBL_OUT / f"0006_{t1}.txt"
     with open(out_lbl_path, 'w') as f:
@@ -3,6 +3,7 @@ import numpy as np
 from ultralytics import YOLO
 import json
 import os
+from src.utils.profiling import StageProfiler
 os.makedirs("figures", exist_ok=True)
 
 # Load BOTH models -critical!
@@ -16,8 +17,11 @@ ghost_centers = []
 
 frame_id = 0
 max_frames = 50
+prof = StageProfiler.from_env("compute_jitter_score")  # GHOSTDET_PROFILE=0 to disable
 while cap.isOpened() and frame_id < max_frames:
-    ret, frame = cap.read()
+    prof.next_frame()
+    with prof.stage("decode"):
+        ret, frame = cap.read()
     if not ret:
         break
     
@@ -26,8 +30,10 @@ while cap.isOpened() and frame_id < max_frames:
     ghost_frame = frame[:, w//2:]   
     
     # Run inference
-    yolo_res = yolo(yolo_frame, verbose=False)[0]
-    ghost_res = ghostdet(ghost_frame, verbose=False)[0]
+    with prof.stage("infer_yolo"):
+        yolo_res = yolo(yolo_frame, verbose=False)[0]
+    with prof.stage("infer_ghost"):
+        ghost_res = ghostdet(ghost_frame, verbose=False)[0]
     
     # Extract car centers (class 0 = car)
     yolo_cars = yolo_res.boxes[yolo_res.boxes.cls == 0]
@@ -46,6 +52,7 @@ while cap.isOpened() and frame_id < max_frames:
     frame_id += 1
 
 cap.release()
+prof.end_frame()
 
 def jitter_score(centers):
     if len(centers) < 2:
@@ -87,6 +94,7 @@ with open("figures/jitter_score.json", "w") as f:
 
 print(f"\nStats: {len(yolo_centers)}/{frame_id} YOLO frames detected cars")
 print(f" Stats: {len(ghost_centers)}/{frame_id} GhostDet frames detected cars")
+prof.report()
 
 # Auto-generate plot after computing scores
 import subprocess
@@ -3,6 +3,7 @@ import cv2
 import numpy as np
 from pathlib import Path
 from ultralytics import YOLO
+from src.utils.profiling import StageProfiler
 
 def main():
     # Load models 
@@ -33,26 +34,37 @@ def main():
 
     # Pre-cache detections
     print("  Caching detections...")
+    prof = StageProfiler.from_env("jitter_showcase")  # GHOSTDET_PROFILE=0 to disable
     yolo_dets = []
     ghost_dets = []
     for i, f in enumerate(frames):
-        img = cv2.imread(str(f))
-        img_r = cv2.resize(img, (640, 192))
-        yolo_dets.append(yolo(img_r, verbose=False)[0])
-        ghost_dets.append(ghostdet(img_r, verbose=False)[0])
+        prof.next_frame()
+        with prof.stage("decode"):
+            img = cv2.imread(str(f))
+        with prof.stage("resize"):
+            img_r = cv2.resize(img, (640, 192))
+        with prof.stage("infer_yolo"):
+            yolo_dets.append(yolo(img_r, verbose=False)[0])
+        with prof.stage("infer_ghost"):
+            ghost_dets.append(ghostdet(img_r, verbose=False)[0])
         if i % 50 == 0:
             print(f"    {i}/{len(frames)}")
+    prof.report()
 
     # Video writer
     height, width = 192, 640
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')
     out = cv2.VideoWriter("logs/jitter_showcase.mp4", fourcc, 10, (width*2, height))
 
+    prof = StageProfiler.from_env("jitter_showcase_render")
+
     # Track centers for jitter score
     yolo_centers = []
     ghost_centers = []
 
     for i, (frame_path, yolo_res, ghost_res) in enumerate(zip(frames, yolo_dets, ghost_dets)):
+        prof.next_frame()
+
         # Get car centers (class 0)
         yolo_cars = yolo_res.boxes[yolo_res.boxes.cls == 0]
         ghost_cars = ghost_res.boxes[ghost_res.boxes.cls == 0]
@@ -76,9 +88,10 @@ def main():
         js_ghost = np.std(np.diff(ghost_centers)) if len(ghost_centers) > 2 else 0.0
 
         # Plot
-        yolo_plot = yolo_res.plot(line_width=2, font_size=0.8)
-        ghost_plot = ghost_res.plot(line_width=2, font_size=0.8)
-        combined = np.hstack([yolo_plot, ghost_plot])
+        with prof.stage("plot"):
+            yolo_plot = yolo_res.plot(line_width=2, font_size=0.8)
+            ghost_plot = ghost_res.plot(line_width=2, font_size=0.8)
+            combined = np.hstack([yolo_plot, ghost_plot])
 
         # Titles
         cv2.putText(combined, "YOLOv8 (Jittery)", (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,0,255), 2)
@@ -101,11 +114,13 @@ def main():
             cv2.putText(combined, "→ SMOOTH EXIT", (20, height-20), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,165,255), 2)
 
-        out.write(combined)
+        with prof.stage("encode"):
+            out.write(combined)
         if i % 30 == 0:
             print(f"  Rendered {i}/{len(frames)}")
 
     out.release()
+    prof.report()
     print(" Saved: logs/jitter_showcase.mp4 (15 sec, side-by-side, bus turn focus)")
 
 if __name__ == "__main__":
@@ -11,6 +11,7 @@ import numpy as np
 from pathlib import Path
 from ultralytics import YOLO
 from src.utils.video_utils import safe_plot, add_video_borders
+from src.utils.profiling import StageProfiler
 
 
 def main():
@@ -37,36 +38,47 @@ def main():
     )
 
     # ── Render Loop ──────────────────────────────────────────
+    prof = StageProfiler.from_env("demo_local_50f")  # GHOSTDET_PROFILE=0 to disable
     for i, frame_path in enumerate(frames):
+        prof.next_frame()
+
         # Load & resize
-        img = cv2.imread(str(frame_path))
-        img_resized = cv2.resize(img, (w, h))
+        with prof.stage("decode"):
+            img = cv2.imread(str(frame_path))
+        with prof.stage("resize"):
+            img_resized = cv2.resize(img, (w, h))
 
         # Inference
-        yolo_res = yolo_model(img_resized, verbose=False)[0]
-        ghost_res = ghost_model(img_resized, verbose=False)[0]
+        with prof.stage("infer_yolo"):
+            yolo_res = yolo_model(img_resized, verbose=False)[0]
+        with prof.stage("infer_ghost"):
+            ghost_res = ghost_model(img_resized, verbose=False)[0]
 
         # Clean plots (bbox + confidence only)
-        yolo_plot = safe_plot(yolo_res)
-        ghost_plot = safe_plot(ghost_res)
+        with prof.stage("plot"):
+            yolo_plot = safe_plot(yolo_res)
+            ghost_plot = safe_plot(ghost_res)
 
         # Status bar: frame count only (jitter requires history — see jitter_showcase_v1.1_clean.py)
         status = f"Frame {i + 1}/{len(frames)}"
 
         # Assemble
-        canvas = add_video_borders(
-            left_frame=yolo_plot,
-            right_frame=ghost_plot,
-            left_title="YOLOv8 (Untuned)",
-            right_title="GhostDet (Fine-tuned)",
-            status_text=status
-        )
-
-        out.write(canvas)
+        with prof.stage("compose"):
+            canvas = add_video_borders(
+                left_frame=yolo_plot,
+                right_frame=ghost_plot,
+                left_title="YOLOv8 (Untuned)",
+                right_title="GhostDet (Fine-tuned)",
+                status_text=status
+            )
+
+        with prof.stage("encode"):
+            out.write(canvas)
         if (i + 1) % 10 == 0:
-            print(f"   Rendered {i + 1}/{len(frames)}")
+            print(f"   Rendered {i + 1}/{len(frames)} ({prof.fps():.1f} FPS)")
 
     out.release()
+    prof.report()
     print(" Saved: logs/ghostdet_clean_v1.1.mp4")
     print(" Tip: Use jitter_showcase_v1.1_clean.py for real-time jitter scores.")
 
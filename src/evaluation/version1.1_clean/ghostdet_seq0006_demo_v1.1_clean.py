@@ -11,6 +11,7 @@ import numpy as np
 from pathlib import Path
 from ultralytics import YOLO
 from src.utils.video_utils import safe_plot, add_video_borders
+from src.utils.profiling import StageProfiler
 import torch
 
 
@@ -40,15 +41,22 @@ def main():
     )
 
     yolo_centers, ghost_centers = [], []
+    prof = StageProfiler.from_env("seq0006_demo_250f")  # GHOSTDET_PROFILE=0 to disable
 
     for i, frame_path in enumerate(frames):
+        prof.next_frame()
+
         # Load & resize
-        img = cv2.imread(str(frame_path))
-        img_resized = cv2.resize(img, (w, h))
+        with prof.stage("decode"):
+            img = cv2.imread(str(frame_path))
+        with prof.stage("resize"):
+            img_resized = cv2.resize(img, (w, h))
 
         # Inference
-        yolo_res = yolo_model(img_resized, verbose=False)[0]
-        ghost_res = ghost_model(img_resized, verbose=False)[0]
+        with prof.stage("infer_yolo"):
+            yolo_res = yolo_model(img_resized, verbose=False)[0]
+        with prof.stage("infer_ghost"):
+            ghost_res = ghost_model(img_resized, verbose=False)[0]
 
         # Track main car (highest-confidence 'car')
         def get_main_car_center(res):
@@ -70,8 +78,9 @@ def main():
         js_ghost = compute_jitter_score(ghost_centers[-20:]) if ghost_centers else 0.0
 
         # Clean plots (class + score, low-conf in red)
-        yolo_plot = safe_plot(yolo_res, highlight_low_conf=True)
-        ghost_plot = safe_plot(ghost_res, highlight_low_conf=True)
+        with prof.stage("plot"):
+            yolo_plot = safe_plot(yolo_res, highlight_low_conf=True)
+            ghost_plot = safe_plot(ghost_res, highlight_low_conf=True)
 
         # Narrative status bar
         status = f"Jitter: {js_yolo:.1f} → {js_ghost:.1f} | Frame {i+1}/{len(frames)}"
@@ -85,19 +94,22 @@ def main():
             status += " | TRACK RECOVERY (GhostDet stable)"
 
         # Assemble
-        canvas = add_video_borders(
-            left_frame=yolo_plot,
-            right_frame=ghost_plot,
-            left_title="YOLOv8 (Untuned)",
-            right_title="GhostDet (Fine-tuned)",
-            status_text=status
-        )
-
-        out.write(canvas)
+        with prof.stage("compose"):
+            canvas = add_video_borders(
+                left_frame=yolo_plot,
+                right_frame=ghost_plot,
+                left_title="YOLOv8 (Untuned)",
+                right_title="GhostDet (Fine-tuned)",
+                status_text=status
+            )
+
+        with prof.stage("encode"):
+            out.write(canvas)
         if (i + 1) % 50 == 0:
-            print(f"   {i + 1}/{len(frames)}")
+            print(f"   {i + 1}/{len(frames)} ({prof.fps():.1f} FPS)")
 
     out.release()
+    prof.report()
     print(" Saved: logs/version1.1/ghostdet_seq0006_250frame__v1.1.mp4")
 
 
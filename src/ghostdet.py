@@ -0,0 +1,146 @@
+# src/ghostdet.py
+"""
+ghostdet — one command for the GhostDet tools: ghostdet <group> <tool> [tool args].
+- Groups: preprocess, eval, render, export, bench (table below; `ghostdet <group>` lists tools).
+- The front-end imports nothing but the standard library; the selected tool module is run
+  as __main__ as if it were `python -m <module>` (or the script path for the versioned
+  files), so ultralytics / torch / cv2 / matplotlib are only loaded by tools that use them.
+  The tool sees sys.argv[0] = "ghostdet <group> <tool>", so its --help / usage lines say so.
+- --importtime re-runs the command under `python -X importtime` and prints the slowest
+  top-level imports, e.g. `ghostdet --importtime eval runs`.
+
+Usage:
+  python -m src.ghostdet eval runs
+  python -m src.ghostdet eval mot --seqs 0006 --tracker infuser
+  python -m src.ghostdet bench startup --runs 5
+  python -m src.ghostdet --importtime preprocess inspect
+"""
+
+import importlib.util
+import re
+import subprocess
+import sys
+import time
+import types
+
+# group → tool → (module or script path, help)
+COMMANDS = {
+    "preprocess": {
+        "kitti": ("src/data_preprocessing/preprocess_kitti_local_v1.1_clean.py",
+                  "KITTI tracking seq → YOLO dataset (data/kitti_yolo_v1.1_clean)"),
+        "map-labels": ("src/data_preprocessing/map_labels_to_seq06_v1.1_clean.py",
+                       "Split label_02/0006.txt into per-frame label files"),
+        "inspect": ("src.utils.checks_balances.inspect_kitti", "Scan the KITTI folder layout"),
+        "zip": ("src.utils.kitti_zip", "Index the KITTI zips (frames read in place, no extraction)"),
+    },
+    "eval": {
+        "runs": ("src.utils.eval.debug_plots", "List training / validation runs and their result files"),
+        "mot": ("src.utils.eval.export_mot", "Track a sequence, write KITTI / MOTChallenge results"),
+        "sweep-infuser": ("src.utils.eval.sweep_infuser", "GhostInfuser parameter sweep (MOTA / jitter)"),
+        "sweep-keyframe": ("src.utils.eval.sweep_keyframe", "Keyframe schedule sweep"),
+        "sweep-cascade": ("src.utils.eval.sweep_cascade", "Cheap → heavy cascade routing sweep"),
+        "metrics": ("src.utils.eval.det_metrics", "mAP / PR / confusion matrix from detection caches"),
+        "plots": ("src.utils.eval.generate_comparison_plots", "PR curves + confusion matrices (from detection caches)"),
+    },
+    "render": {
+        "deep-dive": ("src/evaluation/version1.1_clean/ghostdet_seq0006_demo_deep_dive_v1.1_clean.py",
+                      "Deep-dive demo video (live or from detection caches, chunked)"),
+        "demo": ("src/evaluation/version1.1_clean/ghostdet_seq0006_demo_v1.1_clean.py",
+                 "Side-by-side YOLOv8n vs GhostDet demo video"),
+        "local": ("src/evaluation/version1.1_clean/demo_video_local_v1.1_clean.py",
+                  "Demo video on the local val split"),
+    },
+    "export": {
+        "dets": ("src.utils.det_cache", "Cache per-frame detections (.npz)"),
+        "model": ("src.model.model_cache", "Build the fused TorchScript artifact (no Ultralytics at load)"),
+        "quantize": ("src.model.quantize", "INT8 ONNX export + accuracy check"),
+    },
+    "bench": {
+        "backends": ("src.utils.checks_balances.bench_backends", "Latency / agreement of detector backends"),
+        "imgsz": ("src.utils.checks_balances.bench_imgsz", "Input-size sweep"),
+        "roi": ("src.utils.checks_balances.bench_roi", "ROI band inference"),
+        "tiles": ("src.utils.checks_balances.bench_tiles", "Tiled full-resolution inference: recall vs FPS"),
+        "startup": ("src.utils.checks_balances.bench_startup", "Time to first detection"),
+        "arch": ("src.utils.checks_balances.profile_arch", "Params / FLOPs / latency per architecture"),
+        "layers": ("src.utils.checks_balances.inspect_model", "Per-layer CPU profile"),
+        "infuser": ("src.utils.checks_balances.profile_infuser", "GhostInfuser record / replay profiler"),
+        "batcher": ("src.serving.bench_batcher", "Serving micro-batcher"),
+        "frame-ring": ("src.utils.checks_balances.bench_frame_ring", "Shared-memory ring vs queues between processes"),
+        "tune": ("src.model.cpu_tune", "Auto-tune PyTorch CPU settings for this CPU"),
+    },
+}
+
+
+def usage(group: str = None) -> str:
+    groups = [group] if group else list(COMMANDS)
+    lines = ["usage: ghostdet [--importtime] <group> <tool> [args]", ""]
+    for g in groups:
+        lines.append(f"{g}:")
+        lines += [f"  {tool:<15} {help_}" for tool, (_, help_) in COMMANDS[g].items()]
+    return "\n".join(lines)
+
+
+def run_tool(group: str, tool: str, argv: list):
+    """
+    Run the tool as __main__ with its own argv (argparse sees `ghostdet <group> <tool> ...`).
+    Like runpy with alter_sys=True (the tool module is sys.modules["__main__"] while it runs, so
+    multiprocessing spawn children can re-import it), except that runpy would set sys.argv[0]
+    to the tool's file path.
+    """
+    target, _ = COMMANDS[group][tool]
+    if target.endswith(".py"):
+        spec = importlib.util.spec_from_file_location("__main__", target)
+    else:
+        spec = importlib.util.find_spec(target)
+    main = types.ModuleType("__main__")
+    main.__file__, main.__loader__ = spec.origin, spec.loader
+    if not target.endswith(".py"):
+        main.__spec__, main.__package__ = spec, spec.parent
+    code = spec.loader.get_code(spec.name)
+    sys.argv = [f"ghostdet {group} {tool}", *argv]
+    saved, sys.modules["__main__"] = sys.modules["__main__"], main
+    try:
+        exec(code, main.__dict__)
+    finally:
+        sys.modules["__main__"] = saved
+
+
+def importtime(argv: list, top: int = 12):
+    """Re-run under -X importtime; print wall time and the slowest top-level imports."""
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-X", "importtime", "-m", "src.ghostdet", *argv],
+                         stderr=subprocess.PIPE, text=True)
+    wall = time.perf_counter() - t0
+    rows = []
+    for line in out.stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)", line)
+        if m and not m.group(3):          # top-level imports only (nested ones are included)
+            rows.append((int(m.group(2)) / 1000, m.group(4)))
+    total = sum(ms for ms, _ in rows)
+    print(f"\n ghostdet {' '.join(argv)}: {wall:.2f} s wall, {total:.0f} ms in imports")
+    for ms, name in sorted(rows, reverse=True)[:top]:
+        print(f"   {ms:8.1f} ms  {name}")
+    return out.returncode
+
+
+def main():
+    argv = sys.argv[1:]
+    if argv[:1] == ["--importtime"]:
+        sys.exit(importtime(argv[1:]))
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    group = argv[0]
+    if group not in COMMANDS:
+        sys.exit(f"ghostdet: unknown group {group!r}\n\n{usage()}")
+    if len(argv) < 2 or argv[1] in ("-h", "--help"):
+        print(usage(group))
+        return
+    tool = argv[1]
+    if tool not in COMMANDS[group]:
+        sys.exit(f"ghostdet: unknown tool {group} {tool!r}\n\n{usage(group)}")
+    run_tool(group, tool, argv[2:])
+
+
+if __name__ == "__main__":
+    main()
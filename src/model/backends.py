@@ -0,0 +1,370 @@
+# src/model/backends.py
+"""
+Pluggable CPU detector backends for GhostDet.
+- One interface: backend.predict(images) → per-image [N, 6] arrays [x1, y1, x2, y2, conf, cls]
+  (original image pixels) — exactly what GhostInfuser.update() consumes.
+- 'torch':    Ultralytics YOLO (PyTorch eager) — reference path.
+- 'onnx':     ONNX Runtime (CPUExecutionProvider) on an exported best.onnx.
+- 'openvino': OpenVINO (CPU) on an exported best_openvino_model/.
+- 'torch_cpu': PyTorch network with the tuned CPU profile for this machine
+  (configs/cpu/<sku>.yaml, written by src.model.cpu_tune: threads, fusion, channels_last,
+  TorchScript / torch.compile, bf16); PyTorch defaults when the CPU was never tuned.
+- 'torchscript': cached fused + frozen TorchScript artifact keyed by the weights hash
+  (src/model/model_cache.py) — no Ultralytics import, warm-up in the background after the first frame.
+- ONNX/OpenVINO/torch_cpu/torchscript share a NumPy pipeline: batched letterbox → raw YOLOv8 head
+  [B, 4 + nc, A] → vectorized decode (confidence filter, xywh → xyxy) → class-aware NMS
+  on a precomputed IoU matrix → rescale to the original image.
+- Default input is the native-aspect KITTI_IMGSZ (192×640, no square letterbox).
+- Exports are created on first use next to the weights (Ultralytics exporter) and reused;
+  the file name carries the input shape (best_192x640.onnx), one export per shape. Exports
+  are fixed-shape [1, 3, H, W] (dynamic=False: anchors / strides are graph constants), so
+  ONNX / OpenVINO run a multi-frame predict() (micro-batcher, tiles, predict_paths) one
+  frame at a time; letterbox, decode and NMS stay batched.
+- onnxruntime / openvino are optional (pip install onnxruntime openvino); imported on load.
+- agreement(): detection count delta + mean IoU of matched boxes vs a reference backend
+  (bench_backends, bench_imgsz, cpu_tune).
+
+Usage:
+  backend = load_backend("onnx", "runs/detect/ghostdet_local2/weights/best.pt")
+  dets = backend.predict([img])[0]
+  tracks = infuser.update(dets)
+"""
+
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from src.model.ghost_infuser import greedy_match, results_to_dets
+from src.utils.eval.mot_metrics import box_iou
+from src.utils.kitti_io import KITTI_IMGSZ, ZipMember, read_images, stride_align
+
+WEIGHTS = "runs/detect/ghostdet_local2/weights/best.pt"
+PAD_VALUE = 114      # Ultralytics letterbox fill
+MAX_WH = 7680.0      # class offset for class-aware NMS (as in Ultralytics)
+
+
+# ── NumPy pre/post-processing ────────────────────────────────
+def letterbox_batch(
+    images: Sequence[np.ndarray], shape: Tuple[int, int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resize + center-pad BGR images into one [B, 3, H, W] float32 RGB batch (0–1).
+
+    Returns:
+        batch, params: [B, 3] → [gain, pad_x, pad_y] to map boxes back
+    """
+    h, w = shape
+    batch = np.full((len(images), h, w, 3), PAD_VALUE, dtype=np.uint8)
+    params = np.empty((len(images), 3))
+    for k, img in enumerate(images):
+        h0, w0 = img.shape[:2]
+        r = min(h / h0, w / w0)
+        nw, nh = int(round(w0 * r)), int(round(h0 * r))
+        left = int(round((w - nw) / 2 - 0.1))
+        top = int(round((h - nh) / 2 - 0.1))
+        resized = img if (nw, nh) == (w0, h0) else cv2.resize(img, (nw, nh), interpolation=cv2.INTER_LINEAR)
+        batch[k, top:top + nh, left:left + nw] = resized
+        params[k] = (r, left, top)
+    # BGR HWC uint8 → RGB CHW float32 in one pass over the batch
+    return np.ascontiguousarray(batch[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32) / 255.0, params
+
+
+def box_iou_matrix(boxes: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of [K, 4] xyxy boxes → [K, K]."""
+    x1 = np.maximum(boxes[:, None, 0], boxes[None, :, 0])
+    y1 = np.maximum(boxes[:, None, 1], boxes[None, :, 1])
+    x2 = np.minimum(boxes[:, None, 2], boxes[None, :, 2])
+    y2 = np.minimum(boxes[:, None, 3], boxes[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    union = area[:, None] + area[None, :] - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_thresh: float = 0.7, max_det: int = 300) -> np.ndarray:
+    """
+    Greedy NMS; the IoU matrix is computed once, each step suppresses with one vector op.
+    Returns kept indices (descending score).
+    """
+    order = np.argsort(-scores, kind="stable")
+    iou = box_iou_matrix(boxes[order])
+    suppressed = np.zeros(len(order), dtype=bool)
+    keep = []
+    for i in range(len(order)):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        if len(keep) >= max_det:
+            break
+        suppressed |= iou[i] > iou_thresh
+    return order[keep]
+
+
+def decode_yolo(
+    raw: np.ndarray,
+    params: np.ndarray,
+    orig_shapes: Sequence[Tuple[int, int]],
+    conf: float = 0.25,
+    iou: float = 0.7,
+    classes: Optional[Sequence[int]] = None,
+    max_det: int = 300,
+    max_nms: int = 30000
+) -> List[np.ndarray]:
+    """
+    Decode a raw YOLOv8 head [B, 4 + nc, A] → per-image [N, 6] in original pixels.
+    Confidence filtering and box conversion are vectorized over the whole batch.
+    """
+    pred = raw.transpose(0, 2, 1)                      # [B, A, 4 + nc]
+    cls_scores = pred[..., 4:]
+    cls_ids = cls_scores.argmax(-1)                    # [B, A]
+    scores = np.take_along_axis(cls_scores, cls_ids[..., None], -1)[..., 0]
+    mask = scores > conf
+    if classes is not None:
+        mask &= np.isin(cls_ids, classes)
+
+    xywh = pred[..., :4]
+    xyxy = np.concatenate([xywh[..., :2] - xywh[..., 2:] / 2, xywh[..., :2] + xywh[..., 2:] / 2], axis=-1)
+
+    out = []
+    for b in range(len(pred)):
+        idx = np.flatnonzero(mask[b])
+        if len(idx) > max_nms:
+            idx = idx[np.argsort(-scores[b, idx])[:max_nms]]
+        boxes, s, c = xyxy[b, idx], scores[b, idx], cls_ids[b, idx]
+        keep = nms(boxes + c[:, None] * MAX_WH, s, iou, max_det) if len(idx) else idx
+        gain, pad_x, pad_y = params[b]
+        h0, w0 = orig_shapes[b]
+        boxes = (boxes[keep] - [pad_x, pad_y, pad_x, pad_y]) / gain
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w0)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h0)
+        out.append(np.column_stack([boxes, s[keep], c[keep]]).astype(np.float64).reshape(-1, 6))
+    return out
+
+
+# ── Backends ─────────────────────────────────────────────────
+class DetectorBackend:
+    """Common interface: predict(list of BGR images) → list of [N, 6] detections."""
+
+    name = "base"
+
+    def __init__(
+        self,
+        weights: str = WEIGHTS,
+        imgsz: Tuple[int, int] = KITTI_IMGSZ,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        classes: Optional[Sequence[int]] = None
+    ):
+        self.weights = Path(weights)
+        self.imgsz = stride_align(imgsz)    # (h, w)
+        self.conf = conf
+        self.iou = iou
+        self.classes = classes
+        t0 = time.perf_counter()
+        self._load()
+        self.load_s = time.perf_counter() - t0
+
+    def _load(self):
+        raise NotImplementedError
+
+    def predict(self, images: Sequence[np.ndarray]) -> List[np.ndarray]:
+        raise NotImplementedError
+
+    def __call__(self, images: Sequence[np.ndarray]) -> List[np.ndarray]:
+        return self.predict(images)
+
+
+class UltralyticsBackend(DetectorBackend):
+    """PyTorch eager reference (Ultralytics YOLO)."""
+
+    name = "torch"
+
+    def _load(self):
+        from ultralytics import YOLO
+        self.model = YOLO(str(self.weights))
+
+    def predict(self, images: Sequence[np.ndarray]) -> List[np.ndarray]:
+        results = self.model.predict(
+            list(images), imgsz=list(self.imgsz), conf=self.conf, iou=self.iou,
+            classes=self.classes, device="cpu", verbose=False
+        )
+        return [results_to_dets(r) for r in results]
+
+
+class _ExportedBackend(DetectorBackend):
+    """Exported model + NumPy letterbox/decode/NMS; subclasses provide _load() and _run()."""
+
+    export_format = ""
+    run_batch: Optional[int] = 1    # frames per _run() call (None = whole batch; exports are batch 1)
+
+    def _export(self) -> Path:
+        """Path of the exported model; exported with Ultralytics on first use."""
+        if self.weights.suffix != ".pt":
+            return self.weights
+        target = self._export_path()
+        if not target.exists():
+            from ultralytics import YOLO
+            print(f" Exporting {self.weights} → {self.export_format} (imgsz={self.imgsz})")
+            exported = YOLO(str(self.weights)).export(format=self.export_format, imgsz=list(self.imgsz),
+                                                      dynamic=False, batch=1)
+            Path(exported).rename(target)
+        return target
+
+    def _export_path(self) -> Path:
+        raise NotImplementedError
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def predict(self, images: Sequence[np.ndarray]) -> List[np.ndarray]:
+        if not len(images):
+            return []
+        batch, params = letterbox_batch(images, self.imgsz)
+        step = self.run_batch or len(batch)
+        raw = np.concatenate([self._run(batch[i:i + step]) for i in range(0, len(batch), step)])
+        return decode_yolo(raw, params, [img.shape[:2] for img in images],
+                           conf=self.conf, iou=self.iou, classes=self.classes)
+
+
+class OnnxRuntimeBackend(_ExportedBackend):
+    """ONNX Runtime, CPUExecutionProvider."""
+
+    name = "onnx"
+    export_format = "onnx"
+
+    def __init__(self, *args, threads: int = 0, **kwargs):
+        self.threads = threads
+        super().__init__(*args, **kwargs)
+
+    def _export_path(self) -> Path:
+        h, w = self.imgsz
+        return self.weights.with_name(f"{self.weights.stem}_{h}x{w}.onnx")
+
+    def _load(self):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads:
+            opts.intra_op_num_threads = self.threads
+        self.path = self._export()
+        self.session = ort.InferenceSession(str(self.path), opts, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVINOBackend(_ExportedBackend):
+    """OpenVINO runtime on CPU (latency hint)."""
+
+    name = "openvino"
+    export_format = "openvino"
+
+    def _export_path(self) -> Path:
+        h, w = self.imgsz
+        return self.weights.parent / f"{self.weights.stem}_{h}x{w}_openvino_model"
+
+    def _load(self):
+        import openvino as ov
+
+        self.path = self._export()
+        xml = next(Path(self.path).glob("*.xml")) if Path(self.path).is_dir() else Path(self.path)
+        core = ov.Core()
+        self.compiled = core.compile_model(core.read_model(xml), "CPU", {"PERFORMANCE_HINT": "LATENCY"})
+        self.output = self.compiled.output(0)
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.compiled(batch)[self.output]
+
+
+class TorchCpuBackend(_ExportedBackend):
+    """PyTorch network (no Ultralytics predictor) with the auto-tuned CPU profile."""
+
+    name = "torch_cpu"
+    run_batch = None
+
+    def __init__(self, *args, profile: Optional[dict] = None, **kwargs):
+        self.profile = profile
+        super().__init__(*args, **kwargs)
+
+    def _load(self):
+        import torch
+        from ultralytics import YOLO
+        from src.model.cpu_tune import apply_threads, load_profile, prepare_model
+
+        self.profile = self.profile or load_profile()
+        apply_threads(self.profile)
+        self.torch = torch
+        self.run = prepare_model(YOLO(str(self.weights)).model, self.profile, self.imgsz)
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.run(self.torch.from_numpy(batch)).numpy()
+
+
+class TorchScriptBackend(_ExportedBackend):
+    """Cached fused/frozen TorchScript artifact (model_cache), warmed up after the first frame."""
+
+    name = "torchscript"
+    run_batch = None
+
+    def _load(self):
+        from src.model.model_cache import load_cached_model
+
+        self.model = load_cached_model(str(self.weights), self.imgsz)
+        self.path = self.model.path
+        self.names = self.model.names
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.model(batch)
+
+
+BACKENDS = {
+    UltralyticsBackend.name: UltralyticsBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+    OpenVINOBackend.name: OpenVINOBackend,
+    TorchCpuBackend.name: TorchCpuBackend,
+    TorchScriptBackend.name: TorchScriptBackend,
+}
+
+
+def load_backend(name: str = "torch", weights: str = WEIGHTS, **kwargs) -> DetectorBackend:
+    """Instantiate a backend by name ('torch', 'onnx', 'openvino', 'torch_cpu', 'torchscript')."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r} (choose from {sorted(BACKENDS)})")
+    return BACKENDS[name](weights, **kwargs)
+
+
+def agreement(ref: list, dets: list, iou_thresh: float = 0.5) -> dict:
+    """Compare per-frame detections against the reference backend."""
+    count_delta, ious = 0, []
+    for a, b in zip(ref, dets):
+        count_delta += abs(len(a) - len(b))
+        if len(a) and len(b):
+            iou = box_iou(a[:, :4], b[:, :4])
+            pi, ci, _ = greedy_match(iou, iou_thresh)
+            ious.extend(iou[pi, ci].tolist())
+    return {"count_delta": count_delta, "mean_iou": float(np.mean(ious)) if ious else 0.0}
+
+
+def predict_paths(backend: DetectorBackend, paths: Sequence[Path], batch: int = 8):
+    """Stream per-frame detections for image files / zip members, `batch` frames per backend call."""
+    for i in range(0, len(paths), batch):
+        images = read_images(paths[i:i + batch])
+        yield from backend.predict(images)
+
+
+def ultralytics_stream(model, paths: Sequence, batch: int = 8, imgsz: tuple = KITTI_IMGSZ):
+    """
+    YOLO.predict Results per frame. Files are streamed by Ultralytics; zip members (which it
+    cannot open) are decoded here, `batch` frames per predict call.
+    """
+    kwargs = dict(batch=batch, imgsz=list(imgsz), verbose=False)
+    if not any(isinstance(p, ZipMember) for p in paths):
+        yield from model.predict([str(p) for p in paths], stream=True, **kwargs)
+        return
+    for i in range(0, len(paths), batch):
+        yield from model.predict(read_images(paths[i:i + batch]), **kwargs)
@@ -0,0 +1,136 @@
+# src/model/cascade.py
+"""
+Two-stage detector cascade for GhostDet: a cheap model (stock yolov8n.pt, a Ghost variant or
+the same weights at a reduced input size) runs on every frame; the frame is re-run through
+the heavy model (fine-tuned best.pt) only when the cheap result looks unreliable:
+- conf:     a cheap detection is below min_conf (uncertain object),
+- occluded: GhostInfuser would match a track with IoU below its occlusion threshold,
+- lost:     more than max_lost tracks detected on the previous frame find no cheap detection,
+- refresh:  `refresh` frames since the last heavy pass (objects the cheap model never
+            sees would otherwise never be tracked; the first frame is always a refresh).
+The routing check uses GhostInfuser.preview() (no state change); the tracker is then updated
+once with whichever detection set was kept.
+Models with different label sets (COCO yolov8n vs kitti_ghostdet) are aligned with
+class_map() / remap_classes() before routing.
+
+Usage:
+  cheap = load_backend("onnx", "yolov8n.pt", classes=list(class_map(coco_names, names)))
+  casc = CascadeDetector(lambda img: remap_classes(cheap.predict([img])[0], mapping),
+                         lambda img: heavy.predict([img])[0], min_conf=0.5)
+  for img in frames:
+      tracks = casc.step(img)                   # [N, 7] → [x1, y1, x2, y2, conf, cls, track_id]
+  print(casc.escalation_share, casc.reasons)
+"""
+
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.model.ghost_infuser import GhostInfuser
+
+ROUTES = ("refresh", "conf", "occluded", "lost")
+
+# COCO name → kitti_ghostdet name where they differ
+NAME_ALIASES = {"person": "pedestrian", "bicycle": "cyclist"}
+
+
+def class_map(src_names: dict, dst_names: dict, aliases: dict = NAME_ALIASES) -> Dict[int, int]:
+    """{src class id: dst class id} for classes whose (aliased) names exist in both label sets."""
+    dst = {v: k for k, v in dst_names.items()}
+    return {int(k): int(dst[aliases.get(v, v)]) for k, v in src_names.items() if aliases.get(v, v) in dst}
+
+
+def remap_classes(dets: np.ndarray, mapping: Dict[int, int]) -> np.ndarray:
+    """Rewrite the class column through `mapping`; detections of unmapped classes are dropped."""
+    if not len(dets):
+        return dets.reshape(-1, 6)
+    lut = np.full(int(max(dets[:, 5].max(), max(mapping, default=0))) + 1, -1.0)
+    lut[list(mapping)] = list(mapping.values())
+    cls = lut[dets[:, 5].astype(np.int64)]
+    keep = cls >= 0
+    out = dets[keep].copy()
+    out[:, 5] = cls[keep]
+    return out
+
+
+class CascadeDetector:
+    """Cheap detector every frame; heavy detector on frames the cheap result cannot be trusted."""
+
+    def __init__(
+        self,
+        cheap: Callable[..., np.ndarray],
+        heavy: Callable[..., np.ndarray],
+        infuser: Optional[GhostInfuser] = None,
+        min_conf: float = 0.5,
+        on_occluded: bool = True,
+        on_lost: bool = True,
+        max_lost: int = 0,
+        refresh: int = 10
+    ):
+        """
+        Args:
+            cheap: frame → [N, 6] detections [x1, y1, x2, y2, conf, cls] (every frame).
+            heavy: frame → [N, 6] detections, same label set (escalated frames only).
+            infuser: Tracker to drive (default: GhostInfuser()).
+            min_conf: Escalate if any cheap detection is below this confidence (0 disables).
+            on_occluded: Escalate if a track would only match with an occlusion-level IoU.
+            on_lost: Escalate if more than max_lost tracks detected on the last frame have no
+                     cheap detection (single misses can be left to the tracker's holdover).
+            refresh: Escalate at least every `refresh` frames (0 = only on the triggers above).
+        """
+        self.cheap = cheap
+        self.heavy = heavy
+        self.infuser = infuser if infuser is not None else GhostInfuser()
+        self.min_conf = min_conf
+        self.on_occluded = on_occluded
+        self.on_lost = on_lost
+        self.max_lost = max_lost
+        self.refresh = refresh
+
+        self.frames = 0
+        self.escalations = 0
+        self.reasons: Dict[str, int] = dict.fromkeys(ROUTES, 0)
+        self.routes: List[Optional[str]] = []     # per frame: escalation reason or None
+        self._since_heavy = refresh               # first frame → refresh
+
+    def _route(self, dets: np.ndarray) -> Optional[str]:
+        """Reason to escalate the current frame (None = keep the cheap detections)."""
+        if self.refresh and self._since_heavy >= self.refresh:
+            return "refresh"
+        if self.min_conf and len(dets) and dets[:, 4].min() < self.min_conf:
+            return "conf"
+        if self.on_occluded or self.on_lost:
+            outcome = self.infuser.preview(dets)
+            if self.on_occluded and outcome["occluded"]:
+                return "occluded"
+            if self.on_lost and outcome["lost"] > self.max_lost:
+                return "lost"
+        return None
+
+    def step(self, frame) -> np.ndarray:
+        """
+        Process one frame.
+
+        Returns:
+            np.ndarray: [N, 7] → [x1, y1, x2, y2, conf, cls, track_id]
+        """
+        self.frames += 1
+        dets = self.cheap(frame)
+        reason = self._route(dets)
+        self._since_heavy += 1
+        if reason is not None:
+            dets = self.heavy(frame)
+            self.escalations += 1
+            self.reasons[reason] += 1
+            self._since_heavy = 0
+        self.routes.append(reason)
+        return self.infuser.update(dets)
+
+    @property
+    def escalation_share(self) -> float:
+        """Fraction of frames re-run through the heavy detector so far."""
+        return self.escalations / max(self.frames, 1)
+
+    def expected_ms(self, cheap_ms: float, heavy_ms: float) -> float:
+        """Mean detector time per frame for the observed routing (cheap always + heavy on escalation)."""
+        return cheap_ms + self.escalation_share * heavy_ms
@@ -0,0 +1,310 @@
+# src/model/cpu_tune.py
+"""
+CPU inference auto-tuner for the PyTorch GhostDet network.
+- Knobs: intra-op threads (torch.set_num_threads), inter-op threads, conv-BN fusion,
+  channels_last, inference_mode vs no_grad, graph mode (eager / TorchScript trace+freeze /
+  torch.compile) and bf16 autocast (only offered when oneDNN reports bf16 support).
+- Coordinate search from PyTorch defaults: one knob at a time, keep the fastest value.
+  Every candidate runs in a fresh process (inter-op threads can only be set once per
+  process, compiled graphs must not leak between candidates).
+- Candidates are timed on letterboxed seq-0006 frames (p50 ms/frame after warm-up);
+  a candidate whose decoded detections drift from the eager FP32 reference (mean IoU /
+  count) is rejected, so bf16 is only kept when it does not change the output.
+- The winner is written per CPU SKU to configs/cpu/<sku>.yaml; the 'torch_cpu' backend
+  (src/model/backends.py) loads the profile for the current SKU at startup.
+
+Usage:
+  python -m src.model.cpu_tune --frames 32
+  python -m src.model.cpu_tune --images data/kitti_yolo_v1.1_clean/images/val --batch 8
+"""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import platform
+import re
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import torch
+import yaml
+
+from src.utils.kitti_io import KITTI_IMGSZ, KITTI_ROOT, list_frames, read_images
+
+PROFILE_DIR = Path("configs/cpu")
+WEIGHTS = "runs/detect/ghostdet_local2/weights/best.pt"
+GRAPH_MODES = ("eager", "torchscript", "compile")
+
+# PyTorch defaults (0 = leave torch's thread choice alone)
+DEFAULT_PROFILE = {
+    "threads": 0,
+    "interop_threads": 0,
+    "fuse": False,
+    "channels_last": False,
+    "inference_mode": False,
+    "graph": "eager",
+    "bf16": False,
+}
+
+
+# ── Profiles ─────────────────────────────────────────────────
+def cpu_sku() -> str:
+    """File-name-safe CPU model identifier + logical core count (e.g. intel_core_i5_8250u_8t)."""
+    name = ""
+    cpuinfo = Path("/proc/cpuinfo")
+    if cpuinfo.exists():
+        m = re.search(r"model name\s*:\s*(.+)", cpuinfo.read_text())
+        name = m.group(1) if m else ""
+    name = name or platform.processor() or platform.machine() or "cpu"
+    slug = re.sub(r"\(r\)|\(tm\)|cpu|processor|@.*$", "", name.lower())
+    slug = re.sub(r"[^a-z0-9]+", "_", slug).strip("_")
+    return f"{slug}_{os.cpu_count()}t"
+
+
+def profile_path(sku: Optional[str] = None) -> Path:
+    return PROFILE_DIR / f"{sku or cpu_sku()}.yaml"
+
+
+def load_profile(path: Optional[Path] = None) -> dict:
+    """Tuned profile for this CPU (configs/cpu/<sku>.yaml); PyTorch defaults if there is none."""
+    path = Path(path) if path else profile_path()
+    profile = dict(DEFAULT_PROFILE)
+    if path.exists():
+        profile.update(yaml.safe_load(path.read_text()).get("profile", {}))
+    return profile
+
+
+def save_profile(profile: dict, path: Path, **meta) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump({**meta, "profile": profile}, sort_keys=False))
+    return path
+
+
+def bf16_supported() -> bool:
+    """oneDNN bf16 kernels available on this CPU (AVX512-BF16 / AMX / ...)."""
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
+
+# ── Applying a profile ───────────────────────────────────────
+def apply_threads(profile: dict):
+    """Process-wide thread settings; call before the first inference."""
+    if profile["threads"]:
+        torch.set_num_threads(profile["threads"])
+    if profile["interop_threads"] and torch.get_num_interop_threads() != profile["interop_threads"]:
+        try:
+            torch.set_num_interop_threads(profile["interop_threads"])
+        except RuntimeError:
+            print(f" ⚠️ inter-op threads already fixed at {torch.get_num_interop_threads()} (set before any inference)")
+
+
+def prepare_model(net: torch.nn.Module, profile: dict, imgsz: tuple = KITTI_IMGSZ) -> Callable:
+    """
+    Apply the graph-level knobs to a YOLOv8 DetectionModel.
+
+    Returns:
+        run(x [B, 3, H, W] float32) → raw head output [B, 4 + nc, A] float32
+    """
+    net = net.float().eval()
+    if profile["fuse"] and hasattr(net, "fuse"):
+        net = net.fuse(verbose=False)
+    memory_format = torch.channels_last if profile["channels_last"] else torch.contiguous_format
+    net = net.to(memory_format=memory_format)
+
+    def context():
+        grad = torch.inference_mode() if profile["inference_mode"] else torch.no_grad()
+        stack = contextlib.ExitStack()
+        stack.enter_context(grad)
+        if profile["bf16"]:
+            stack.enter_context(torch.autocast("cpu", dtype=torch.bfloat16))
+        return stack
+
+    if profile["graph"] == "torchscript":
+        example = torch.zeros(1, 3, *imgsz).contiguous(memory_format=memory_format)
+        with torch.no_grad(), contextlib.ExitStack() as stack, warnings.catch_warnings():
+            warnings.simplefilter("ignore")   # tracer / deprecation warnings (shapes are fixed at KITTI_IMGSZ)
+            if profile["bf16"]:
+                stack.enter_context(torch.autocast("cpu", dtype=torch.bfloat16))
+            net = torch.jit.freeze(torch.jit.trace(net, example, strict=False, check_trace=False))
+    elif profile["graph"] == "compile":
+        net = torch.compile(net)
+
+    def run(x: torch.Tensor) -> torch.Tensor:
+        with context():
+            out = net(x.contiguous(memory_format=memory_format))
+            out = out[0] if isinstance(out, (tuple, list)) else out
+            return out.float()
+
+    return run
+
+
+# ── Tuning ───────────────────────────────────────────────────
+def search_space(bf16: bool) -> dict:
+    """Candidate values per knob, in search order."""
+    logical = os.cpu_count() or 1
+    try:
+        import psutil
+        physical = psutil.cpu_count(logical=False) or logical
+    except ImportError:
+        physical = logical
+    threads = sorted({t for t in (1, 2, 4, physical, logical) if t <= logical})
+    return {
+        "threads": threads,
+        "interop_threads": sorted({1, 2, min(4, logical)}),
+        "fuse": [False, True],
+        "channels_last": [False, True],
+        "inference_mode": [False, True],
+        "graph": list(GRAPH_MODES),
+        "bf16": [False, True] if bf16 else [False],
+    }
+
+
+def _bench_candidate(job: dict) -> dict:
+    """Fresh-process worker: apply the profile, load the model, time forwards on the batch file."""
+    from ultralytics import YOLO
+
+    profile = job["profile"]
+    try:
+        apply_threads(profile)
+        batch = torch.from_numpy(np.load(job["batch_path"]))
+        run = prepare_model(YOLO(job["weights"]).model, profile, tuple(batch.shape[2:]))
+        b = job["batch"]
+        chunks = [batch[i:i + b] for i in range(0, len(batch) - b + 1, b)] or [batch]
+
+        t0 = time.perf_counter()
+        raw = [run(chunks[0]).numpy()]        # first call: trace / compile / allocator warm-up
+        first_ms = (time.perf_counter() - t0) * 1000
+        raw += [run(c).numpy() for c in chunks[1:]]
+        for c in chunks[:job["warmup"]]:
+            run(c)
+        times = []
+        for _ in range(job["repeats"]):
+            for c in chunks:
+                t0 = time.perf_counter()
+                run(c)
+                times.append((time.perf_counter() - t0) * 1000 / len(c))
+        return {"ms_p50": float(np.median(times)), "ms_p95": float(np.percentile(times, 95)),
+                "first_ms": first_ms, "raw": np.concatenate(raw)}
+    except Exception as e:   # e.g. torch.compile without a C++ toolchain
+        return {"error": f"{type(e).__name__}: {e}".splitlines()[0][:200]}
+
+
+def run_candidate(job: dict) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx, max_tasks_per_child=1) as pool:
+        return pool.submit(_bench_candidate, job).result()
+
+
+def tune(
+    weights: str,
+    batch: np.ndarray,
+    params: np.ndarray,
+    orig_shapes: list,
+    batch_size: int = 1,
+    repeats: int = 3,
+    warmup: int = 2,
+    min_iou: float = 0.95,
+    tmp_dir: Path = PROFILE_DIR
+) -> tuple:
+    """Coordinate search over search_space(); returns (best profile, trial rows)."""
+    from src.model.backends import agreement, decode_yolo
+
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    batch_path = tmp_dir / f".tune_batch_{os.getpid()}.npy"
+    np.save(batch_path, batch)
+    job = dict(weights=str(weights), batch_path=str(batch_path), batch=batch_size, repeats=repeats, warmup=warmup)
+
+    trials, seen, ref_dets = [], {}, []
+
+    def evaluate(profile: dict) -> dict:
+        key = tuple(sorted(profile.items()))
+        if key in seen:
+            return seen[key]
+        res = run_candidate(dict(job, profile=profile))
+        row = {**profile, **{k: res.get(k) for k in ("ms_p50", "ms_p95", "first_ms", "error")}}
+        if "raw" in res:
+            n = len(res["raw"])
+            dets = decode_yolo(res["raw"], params[:n], orig_shapes[:n])
+            if not ref_dets:
+                ref_dets.extend(dets)            # first candidate = eager FP32 reference
+            row.update(agreement(ref_dets, dets))
+            n_ref = sum(len(d) for d in ref_dets)
+            row["ok"] = row["count_delta"] <= max(1, 0.05 * n_ref) and (row["mean_iou"] >= min_iou or n_ref == 0)
+        else:
+            row.update(count_delta=None, mean_iou=None, ok=False)
+        state = "✓" if row["ok"] else "✗"
+        speed = f"{row['ms_p50']:7.2f} ms/frame" if row["ms_p50"] is not None else row["error"]
+        print(f"   {state} {speed} | " + " ".join(f"{k}={v}" for k, v in profile.items()))
+        trials.append(row)
+        seen[key] = row
+        return row
+
+    try:
+        best = dict(DEFAULT_PROFILE)
+        ref = evaluate(best)
+        if ref.get("error"):
+            raise RuntimeError(f"Reference (PyTorch defaults) failed: {ref['error']}")
+        best_ms = ref["ms_p50"]
+        for knob, values in search_space(bf16_supported()).items():
+            for value in values:
+                cand = dict(best, **{knob: value})
+                row = evaluate(cand)
+                if row["ok"] and row["ms_p50"] < best_ms:
+                    best, best_ms = cand, row["ms_p50"]
+    finally:
+        batch_path.unlink(missing_ok=True)
+    return best, trials
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auto-tune PyTorch CPU inference settings for this CPU SKU.")
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--seq", default="0006")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--images", type=Path, default=None, help="Image folder instead of the KITTI sequence")
+    parser.add_argument("--frames", type=int, default=16, help="Frames sampled evenly from the sequence")
+    parser.add_argument("--imgsz", nargs=2, type=int, default=list(KITTI_IMGSZ), metavar=("H", "W"))
+    parser.add_argument("--batch", type=int, default=1, help="Batch size to tune for (1 = latency)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-iou", type=float, default=0.95, help="Reject candidates drifting from eager FP32")
+    parser.add_argument("--sku", default=None, help="Profile name (default: detected CPU model)")
+    args = parser.parse_args()
+
+    from src.model.backends import letterbox_batch
+
+    paths = sorted(args.images.glob("*.[jp][pn]g")) if args.images else list_frames(args.seq, args.root)
+    paths = [paths[i] for i in np.linspace(0, len(paths) - 1, min(args.frames, len(paths))).astype(int)]
+    images = read_images(paths)
+    batch, params = letterbox_batch(images, tuple(args.imgsz))
+    sku = args.sku or cpu_sku()
+    print(f" Tuning on {sku}: {len(images)} frames, imgsz={tuple(args.imgsz)}, batch={args.batch}, "
+          f"bf16={'yes' if bf16_supported() else 'no'}")
+
+    t0 = time.perf_counter()
+    best, trials = tune(args.weights, batch, params, [img.shape[:2] for img in images],
+                        args.batch, args.repeats, min_iou=args.min_iou)
+    ref_ms = trials[0]["ms_p50"]
+    best_ms = next(t["ms_p50"] for t in trials if all(t[k] == v for k, v in best.items()))
+
+    out_path = save_profile(
+        best, profile_path(sku),
+        sku=sku, torch=str(torch.__version__), weights=str(args.weights), imgsz=list(args.imgsz), batch=args.batch,
+        ms_per_frame=round(best_ms, 3), ms_per_frame_default=round(ref_ms, 3),
+        trials=[{k: (round(float(v), 3) if isinstance(v, (float, np.floating)) else v) for k, v in t.items()} for t in trials]
+    )
+    print(f"\n Best ({len(trials)} candidates, {time.perf_counter() - t0:.0f} s): "
+          f"{ref_ms:.2f} → {best_ms:.2f} ms/frame (×{ref_ms / best_ms:.2f} vs PyTorch defaults)")
+    print("   " + " ".join(f"{k}={v}" for k, v in best.items()))
+    print(f" Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
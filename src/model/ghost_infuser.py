@@ -0,0 +1,516 @@
+"""
+ghost_infuser.py
+Lightweight temporal smoother for YOLO detection outputs — "GhostDet" core module.
+- No Kalman, no optical flow, no external dependencies.
+- CPU-optimized (<1 ms/frame on i5), pure NumPy (array track state).
+- Designed for KITTI MOT seq-0006 (cars, occlusion, motion blur).
+- Integrates seamlessly with Ultralytics YOLOResults.
+Author: Ken Byrne
+Date: 2025-12-16
+Version: 1.7
+Changes:
+  - v1.0: Initial release — EMA smoothing, occlusion holdover, greedy IoU association.
+  - v1.1: Array-level update() API that also returns track IDs (used by the MOT exporter).
+          Module renamed from ghost_infuser_v1.0.py so it is importable as src.model.ghost_infuser.
+          snapshot() exposes canonical track state for record/replay checksums.
+  - v1.2: Track state in preallocated NumPy arrays (vectorized IoU + matched-track update).
+          Optional constant-velocity motion model (motion=True): per-track EMA velocity,
+          prediction before association and during holdover; unmatched tracks coast + age.
+          Default (motion=False) output is bit-exact with v1.1 (profile_infuser.py --check).
+  - v1.3: Windowed smoothing (smoothing='mean' | 'median' | 'savgol'): per-track ring buffer of
+          the last `window` boxes in a preallocated [K, window, 4] array, one vectorized
+          reduction per frame. smoothing='ema' (default) is unchanged.
+  - v1.4: Offline mode smooth_sequence(): one association pass over a whole sequence, then
+          zero-phase smoothing of every trajectory (forward-backward EMA or centered window).
+  - v1.5: propagate(): advance tracks on frames without detections (keyframe scheduling,
+          src/model/keyframe.py). Tracks move by their velocity (motion=True) and do not age.
+  - v1.6: torch is imported inside smooth() only — importing the module no longer loads torch.
+  - v1.7: preview(): association outcome of a candidate detection set (matched / occluded /
+          lost / new) without touching track state — routing signal for src/model/cascade.py.
+Next:
+  ***- v1.8: Add confidence decay tuning, track persistence control.***
+  ***- v1.9: Support multi-class (pedestrian, cyclist), configurable class filtering.***
+"""
+
+import numpy as np
+from typing import List, Tuple, Optional
+
+SMOOTHING_MODES = ("ema", "mean", "median", "savgol")
+OFFLINE_METHODS = ("fb_ema", "window")
+
+
+def window_weights(mode: str, window: int, order: int = 2) -> np.ndarray:
+    """
+    Causal filter weights per buffer fill level.
+
+    Returns:
+        np.ndarray: [window, window] → row L-1 = weights over sample age 0..L-1
+                    (age 0 = newest) for a track with L buffered boxes; zero beyond L.
+                    'savgol' = least-squares polynomial (degree min(order, L-1)) evaluated at the newest sample.
+    """
+    table = np.zeros((window, window))
+    for L in range(1, window + 1):
+        if mode == "savgol":
+            t = -np.arange(L, dtype=np.float64)
+            vander = np.vander(t, min(order, L - 1) + 1, increasing=True)
+            table[L - 1, :L] = np.linalg.pinv(vander)[0]
+        else:
+            table[L - 1, :L] = 1.0 / L
+    return table
+
+
+class GhostInfuser:
+    """
+    Temporal smoother for object detection bounding boxes.
+    Applies exponential moving average (EMA) and occlusion-aware holdover
+    to stabilize trajectories without Kalman filtering.
+    """
+
+    def __init__(
+        self,
+        window: int = 3,
+        alpha: float = 0.6,
+        occlusion_threshold: float = 0.3,
+        iou_match_thresh: float = 0.4,
+        max_age: int = 5,
+        motion: bool = False,
+        velocity_alpha: float = 0.5,
+        smoothing: str = "ema",
+        savgol_order: int = 1
+    ):
+        """
+        Initialize GhostInfuser.
+        Args:
+            window: Boxes kept per track for the windowed filters (ignored by smoothing='ema').
+            alpha: EMA weight for current frame (0.0 = full smoothing, 1.0 = raw output).
+            occlusion_threshold: IoU drop below this triggers occlusion holdover.
+            iou_match_thresh: Minimum IoU to associate boxes across frames.
+            max_age: Max frames to retain occluded track before dropping.
+            motion: Constant-velocity prediction (association, holdover, coasting of unmatched tracks).
+            velocity_alpha: EMA weight of the newest per-frame displacement in the velocity estimate.
+            smoothing: 'ema' (alpha blend with the previous box) or a windowed filter over the last
+                       `window` observed boxes: 'mean', 'median' or 'savgol'.
+            savgol_order: Polynomial degree for smoothing='savgol' (< window - 1; a degree window - 1
+                          fit passes through every sample and returns the newest box unsmoothed).
+        """
+        if smoothing not in SMOOTHING_MODES:
+            raise ValueError(f"smoothing must be one of {SMOOTHING_MODES}, got {smoothing!r}")
+        if window < 1:
+            raise ValueError(f"window must be >= 1, got {window}")
+        if smoothing == "savgol" and not 0 <= savgol_order < window - 1:
+            raise ValueError(f"savgol needs 0 <= savgol_order < window - 1, got order {savgol_order} for window {window}")
+        self.window = window
+        self.alpha = alpha
+        self.occlusion_threshold = occlusion_threshold
+        self.iou_match_thresh = iou_match_thresh
+        self.max_age = max_age
+        self.motion = motion
+        self.velocity_alpha = velocity_alpha
+        self.smoothing = smoothing
+        self._weights = window_weights(smoothing, window, savgol_order)
+
+        # Track state: row k = k-th live track (creation order == track_id order)
+        self._n = 0
+        self._alloc(32)
+        self.next_id: int = 0
+        self._frame = 0     # update() calls so far (preview() 'lost' reference)
+
+    def _alloc(self, capacity: int):
+        """(Re)allocate track arrays, keeping the first _n rows."""
+        n = self._n
+        old = getattr(self, "_bbox", None)
+        bbox = np.zeros((capacity, 4))
+        vel = np.zeros((capacity, 4))
+        conf = np.zeros(capacity)
+        cls = np.zeros(capacity, dtype=np.int64)
+        age = np.zeros(capacity, dtype=np.int64)
+        ids = np.zeros(capacity, dtype=np.int64)
+        hist = np.zeros((capacity, self.window, 4))      # ring buffer of observed boxes
+        count = np.zeros(capacity, dtype=np.int64)       # boxes pushed (write slot = count % window)
+        seen = np.zeros(capacity, dtype=np.int64)        # update() call that last gave the track a detection
+        if old is not None:
+            bbox[:n], vel[:n] = self._bbox[:n], self._vel[:n]
+            conf[:n], cls[:n], age[:n], ids[:n] = self._conf[:n], self._cls[:n], self._age[:n], self._ids[:n]
+            hist[:n], count[:n], seen[:n] = self._hist[:n], self._count[:n], self._seen[:n]
+        self._bbox, self._vel, self._conf, self._cls, self._age, self._ids = bbox, vel, conf, cls, age, ids
+        self._hist, self._count, self._seen = hist, count, seen
+
+    def _push(self, rows: np.ndarray, boxes: np.ndarray):
+        """Write one observed box per track row into its ring buffer."""
+        self._hist[rows, self._count[rows] % self.window] = boxes
+        self._count[rows] += 1
+
+    def _filtered(self, rows: np.ndarray) -> np.ndarray:
+        """Windowed filter over the ring buffers of `rows` (one vectorized reduction) → [M, 4]."""
+        w = self.window
+        count = self._count[rows]
+        fill = np.minimum(count, w)
+        # Sample age per slot (0 = newest); slots with age >= fill are empty
+        ages = (count[:, None] - 1 - np.arange(w)[None, :]) % w
+        hist = self._hist[rows]
+        if self.smoothing == "median":
+            hist = np.where((ages < fill[:, None])[:, :, None], hist, np.nan)
+            return np.nanmedian(hist, axis=1)
+        weights = self._weights[fill[:, None] - 1, ages]
+        return np.einsum("ks,ksc->kc", weights, hist)
+
+    @property
+    def tracks(self) -> dict:
+        """Live tracks as {track_id: {'bbox', 'conf', 'cls', 'age'}} (read-only view, for debugging)."""
+        n = self._n
+        return {
+            int(tid): {'bbox': self._bbox[k].copy(), 'conf': float(self._conf[k]),
+                       'cls': int(self._cls[k]), 'age': int(self._age[k])}
+            for k, tid in enumerate(self._ids[:n])
+        }
+
+    @staticmethod
+    def _iou_matrix(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+        """Pairwise IoU between [N, 4] and [M, 4] boxes [x1, y1, x2, y2] → [N, M]."""
+        x1 = np.maximum(boxes1[:, None, 0], boxes2[None, :, 0])
+        y1 = np.maximum(boxes1[:, None, 1], boxes2[None, :, 1])
+        x2 = np.minimum(boxes1[:, None, 2], boxes2[None, :, 2])
+        y2 = np.minimum(boxes1[:, None, 3], boxes2[None, :, 3])
+
+        inter = np.maximum(0, x2 - x1) * np.maximum(0, y2 - y1)
+        area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+        area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+        union = area1[:, None] + area2[None, :] - inter
+        valid = union > 1e-6
+        return np.divide(inter, union, out=np.zeros_like(inter), where=valid)
+
+    def _associate(
+        self, iou_matrix: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Greedy IoU-based 1:1 association.
+        Returns:
+            prev_idx, curr_idx: Matched pairs (in match order, highest IoU first)
+            unmatched_curr: Unmatched current indices (ascending)
+        """
+        return greedy_match(iou_matrix, self.iou_match_thresh)
+
+    def smooth(self, yolo_results) -> "torch.Tensor":
+        """
+        Apply temporal smoothing to Ultralytics YOLOResults.
+
+        Args:
+            yolo_results: ultralytics.engine.results.Results (from model(img))
+
+        Returns:
+            torch.Tensor: Smoothed detections [N, 6] → [x1, y1, x2, y2, conf, cls]
+        """
+        # Extract detections (assumes class 0 = car; extend later)
+        import torch   # lazy: the array API (trackers, sweeps, CLI) never needs torch
+
+        smoothed = self.update(results_to_dets(yolo_results, classes=(0,)))
+        return torch.from_numpy(smoothed[:, :6]).float()
+
+    def update(self, dets: np.ndarray) -> np.ndarray:
+        """
+        Array-level smoothing step (same logic as smooth(), without Results/torch).
+
+        Args:
+            dets: [N, 6] detections → [x1, y1, x2, y2, conf, cls]
+
+        Returns:
+            np.ndarray: [N, 7] → [x1, y1, x2, y2, conf, cls, track_id]
+        """
+        dets = np.asarray(dets, dtype=np.float64).reshape(-1, 6)
+        curr_xyxy, curr_conf, curr_cls = dets[:, :4], dets[:, 4], dets[:, 5]
+        n = self._n
+        self._frame += 1
+        bbox, vel = self._bbox[:n], self._vel[:n]
+
+        # Predict (constant velocity) → associate against predicted boxes
+        prev_boxes = bbox + vel if self.motion else bbox
+        iou = self._iou_matrix(prev_boxes, curr_xyxy)
+        pi, ci, new_ci = self._associate(iou)
+
+        # ── Matched tracks (vectorized) ──────────────────────
+        occluded = iou[pi, ci] < self.occlusion_threshold
+        ok = ~occluded
+        pi_ok, ci_ok, pi_occ = pi[ok], ci[ok], pi[occluded]
+
+        new_bbox = prev_boxes[pi].copy()   # holdover: predicted (motion) / frozen box
+        if self.smoothing == "ema":
+            new_bbox[ok] = (
+                self.alpha * curr_xyxy[ci_ok] +
+                (1 - self.alpha) * prev_boxes[pi_ok]
+            )
+        elif len(pi_ok):
+            self._push(pi_ok, curr_xyxy[ci_ok])
+            new_bbox[ok] = self._filtered(pi_ok)
+        new_conf = curr_conf[ci].copy()
+        new_conf[occluded] = np.maximum(0.1, self._conf[pi_occ] * 0.9)
+
+        if self.motion:
+            # Velocity EMA from observed displacement; coast unmatched tracks
+            va = self.velocity_alpha
+            vel[pi_ok] = va * (new_bbox[ok] - bbox[pi_ok]) + (1 - va) * vel[pi_ok]
+            coast = np.ones(n, dtype=bool)
+            coast[pi] = False
+            bbox[coast] = prev_boxes[coast]
+            self._age[:n][coast] += 1
+
+        bbox[pi] = new_bbox
+        self._conf[pi] = new_conf
+        self._cls[pi] = curr_cls[ci]
+        self._age[pi_ok] = 0
+        self._age[pi_occ] += 1
+        self._seen[pi] = self._frame
+        matched_ids = self._ids[pi].copy()
+
+        # ── New tracks ───────────────────────────────────────
+        k = len(new_ci)
+        if n + k > len(self._bbox):
+            self._alloc(max(2 * len(self._bbox), n + k))
+        new_ids = np.arange(self.next_id, self.next_id + k)
+        self._bbox[n:n + k] = curr_xyxy[new_ci]
+        self._vel[n:n + k] = 0.0
+        self._conf[n:n + k] = curr_conf[new_ci]
+        self._cls[n:n + k] = curr_cls[new_ci]
+        self._age[n:n + k] = 0
+        self._ids[n:n + k] = new_ids
+        self._count[n:n + k] = 0
+        self._seen[n:n + k] = self._frame
+        if self.smoothing != "ema":
+            self._push(np.arange(n, n + k), curr_xyxy[new_ci])
+        self.next_id += k
+        self._n = n + k
+
+        # ── Output: matched (match order), then new ──────────
+        out = np.empty((len(pi) + k, 7))
+        out[:len(pi), :4] = new_bbox
+        out[:len(pi), 4] = new_conf
+        out[:len(pi), 5] = curr_cls[ci]
+        out[:len(pi), 6] = matched_ids
+        out[len(pi):, :6] = dets[new_ci]
+        out[len(pi):, 6] = new_ids
+
+        # Prune old tracks (compact, keeps creation order)
+        n = self._n
+        alive = self._age[:n] <= self.max_age
+        if not alive.all():
+            m = int(alive.sum())
+            for arr in (self._bbox, self._vel, self._conf, self._cls, self._age, self._ids,
+                        self._hist, self._count, self._seen):
+                arr[:m] = arr[:n][alive]
+            self._n = m
+
+        return out
+
+    def propagate(self) -> np.ndarray:
+        """
+        Advance all live tracks one frame without detections (frame not sent to the detector).
+        Boxes move by their velocity estimate (motion=True; otherwise they hold); age, confidence
+        and the smoothing buffers are untouched, so the next update() continues as if the
+        skipped frames had been observed on the predicted path.
+
+        Returns:
+            np.ndarray: [K, 7] → [x1, y1, x2, y2, conf, cls, track_id] for every live track
+        """
+        n = self._n
+        if self.motion:
+            self._bbox[:n] += self._vel[:n]
+        out = np.empty((n, 7))
+        out[:, :4] = self._bbox[:n]
+        out[:, 4] = self._conf[:n]
+        out[:, 5] = self._cls[:n]
+        out[:, 6] = self._ids[:n]
+        return out
+
+    def preview(self, dets: np.ndarray) -> dict:
+        """
+        What update(dets) would do to the live tracks, without changing any state.
+        'lost' counts tracks that had a detection on the last update() and find none now
+        (tracks already unmatched before — e.g. left the scene — are not counted again).
+
+        Returns:
+            dict: {'matched', 'occluded', 'lost', 'new'} → counts
+        """
+        dets = np.asarray(dets, dtype=np.float64).reshape(-1, 6)
+        n = self._n
+        prev_boxes = self._bbox[:n] + self._vel[:n] if self.motion else self._bbox[:n]
+        iou = self._iou_matrix(prev_boxes, dets[:, :4])
+        pi, ci, new_ci = self._associate(iou)
+        occluded = iou[pi, ci] < self.occlusion_threshold
+        lost = self._seen[:n] == self._frame
+        lost[pi] = False
+        return {"matched": int((~occluded).sum()), "occluded": int(occluded.sum()),
+                "lost": int(lost.sum()), "new": len(new_ci)}
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Canonical track state, independent of internal storage (used for replay checksums).
+
+        Returns:
+            np.ndarray: [K, 8] → [track_id, x1, y1, x2, y2, conf, cls, age], sorted by track_id
+        """
+        n = self._n
+        return np.column_stack([
+            self._ids[:n], self._bbox[:n], self._conf[:n], self._cls[:n], self._age[:n]
+        ]).astype(np.float64).reshape(-1, 8)
+
+
+def greedy_match(
+    iou_matrix: np.ndarray, thresh: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Greedy 1:1 matching on an [N, M] IoU matrix (see GhostInfuser._associate)."""
+    n_prev, n_curr = iou_matrix.shape
+    if n_prev == 0 or n_curr == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.arange(n_curr)
+
+    iou_matrix = iou_matrix.copy()
+    prev_idx, curr_idx = [], []
+
+    # Greedy matching: highest IoU first
+    for _ in range(min(n_prev, n_curr)):
+        i, j = np.unravel_index(np.argmax(iou_matrix), iou_matrix.shape)
+        if iou_matrix[i, j] < thresh:
+            break
+        prev_idx.append(i)
+        curr_idx.append(j)
+        iou_matrix[i, :] = -1.0
+        iou_matrix[:, j] = -1.0
+
+    used = np.zeros(n_curr, dtype=bool)
+    used[curr_idx] = True
+    return np.array(prev_idx, np.int64), np.array(curr_idx, np.int64), np.flatnonzero(~used)
+
+
+def link_sequence(
+    frames: List[np.ndarray], iou_match_thresh: float = 0.4, max_age: int = 5
+) -> np.ndarray:
+    """
+    Association-only pass over a whole sequence (raw boxes, no smoothing).
+    Unmatched tracks stay linkable for max_age frames.
+
+    Args:
+        frames: per-frame [N, 6] detections → [x1, y1, x2, y2, conf, cls]
+
+    Returns:
+        np.ndarray: [M, 8] → [frame, x1, y1, x2, y2, conf, cls, track_id] (one row per detection)
+    """
+    last = np.empty((0, 4))                 # last observed box per live track
+    ids = np.empty(0, np.int64)
+    age = np.empty(0, np.int64)
+    next_id = 0
+    out = []
+    for f, dets in enumerate(frames):
+        dets = np.asarray(dets, dtype=np.float64).reshape(-1, 6)
+        pi, ci, new_ci = greedy_match(GhostInfuser._iou_matrix(last, dets[:, :4]), iou_match_thresh)
+
+        det_ids = np.empty(len(dets), np.int64)
+        det_ids[ci] = ids[pi]
+        det_ids[new_ci] = np.arange(next_id, next_id + len(new_ci))
+        next_id += len(new_ci)
+
+        last[pi] = dets[ci, :4]
+        age += 1
+        age[pi] = 0
+        alive = age <= max_age
+        last = np.concatenate([last[alive], dets[new_ci, :4]])
+        ids = np.concatenate([ids[alive], det_ids[new_ci]])
+        age = np.concatenate([age[alive], np.zeros(len(new_ci), np.int64)])
+
+        rows = np.empty((len(dets), 8))
+        rows[:, 0] = f
+        rows[:, 1:7] = dets
+        rows[:, 7] = det_ids
+        out.append(rows)
+    return np.concatenate(out) if out else np.empty((0, 8))
+
+
+def smooth_sequence(
+    frames: List[np.ndarray],
+    method: str = "fb_ema",
+    alpha: float = 0.6,
+    lag: int = 2,
+    iou_match_thresh: float = 0.4,
+    max_age: int = 5
+) -> List[np.ndarray]:
+    """
+    Offline (non-causal) counterpart of GhostInfuser.update() for whole sequences.
+    Links detections into tracks in one pass, then smooths every trajectory at once:
+      - 'fb_ema': EMA forward, then backward over the result (zero-phase; no lag)
+      - 'window': centered moving average over ±lag observations (fixed-lag smoother)
+
+    Args:
+        frames: per-frame [N, 6] detections → [x1, y1, x2, y2, conf, cls]
+
+    Returns:
+        List[np.ndarray]: per-frame [N, 7] → [x1, y1, x2, y2, conf, cls, track_id]
+    """
+    if method not in OFFLINE_METHODS:
+        raise ValueError(f"method must be one of {OFFLINE_METHODS}, got {method!r}")
+    if not len(frames):
+        return []
+    rows = link_sequence(frames, iou_match_thresh, max_age)
+    m = len(rows)
+    if m:
+        # Sort by track, then frame → each trajectory is a contiguous segment
+        order = np.lexsort((rows[:, 0], rows[:, 7]))
+        boxes = rows[order, 1:5]
+        tid = rows[order, 7]
+        starts = np.flatnonzero(np.r_[True, tid[1:] != tid[:-1]])
+        lengths = np.diff(np.r_[starts, m])
+        seg = np.repeat(np.arange(len(starts)), lengths)
+        pos = np.arange(m) - starts[seg]
+
+        if method == "window":
+            csum = np.vstack([np.zeros((1, 4)), np.cumsum(boxes, axis=0)])
+            lo = np.maximum(pos - lag, 0) + starts[seg]
+            hi = np.minimum(pos + lag, lengths[seg] - 1) + starts[seg] + 1
+            smoothed = (csum[hi] - csum[lo]) / (hi - lo)[:, None]
+        else:
+            # Padded [tracks, max_len, 4]; the recursion runs over time, vectorized over tracks
+            padded = np.zeros((len(starts), lengths.max(), 4))
+            padded[seg, pos] = boxes
+            fwd = _ema_along_time(padded, alpha)
+            rev = np.zeros_like(padded)
+            rpos = lengths[seg] - 1 - pos
+            rev[seg, rpos] = fwd[seg, pos]
+            smoothed = _ema_along_time(rev, alpha)[seg, rpos]
+
+        rows[order, 1:5] = smoothed
+
+    # Back to per-frame arrays (rows are still in frame order)
+    bounds = np.cumsum([len(np.asarray(d).reshape(-1, 6)) for d in frames])[:-1]
+    return [r[:, 1:] for r in np.split(rows, bounds)]
+
+
+def _ema_along_time(x: np.ndarray, alpha: float) -> np.ndarray:
+    """EMA over axis 1 of [T, L, C], seeded with the first sample."""
+    y = np.empty_like(x)
+    y[:, 0] = x[:, 0]
+    for t in range(1, x.shape[1]):
+        y[:, t] = alpha * x[:, t] + (1 - alpha) * y[:, t - 1]
+    return y
+
+
+def results_to_dets(yolo_results, classes: Optional[Tuple[int, ...]] = None) -> np.ndarray:
+    """
+    Convert Ultralytics Results to a [N, 6] float array → [x1, y1, x2, y2, conf, cls].
+    Whole-frame tensor → NumPy conversion instead of per-box .tolist()/float().
+
+    Args:
+        yolo_results: ultralytics.engine.results.Results
+        classes: Optional class IDs to keep (None = all).
+    """
+    boxes = yolo_results.boxes
+    data = np.column_stack([
+        boxes.xyxy.cpu().numpy(),
+        boxes.conf.cpu().numpy(),
+        boxes.cls.cpu().numpy()
+    ]).reshape(-1, 6)
+    if classes is not None:
+        data = data[np.isin(data[:, 5], classes)]
+    return data
+
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    print(" Testing GhostInfuser v1.7...")
+    infuser = GhostInfuser(alpha=0.7, occlusion_threshold=0.25)
+    print(" GhostInfuser initialized.")
\ No newline at end of file
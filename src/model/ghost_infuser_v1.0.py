@@ -1,216 +0,0 @@
-"""
-ghost_infuser_v1.0.py
-Lightweight temporal smoother for YOLO detection outputs — "GhostDet" core module.
-- No Kalman, no optical flow, no external dependencies.
-- CPU-optimized (<1 ms/frame on i5), pure NumPy + deque.
-- Designed for KITTI MOT seq-0006 (cars, occlusion, motion blur).
-- Integrates seamlessly with Ultralytics YOLOResults.
-Author: Ken Byrne
-Date: 2025-12-16
-Version: 1.0 (first implementation)
-Changes:
-  - v1.0: Initial release — EMA smoothing, occlusion holdover, greedy IoU association.
-Next:
-  ***- v1.1: Add confidence decay tuning, track persistence control.***
-  ***- v1.2: Support multi-class (pedestrian, cyclist), configurable class filtering.***
-"""
-
-from collections import deque
-import numpy as np
-from typing import List, Tuple, Optional
-import torch
-
-
-class GhostInfuser:
-    """
-    Temporal smoother for object detection bounding boxes.
-    Applies exponential moving average (EMA) and occlusion-aware holdover
-    to stabilize trajectories without Kalman filtering.
-    """
-
-    def __init__(
-        self,
-        window: int = 3,
-        alpha: float = 0.6,
-        occlusion_threshold: float = 0.3,
-        iou_match_thresh: float = 0.4,
-        max_age: int = 5
-    ):
-        """
-        Initialize GhostInfuser.
-        Args:
-            window: Temporal window size (unused in v1.0; reserved for future buffer-based smoothing).
-            alpha: EMA weight for current frame (0.0 = full smoothing, 1.0 = raw output).
-            occlusion_threshold: IoU drop below this triggers occlusion holdover.
-            iou_match_thresh: Minimum IoU to associate boxes across frames.
-            max_age: Max frames to retain occluded track before dropping.
-        """
-        self.alpha = alpha
-        self.occlusion_threshold = occlusion_threshold
-        self.iou_match_thresh = iou_match_thresh
-        self.max_age = max_age
-
-        # Tracks: {track_id: {'bbox': np.ndarray[4], 'conf': float, 'cls': int, 'age': int}}
-        self.tracks: dict[int, dict] = {}
-        self.next_id: int = 0
-
-    @staticmethod
-    def _compute_iou(box1: np.ndarray, box2: np.ndarray) -> float:
-        """Compute IoU between two boxes [x1, y1, x2, y2]."""
-        x1 = max(box1[0], box2[0])
-        y1 = max(box1[1], box2[1])
-        x2 = min(box1[2], box2[2])
-        y2 = min(box1[3], box2[3])
-
-        inter = max(0, x2 - x1) * max(0, y2 - y1)
-        area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
-        area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
-        union = area1 + area2 - inter
-        return inter / union if union > 1e-6 else 0.0
-
-    def _associate(
-        self, prev_boxes: np.ndarray, curr_boxes: np.ndarray
-    ) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
-        """
-        Greedy IoU-based 1:1 association.
-        Returns:
-            matches: List of (prev_idx, curr_idx)
-            unmatched_prev: List of unmatched previous indices
-            unmatched_curr: List of unmatched current indices
-        """
-        if len(prev_boxes) == 0 or len(curr_boxes) == 0:
-            return [], list(range(len(prev_boxes))), list(range(len(curr_boxes)))
-
-        # Compute IoU matrix
-        iou_matrix = np.zeros((len(prev_boxes), len(curr_boxes)))
-        for i, pb in enumerate(prev_boxes):
-            for j, cb in enumerate(curr_boxes):
-                iou_matrix[i, j] = self._compute_iou(pb, cb)
-
-        matches = []
-        used_prev, used_curr = set(), set()
-
-        # Greedy matching: highest IoU first
-        for _ in range(min(len(prev_boxes), len(curr_boxes))):
-            i, j = np.unravel_index(np.argmax(iou_matrix), iou_matrix.shape)
-            if iou_matrix[i, j] < self.iou_match_thresh:
-                break
-            matches.append((i, j))
-            used_prev.add(i)
-            used_curr.add(j)
-            iou_matrix[i, :] = -1.0
-            iou_matrix[:, j] = -1.0
-
-        unmatched_prev = [i for i in range(len(prev_boxes)) if i not in used_prev]
-        unmatched_curr = [j for j in range(len(curr_boxes)) if j not in used_curr]
-        return matches, unmatched_prev, unmatched_curr
-
-    def smooth(self, yolo_results) -> torch.Tensor:
-        """
-        Apply temporal smoothing to Ultralytics YOLOResults.
-
-        Args:
-            yolo_results: ultralytics.engine.results.Results (from model(img))
-
-        Returns:
-            torch.Tensor: Smoothed detections [N, 6] → [x1, y1, x2, y2, conf, cls]
-        """
-        # Extract detections (assumes class 0 = car; extend later)
-        boxes = yolo_results.boxes
-        car_mask = boxes.cls == 0
-        curr_dets = boxes[car_mask]
-        curr_xyxy = curr_dets.xyxy.cpu().numpy() if len(curr_dets) > 0 else np.empty((0, 4))
-        curr_conf = curr_dets.conf.cpu().numpy() if len(curr_dets) > 0 else np.empty(0)
-        curr_cls = curr_dets.cls.cpu().numpy() if len(curr_dets) > 0 else np.empty(0)
-
-        # Build full detection array [x1,y1,x2,y2,conf,cls]
-        if len(curr_dets) > 0:
-            curr_full = np.column_stack([curr_xyxy, curr_conf, curr_cls])
-        else:
-            curr_full = np.empty((0, 6))
-
-        # Bootstrap: no tracks → init
-        if not self.tracks:
-            smoothed = []
-            for det in curr_full:
-                track_id = self.next_id
-                self.tracks[track_id] = {
-                    'bbox': det[:4].copy(),
-                    'conf': float(det[4]),
-                    'cls': int(det[5]),
-                    'age': 0
-                }
-                self.next_id += 1
-                smoothed.append(det)
-            return torch.from_numpy(np.array(smoothed)) if smoothed else torch.empty((0, 6))
-
-        # Match current to existing tracks
-        prev_boxes = np.array([t['bbox'] for t in self.tracks.values()])
-        matches, unmatched_prev, unmatched_curr = self._associate(prev_boxes, curr_xyxy)
-
-        # Update matched tracks
-        updated_dets = []
-        track_ids = list(self.tracks.keys())
-        for prev_idx, curr_idx in matches:
-            tid = track_ids[prev_idx]
-            prev_bbox = self.tracks[tid]['bbox']
-            curr_bbox = curr_xyxy[curr_idx]
-            curr_conf_val = curr_conf[curr_idx]
-            curr_cls_val = curr_cls[curr_idx]
-
-            iou = self._compute_iou(prev_bbox, curr_bbox)
-            is_occluded = iou < self.occlusion_threshold
-
-            if is_occluded:
-                # Hold position, decay confidence
-                new_bbox = prev_bbox.copy()
-                new_conf = max(0.1, self.tracks[tid]['conf'] * 0.9)
-                self.tracks[tid]['age'] += 1
-            else:
-                # EMA smoothing
-                new_bbox = (
-                    self.alpha * curr_bbox +
-                    (1 - self.alpha) * prev_bbox
-                )
-                new_conf = curr_conf_val
-                self.tracks[tid]['age'] = 0
-
-            self.tracks[tid].update({
-                'bbox': new_bbox,
-                'conf': new_conf,
-                'cls': int(curr_cls_val)
-            })
-            updated_dets.append(np.append(new_bbox, [new_conf, curr_cls_val]))
-
-        # Init new tracks
-        for curr_idx in unmatched_curr:
-            tid = self.next_id
-            bbox = curr_xyxy[curr_idx]
-            conf = curr_conf[curr_idx]
-            cls = curr_cls[curr_idx]
-            self.tracks[tid] = {
-                'bbox': bbox.copy(),
-                'conf': float(conf),
-                'cls': int(cls),
-                'age': 0
-            }
-            self.next_id += 1
-            updated_dets.append(np.append(bbox, [conf, cls]))
-
-        # Prune old tracks
-        to_remove = [tid for tid, t in self.tracks.items() if t['age'] > self.max_age]
-        for tid in to_remove:
-            del self.tracks[tid]
-
-        # Return as tensor
-        if updated_dets:
-            return torch.from_numpy(np.vstack(updated_dets)).float()
-        else:
-            return torch.empty((0, 6))
-
-
-# Example usage (for testing)
-if __name__ == "__main__":
-    print(" Testing GhostInfuser v1.0...")
-    infuser = GhostInfuser(alpha=0.7, occlusion_threshold=0.25)
-    print(" GhostInfuser initialized.")
\ No newline at end of file
@@ -0,0 +1,50 @@
+# src/model/ghostdet_csp_local.py
+"""
+Train the Ghost-CSP GhostDet model (configs/models/ghostdet_csp.yaml) on KITTI.
+- Built from the YAML (Ghost-CSP backbone + Ghost-PAN neck); --pretrained transfers every
+  shape-compatible tensor from a checkpoint (e.g. yolov8n.pt: stem, SPPF, Detect head).
+→ runs/detect/<name>/weights/best.pt
+
+Usage:
+  python -m src.model.ghostdet_csp_local --epochs 100
+  python -m src.model.ghostdet_csp_local --pretrained yolov8n.pt --device 0
+"""
+
+import argparse
+
+MODEL_YAML = "configs/models/ghostdet_csp.yaml"
+DATA_YAML = "data/kitti_yolo_v1.1_clean/kitti_ghostdet_v1.1_clean.yaml"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the Ghost-CSP GhostDet model.")
+    parser.add_argument("--cfg", default=MODEL_YAML)
+    parser.add_argument("--data", default=DATA_YAML)
+    parser.add_argument("--pretrained", default=None, help="Checkpoint to transfer matching weights from")
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--batch", type=int, default=8)          # reduced for laptop
+    parser.add_argument("--device", default="cpu")               # "0" if GPU available
+    parser.add_argument("--name", default="ghostdet_csp")
+    args = parser.parse_args()
+
+    from ultralytics import YOLO
+
+    model = YOLO(args.cfg)
+    if args.pretrained:
+        model.load(args.pretrained)
+    model.info(detailed=False, imgsz=args.imgsz)
+
+    model.train(
+        data=args.data,
+        epochs=args.epochs,
+        imgsz=args.imgsz,
+        batch=args.batch,
+        name=args.name,
+        device=args.device
+    )
+    print(f" Training complete. Weights saved to runs/detect/{args.name}/weights/best.pt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# src/model/keyframe.py
+"""
+Track-guided frame skipping for GhostDet: run the detector on keyframes only and
+propagate GhostInfuser tracks (constant-velocity model) on the frames in between.
+A frame is a keyframe when
+- interval: k frames have passed since the last keyframe (k = 1 → every frame),
+- conf:     a visible track's confidence is below min_conf (weak / held-over detection),
+- motion:   a visible track moved more than max_motion × its width per frame,
+- tracks:   the last keyframe started or lost tracks (no velocity yet / scene change),
+- first:    no keyframe yet.
+Uncertainty is measured on keyframes only (skipped frames carry no new evidence).
+
+Usage:
+  sched = KeyframeScheduler(lambda img: backend.predict([img])[0], k=3)
+  for img in frames:
+      tracks = sched.step(img)                  # [N, 7] → [x1, y1, x2, y2, conf, cls, track_id]
+  print(sched.calls_per_second(fps=10), sched.reasons)
+"""
+
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from src.model.ghost_infuser import GhostInfuser
+
+TRIGGERS = ("first", "interval", "conf", "motion", "tracks")
+
+
+class KeyframeScheduler:
+    """Decides per frame whether to run the detector; propagates tracks otherwise."""
+
+    def __init__(
+        self,
+        detect: Callable[..., np.ndarray],
+        infuser: Optional[GhostInfuser] = None,
+        k: int = 3,
+        min_conf: float = 0.5,
+        max_motion: float = 0.1,
+        on_track_change: bool = True
+    ):
+        """
+        Args:
+            detect: frame → [N, 6] detections [x1, y1, x2, y2, conf, cls] (called on keyframes only).
+            infuser: Tracker to drive (default: GhostInfuser(motion=True); without motion the
+                     boxes simply hold on skipped frames).
+            k: Maximum keyframe interval in frames (1 = detect every frame).
+            min_conf: Re-detect on the next frame if any visible track is below this confidence
+                      (0 disables).
+            max_motion: Re-detect on the next frame if any track moved more than this fraction of
+                        its box width per frame between keyframes (0 disables).
+            on_track_change: Re-detect on the next frame after tracks appear or disappear.
+        """
+        if k < 1:
+            raise ValueError(f"k must be >= 1, got {k}")
+        self.detect = detect
+        self.infuser = infuser if infuser is not None else GhostInfuser(motion=True)
+        self.k = k
+        self.min_conf = min_conf
+        self.max_motion = max_motion
+        self.on_track_change = on_track_change
+
+        self.frames = 0
+        self.calls = 0
+        self.reasons: Dict[str, int] = dict.fromkeys(TRIGGERS, 0)
+        self._since = 0                       # frames since the last keyframe
+        self._pending: Optional[str] = "first"
+        self._last: np.ndarray = np.empty((0, 7))
+
+    def _trigger(self) -> Optional[str]:
+        """Reason to run the detector on the current frame (None = propagate)."""
+        if self._pending:
+            return self._pending
+        if self._since >= self.k:
+            return "interval"
+        return None
+
+    def _uncertainty(self, tracks: np.ndarray) -> Optional[str]:
+        """Inspect a keyframe's output; returns the trigger for the next frame, if any."""
+        if self.min_conf and len(tracks) and tracks[:, 4].min() < self.min_conf:
+            return "conf"
+
+        prev, gap = self._last, self._since
+        common, pi, ci = np.intersect1d(prev[:, 6], tracks[:, 6], return_indices=True)
+        if self.max_motion and len(common):
+            width = np.maximum(tracks[ci, 2] - tracks[ci, 0], 1.0)
+            shift = np.abs(tracks[ci, :4] - prev[pi, :4]).max(axis=1) / gap
+            if (shift / width).max() > self.max_motion:
+                return "motion"
+
+        if self.on_track_change and not (len(common) == len(prev) == len(tracks)):
+            return "tracks"
+        return None
+
+    def step(self, frame) -> np.ndarray:
+        """
+        Process one frame.
+
+        Returns:
+            np.ndarray: [N, 7] → [x1, y1, x2, y2, conf, cls, track_id]
+        """
+        self.frames += 1
+        self._since += 1
+        reason = self._trigger()
+        if reason is None:
+            tracks = self.infuser.propagate()
+            return tracks[np.isin(tracks[:, 6], self._last[:, 6])]
+
+        tracks = self.infuser.update(self.detect(frame))
+        self.calls += 1
+        self.reasons[reason] += 1
+        self._pending = self._uncertainty(tracks)
+        self._last = tracks
+        self._since = 0
+        return tracks
+
+    @property
+    def keyframe_share(self) -> float:
+        """Fraction of frames sent to the detector so far."""
+        return self.calls / max(self.frames, 1)
+
+    def calls_per_second(self, fps: float = 10.0) -> float:
+        """Effective detector calls per second at the stream frame rate."""
+        return self.keyframe_share * fps
@@ -0,0 +1,190 @@
+# src/model/model_cache.py
+"""
+Inference-only model artifact cache (no Ultralytics import / fusion at startup).
+- YOLO("best.pt") costs an Ultralytics import, checkpoint unpickling and Conv+BN fusion on
+  every launch; the first forward then pays allocator / oneDNN primitive warm-up.
+- The artifact is the fused network traced + frozen as TorchScript, saved next to the weights
+  and keyed by the weights content hash and input shape: best_192x640_<sha12>.torchscript.
+  Class names / stride / torch version travel inside the file (_extra_files meta.json).
+- Retrained weights → new hash → new artifact; a torch version change rebuilds it.
+- load_cached_model() loads it with torch.jit.load only (no Ultralytics import). The
+  optimizing (profiling) executor needs two forwards before it runs the fast plan; they
+  start on a background thread once the first frame is done, and frames until then run
+  the frozen graph unoptimized (no profiling pass, ~1.1× steady-state time), so warm-up
+  is off the time-to-first-detection path. background=False warms up before returning.
+- Used by the 'torchscript' backend (src/model/backends.py).
+
+Usage:
+  python -m src.model.model_cache                   # build / verify the artifact for best.pt
+  model = load_cached_model("runs/detect/ghostdet_local2/weights/best.pt")
+  raw = model(batch)                                # [B, 3, H, W] float32 → [B, 4 + nc, A]
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+import warnings
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import torch
+
+from src.utils.kitti_io import KITTI_IMGSZ, stride_align
+
+WEIGHTS = "runs/detect/ghostdet_local2/weights/best.pt"
+META_FILE = "meta.json"
+
+
+def weights_hash(path: Path, n: int = 12) -> str:
+    """Content hash (sha256 prefix) of a weights file."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:n]
+
+
+def artifact_path(weights: Path, imgsz: Tuple[int, int], digest: str) -> Path:
+    h, w = imgsz
+    return Path(weights).with_name(f"{Path(weights).stem}_{h}x{w}_{digest}.torchscript")
+
+
+def build_artifact(weights: Path, imgsz: Tuple[int, int], path: Path, digest: str) -> Path:
+    """Fuse, trace and freeze the network at imgsz; save with its metadata."""
+    from ultralytics import YOLO
+
+    net = YOLO(str(weights)).model.float().eval()
+    net = net.fuse(verbose=False)
+    meta = {
+        "weights": str(weights),
+        "sha": digest,
+        "imgsz": list(imgsz),
+        "names": {int(k): v for k, v in net.names.items()},
+        "stride": int(net.stride.max()),
+        "torch": str(torch.__version__),
+    }
+    tmp = path.with_suffix(".tmp")
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter("ignore")   # tracer / jit deprecation warnings: the input shape is fixed by design
+        traced = torch.jit.freeze(torch.jit.trace(net, torch.zeros(1, 3, *imgsz), strict=False, check_trace=False))
+        torch.jit.save(traced, str(tmp), _extra_files={META_FILE: json.dumps(meta)})
+    tmp.replace(path)   # atomic: a crashed build never leaves a half-written artifact
+    return path
+
+
+class CachedModel:
+    """Frozen TorchScript network + metadata; call with a letterboxed float32 batch."""
+
+    def __init__(self, module, meta: dict, path: Path, timings: dict):
+        self.module = module
+        self.meta = meta
+        self.path = path
+        self.names = {int(k): v for k, v in meta["names"].items()}
+        self.imgsz = tuple(meta["imgsz"])
+        self.timings = timings     # seconds: hash / build / load / warmup
+        self._warm = threading.Event()     # set → the optimizing executor has its fast plan
+        self._warm.set()
+        self._deferred = 0                 # warm-up forwards to start after the next call
+        self._lock = threading.Lock()
+
+    def _run(self, batch: np.ndarray, optimize: bool) -> np.ndarray:
+        # optimized_execution is thread-local: a background warm-up does not affect callers
+        with torch.inference_mode(), torch.jit.optimized_execution(optimize):
+            out = self.module(torch.from_numpy(batch))
+        return (out[0] if isinstance(out, (tuple, list)) else out).numpy()
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        if self._warm.is_set():
+            return self._run(batch, optimize=True)
+        out = self._run(batch, optimize=False)
+        with self._lock:
+            n, self._deferred = self._deferred, 0
+        if n:
+            self.warmup_async(n)
+        return out
+
+    def warmup(self, n: int = 2, batch: int = 1):
+        """Run the profiling forwards of the optimizing executor (blocking)."""
+        t0 = time.perf_counter()
+        x = np.zeros((batch, 3, *self.imgsz), dtype=np.float32)
+        for _ in range(n):
+            self._run(x, optimize=True)
+        self.timings["warmup"] = time.perf_counter() - t0
+        self._warm.set()
+
+    def warmup_async(self, n: int = 2, batch: int = 1) -> threading.Thread:
+        """warmup() on a background thread; calls meanwhile use the unoptimized frozen graph."""
+        self._warm.clear()
+        # not a daemon: interpreter shutdown in the middle of a forward aborts the process
+        thread = threading.Thread(target=self.warmup, args=(n, batch), name="model-warmup")
+        thread.start()
+        return thread
+
+    def defer_warmup(self, n: int = 2):
+        """Start warmup_async(n) after the next call; calls until warm use the unoptimized graph."""
+        self._warm.clear()
+        self._deferred = n
+
+
+def load_cached_model(
+    weights: str = WEIGHTS,
+    imgsz: Tuple[int, int] = KITTI_IMGSZ,
+    warmup: int = 2,
+    rebuild: bool = False,
+    background: bool = True
+) -> CachedModel:
+    """
+    Artifact for (weights hash, imgsz); built on a miss or a torch version change.
+    `warmup` forwards run on a background thread after the first call (background=True) or before returning.
+    """
+    weights = Path(weights)
+    imgsz = stride_align(imgsz)
+    timings = {}
+
+    t0 = time.perf_counter()
+    digest = weights_hash(weights)
+    path = artifact_path(weights, imgsz, digest)
+    timings["hash"] = time.perf_counter() - t0
+
+    for attempt in range(2):
+        if rebuild or not path.exists():
+            t0 = time.perf_counter()
+            print(f" Building model artifact: {weights} → {path.name}")
+            build_artifact(weights, imgsz, path, digest)
+            timings["build"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        extra = {META_FILE: ""}
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            module = torch.jit.load(str(path), map_location="cpu", _extra_files=extra)
+        meta = json.loads(extra[META_FILE])
+        timings["load"] = time.perf_counter() - t0
+        if meta.get("torch") == str(torch.__version__):
+            break
+        rebuild = True   # serialized with another torch version → rebuild once
+
+    model = CachedModel(module, meta, path, timings)
+    if warmup and background:
+        model.defer_warmup(warmup)
+    elif warmup:
+        model.warmup(warmup)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build / verify the cached TorchScript artifact for a checkpoint.")
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--imgsz", nargs=2, type=int, default=list(KITTI_IMGSZ), metavar=("H", "W"))
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    model = load_cached_model(args.weights, tuple(args.imgsz), rebuild=args.rebuild, background=False)
+    print(f" {model.path} ({model.path.stat().st_size / 1e6:.1f} MB, {len(model.names)} classes)")
+    print("   " + ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in model.timings.items()))
+
+
+if __name__ == "__main__":
+    main()
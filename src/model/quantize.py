@@ -0,0 +1,223 @@
+# src/model/quantize.py
+"""
+INT8 post-training quantization for GhostDet (ONNX Runtime, CPU).
+1. Export best.pt → FP32 ONNX (src/model/backends.py, cached next to the weights).
+2. Static PTQ (QDQ, per-channel INT8 weights, UINT8 activations) calibrated on
+   data/kitti_yolo_v1.1_clean/images/val through the same letterbox as inference.
+   The detection head (last /model.N/ block) stays FP32 by default — box regression is
+   the most quantization-sensitive part and directly drives jitter.
+3. Report FP32 best.pt vs FP32 ONNX vs INT8 ONNX:
+   - mAP50 / mAP50-95 at the deployment input shape (--imgsz, 192×640 letterbox) on the val
+     labels of kitti_ghostdet_v1.1_clean.yaml (src/utils/eval/det_metrics.py, conf 0.001) —
+     Ultralytics val would run fixed-shape exports on square 640×640 batches instead
+   - jitter: GhostInfuser track jitter + raw detection jitter on the val frames (seq-0006, in order)
+   - latency per frame (batch 1) and model size
+   → logs/quant/report_<imgsz>.json
+
+Note: the v1.1_clean split only has val (seq-0006), so by default calibration and evaluation
+share frames (reported as calib_overlap, with a warning); pass --calib-dir with frames from
+another sequence for a clean split, --calib-step N calibrates on every N-th frame only.
+
+Usage:
+  python -m src.model.quantize --calib-frames 128
+  python -m src.model.quantize --imgsz 640 640 --keep-head-fp32 0
+"""
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+from typing import List
+
+import cv2
+import numpy as np
+
+from src.model.backends import WEIGHTS, OnnxRuntimeBackend, UltralyticsBackend, letterbox_batch
+from src.model.ghost_infuser import GhostInfuser, smooth_sequence
+from src.utils.eval.det_metrics import evaluate, load_names, load_yolo_labels
+from src.utils.eval.mot_metrics import track_jitter
+from src.utils.kitti_io import KITTI_IMGSZ
+
+DATA_YAML = "data/kitti_yolo_v1.1_clean/kitti_ghostdet_v1.1_clean.yaml"
+VAL_DIR = Path("data/kitti_yolo_v1.1_clean/images/val")
+OUT_DIR = Path("logs/quant")
+VAL_CONF = 0.001        # mAP confidence floor (as Ultralytics val)
+
+
+def calibration_images(img_dir: Path = VAL_DIR, n: int = 128, step: int = 1) -> List[Path]:
+    return sorted(img_dir.glob("*.jpg"))[::step][:n]
+
+
+def make_calibration_reader(paths: List[Path], input_name: str, imgsz: tuple):
+    """onnxruntime CalibrationDataReader over letterboxed frames (one frame per batch)."""
+    from onnxruntime.quantization import CalibrationDataReader
+
+    class KittiCalibrationReader(CalibrationDataReader):
+        def __init__(self):
+            self._iter = iter(paths)
+
+        def get_next(self):
+            path = next(self._iter, None)
+            if path is None:
+                return None
+            batch, _ = letterbox_batch([cv2.imread(str(path))], imgsz)
+            return {input_name: batch}
+
+        def rewind(self):
+            self._iter = iter(paths)
+
+    return KittiCalibrationReader()
+
+
+def head_nodes(onnx_path: Path) -> List[str]:
+    """Node names of the last /model.N/ block (YOLOv8 Detect head)."""
+    import onnx
+
+    names = [node.name for node in onnx.load(str(onnx_path)).graph.node]
+    blocks = [int(m.group(1)) for n in names if (m := re.match(r"/model\.(\d+)/", n))]
+    if not blocks:
+        return []
+    prefix = f"/model.{max(blocks)}/"
+    return [n for n in names if n.startswith(prefix)]
+
+
+def quantize_onnx(
+    fp32_path: Path,
+    int8_path: Path,
+    calib_paths: List[Path],
+    imgsz: tuple,
+    keep_head_fp32: bool = True
+) -> Path:
+    """Static QDQ quantization of an FP32 ONNX model."""
+    import onnxruntime as ort
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    prep_path = fp32_path.with_name(fp32_path.stem + "_prep.onnx")
+    quant_pre_process(str(fp32_path), str(prep_path))
+    input_name = ort.InferenceSession(str(prep_path), providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    exclude = head_nodes(prep_path) if keep_head_fp32 else []
+    print(f" Calibrating on {len(calib_paths)} frames ({len(exclude)} head nodes kept FP32)")
+    quantize_static(
+        str(prep_path), str(int8_path),
+        make_calibration_reader(calib_paths, input_name, imgsz),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        calibrate_method=CalibrationMethod.MinMax,
+        nodes_to_exclude=exclude,
+    )
+    prep_path.unlink(missing_ok=True)
+    return int8_path
+
+
+def evaluate_backend(backend, images: List[np.ndarray]) -> dict:
+    """Batch-1 latency + jitter (raw detections and GhostInfuser tracks) on an ordered frame list."""
+    backend.predict(images[:1])  # warm-up
+    dets, times = [], np.empty(len(images))
+    for i, img in enumerate(images):
+        t0 = time.perf_counter()
+        dets.append(backend.predict([img])[0])
+        times[i] = (time.perf_counter() - t0) * 1000
+    cars = [d[d[:, 5] == 0] for d in dets]
+    smooth = GhostInfuser()
+    return {
+        "latency_p50_ms": float(np.percentile(times, 50)),
+        "latency_p95_ms": float(np.percentile(times, 95)),
+        "jitter_raw": track_jitter(smooth_sequence(cars, method="window", lag=0)),   # linked, unsmoothed
+        "jitter_ghostdet": track_jitter([smooth.update(d) for d in cars]),
+        "detections": int(sum(len(d) for d in dets)),
+    }
+
+
+def val_labels(paths: List[Path], frame_hw: tuple, data: str = DATA_YAML) -> List[np.ndarray]:
+    """YOLO val labels of the given frames ([K, 5] → [x1, y1, x2, y2, cls], frame pixels)."""
+    data_dir = Path(data).parent
+    gt = {}
+    for seq in {p.stem.rsplit("_", 1)[0] for p in paths}:
+        gt[seq] = load_yolo_labels(seq, frame_hw, data_dir)
+    return [gt[seq][int(frame)] for seq, frame in (p.stem.rsplit("_", 1) for p in paths)]
+
+
+def val_map(backend, images: List[np.ndarray], gt_frames: List[np.ndarray], nc: int) -> dict:
+    """mAP50 / mAP50-95 through the backend's own letterbox (deployment input shape), conf VAL_CONF."""
+    deploy_conf, backend.conf = backend.conf, VAL_CONF
+    try:
+        dets = [backend.predict([img])[0] for img in images]
+    finally:
+        backend.conf = deploy_conf
+    metrics = evaluate(dets, gt_frames, nc)
+    return {"mAP50": metrics["map50"], "mAP50-95": metrics["map"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8 PTQ for GhostDet with accuracy/jitter/latency report.")
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--imgsz", nargs=2, type=int, default=list(KITTI_IMGSZ), metavar=("H", "W"))
+    parser.add_argument("--calib-dir", type=Path, default=VAL_DIR)
+    parser.add_argument("--calib-frames", type=int, default=128)
+    parser.add_argument("--calib-step", type=int, default=1, help="Use every N-th frame for calibration")
+    parser.add_argument("--keep-head-fp32", type=int, choices=[0, 1], default=1)
+    parser.add_argument("--data", default=DATA_YAML)
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+    imgsz = tuple(args.imgsz)
+
+    # 1) FP32 ONNX (export cached next to best.pt)
+    fp32 = OnnxRuntimeBackend(args.weights, imgsz=imgsz)
+    fp32_path = Path(fp32.path)
+
+    # 2) INT8
+    int8_path = fp32_path.with_name(f"{fp32_path.stem}_int8.onnx")
+    calib = calibration_images(args.calib_dir, args.calib_frames, args.calib_step)
+    quantize_onnx(fp32_path, int8_path, calib, imgsz, bool(args.keep_head_fp32))
+    int8 = OnnxRuntimeBackend(int8_path, imgsz=imgsz)
+
+    # 3) Report (val frames; calibration frames that are also evaluated are called out)
+    val_paths = sorted(VAL_DIR.glob("*.jpg"))
+    frames = [cv2.imread(str(p)) for p in val_paths]
+    gt = val_labels(val_paths, frames[0].shape[:2], args.data)
+    nc = len(load_names(Path(args.data)))
+    overlap = len({p.name for p in calib} & {p.name for p in val_paths})
+    if overlap:
+        print(f" ⚠️ {overlap}/{len(calib)} calibration frames are also evaluated "
+              f"(the split has no train frames) — INT8 accuracy may be optimistic")
+    variants = {
+        "fp32_torch": (UltralyticsBackend(args.weights, imgsz=imgsz), Path(args.weights)),
+        "fp32_onnx": (fp32, fp32_path),
+        "int8_onnx": (int8, int8_path),
+    }
+    report = {"imgsz": imgsz, "calib_frames": len(calib), "calib_overlap": overlap,
+              "keep_head_fp32": bool(args.keep_head_fp32), "map_conf": VAL_CONF}
+    for name, (backend, path) in variants.items():
+        print(f" Evaluating {name} ...")
+        report[name] = {
+            "size_mb": path.stat().st_size / 2 ** 20,
+            **val_map(backend, frames, gt, nc),
+            **evaluate_backend(backend, frames),
+        }
+
+    print(f"\n{'variant':<11} | {'MB':>5} | {'mAP50':>6} | {'mAP50-95':>8} | {'p50 ms':>7} | {'p95 ms':>7} | "
+          f"{'jit raw':>7} | {'jit GD':>6}")
+    print("-" * 80)
+    for name in variants:
+        r = report[name]
+        print(f"{name:<11} | {r['size_mb']:>5.1f} | {r['mAP50']:>6.3f} | {r['mAP50-95']:>8.3f} | "
+              f"{r['latency_p50_ms']:>7.2f} | {r['latency_p95_ms']:>7.2f} | {r['jitter_raw']:>7.3f} | "
+              f"{r['jitter_ghostdet']:>6.3f}")
+    ref, q = report["fp32_torch"], report["int8_onnx"]
+    print(f"\n INT8 vs FP32 best.pt: ΔmAP50 {q['mAP50'] - ref['mAP50']:+.3f}, "
+          f"speed-up ×{ref['latency_p50_ms'] / q['latency_p50_ms']:.2f}, "
+          f"Δjitter (GhostDet) {q['jitter_ghostdet'] - ref['jitter_ghostdet']:+.3f} px/frame")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_path = args.out / f"report_{imgsz[0]}x{imgsz[1]}.json"
+    out_path.write_text(json.dumps(report, indent=2))
+    print(f" Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
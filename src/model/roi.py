@@ -0,0 +1,126 @@
+# src/model/roi.py
+"""
+Region-of-interest inference for GhostDet: skip sky / hood rows that never contain cars.
+- Horizontal band (full width, y0:y1) learned per sequence from the label_02 box distribution
+  (robust quantiles of box tops / bottoms + margin), or placed on the current GhostInfuser
+  tracks (same band height, re-centred every frame; full-frame refresh every N frames).
+- The detector runs on the band only, at a native-aspect input shape for that band
+  (e.g. 128×640 instead of 192×640); boxes are shifted back to full-frame coordinates.
+- Band height is fixed per sequence → fixed input shape, so exported (ONNX/OpenVINO)
+  backends work unchanged.
+
+Usage:
+  band = band_from_labels(find_label_file("0006"), frame_h=375)
+  roi = RoiDetector(load_backend("onnx", imgsz=roi_imgsz(band, 1242)), band, frame_h=375)
+  dets = roi.predict([img])[0]             # full-frame [N, 6]
+  roi.follow(infuser.update(dets))         # optional: band tracks the cars
+"""
+
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.kitti_io import KITTI_IMGSZ, load_label_02, stride_align
+from src.utils.kitti_zip import ZipMember
+
+
+def band_from_labels(
+    label_files: Sequence[Path | ZipMember] | Path | ZipMember,
+    frame_h: int,
+    types: Sequence[str] = ("Car", "Van"),
+    quantiles: Tuple[float, float] = (0.01, 0.99),
+    margin: float = 0.05
+) -> Tuple[int, int]:
+    """
+    Learn a (y0, y1) row band from label_02 boxes: [q_lo(top), q_hi(bottom)] ± margin·frame_h.
+    """
+    if isinstance(label_files, (str, Path, ZipMember)):     # one file (a ZipMember is a tuple)
+        label_files = [label_files]
+    boxes = np.concatenate([
+        b for f in label_files for b in load_label_02(f, types=types) if len(b)
+    ] or [np.empty((0, 5))])
+    if not len(boxes):
+        return 0, frame_h
+    top = np.quantile(boxes[:, 1], quantiles[0]) - margin * frame_h
+    bottom = np.quantile(boxes[:, 3], quantiles[1]) + margin * frame_h
+    return max(0, int(np.floor(top))), min(frame_h, int(np.ceil(bottom)))
+
+
+def roi_imgsz(band: Tuple[int, int], frame_w: int, width: int = KITTI_IMGSZ[1]) -> tuple:
+    """Stride-aligned (h, w) detector input for a full-width band at the usual scale."""
+    y0, y1 = band
+    return stride_align((round((y1 - y0) * width / frame_w), width))
+
+
+class RoiDetector:
+    """Wraps a DetectorBackend; detects inside a horizontal band and remaps to full frame."""
+
+    def __init__(
+        self,
+        backend,
+        band: Tuple[int, int],
+        frame_h: int,
+        full_backend=None,
+        refresh: int = 0,
+        margin_px: int = 16
+    ):
+        """
+        Args:
+            backend: DetectorBackend built with imgsz=roi_imgsz(band, frame_w).
+            band: Initial (y0, y1) rows (also fixes the band height).
+            frame_h: Full frame height (for clipping the band when it follows tracks).
+            full_backend: Full-frame backend for periodic refresh (new objects outside the band).
+            refresh: Every N-th frame runs on full_backend (0 = never).
+            margin_px: Rows kept above/below the tracks when following them.
+        """
+        self.backend = backend
+        self.band = (int(band[0]), int(band[1]))
+        self.height = self.band[1] - self.band[0]
+        self.frame_h = frame_h
+        self.refresh = refresh
+        self.margin_px = margin_px
+        self.full_backend = full_backend
+        self.frames = 0
+        self.rows_processed = 0
+        self.rows_total = 0
+
+    def follow(self, tracks: np.ndarray):
+        """Re-centre the band on the current tracks ([N, ≥4] xyxy); no tracks → keep the band."""
+        if not len(tracks):
+            return
+        top = tracks[:, 1].min() - self.margin_px
+        bottom = tracks[:, 3].max() + self.margin_px
+        centre = (top + bottom) / 2
+        y0 = int(np.clip(round(centre - self.height / 2), 0, self.frame_h - self.height))
+        self.band = (y0, y0 + self.height)
+
+    def predict(self, images: Sequence[np.ndarray]) -> List[np.ndarray]:
+        self.frames += 1
+        self.rows_total += sum(img.shape[0] for img in images)
+        if self.refresh and self.full_backend is not None and self.frames % self.refresh == 0:
+            self.rows_processed += sum(img.shape[0] for img in images)
+            return self.full_backend.predict(images)
+
+        y0, y1 = self.band
+        dets = self.backend.predict([img[y0:y1] for img in images])
+        self.rows_processed += (y1 - y0) * len(images)
+        for d in dets:
+            d[:, [1, 3]] += y0
+        return dets
+
+    def __call__(self, images: Sequence[np.ndarray]) -> List[np.ndarray]:
+        return self.predict(images)
+
+    @property
+    def row_share(self) -> float:
+        """Fraction of image rows sent to the detector so far."""
+        return self.rows_processed / max(self.rows_total, 1)
+
+
+def roi_filter(dets: np.ndarray, band: Tuple[int, int], min_overlap: float = 0.5) -> np.ndarray:
+    """Keep [N, ≥4] boxes whose vertical overlap with the band is at least min_overlap of their height."""
+    y0, y1 = band
+    h = np.maximum(dets[:, 3] - dets[:, 1], 1e-6)
+    overlap = np.clip(np.minimum(dets[:, 3], y1) - np.maximum(dets[:, 1], y0), 0, None)
+    return dets[overlap / h >= min_overlap]
@@ -0,0 +1,150 @@
+# src/model/tiles.py
+"""
+Tiled inference at native KITTI resolution for small / distant objects.
+- The 1242×375 frame is cut into a rows × cols grid of overlapping crops (overlap = share of
+  the tile size); each crop is fed at --scale of its native size (1.0 = no downscaling)
+  through a backend built for the stride-aligned tile input shape (tile_imgsz()), so
+  exported (ONNX/OpenVINO) backends work unchanged.
+- Optional global tile: the whole frame letterboxed into the same input shape (large objects
+  cut by every tile border are still seen whole).
+- All tiles of all frames passed to predict() go through the backend as one batch.
+- Merge: boxes shifted to frame coordinates, then one class-aware greedy NMS per frame on
+  precomputed IoU and intersection-over-smaller (IoS) matrices — IoS removes the partial
+  box a tile border leaves next to the full box from the neighbouring tile.
+
+Usage:
+  tiles, imgsz = tile_grid((375, 1242), grid=(1, 3), overlap=0.2)
+  tiler = TileDetector(load_backend("onnx", imgsz=imgsz), grid=(1, 3), overlap=0.2)
+  dets = tiler.predict(frames)              # per-frame [N, 6] in full-frame pixels
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.model.backends import MAX_WH
+from src.utils.kitti_io import stride_align
+
+
+def tile_grid(
+    frame_hw: Tuple[int, int],
+    grid: Tuple[int, int] = (1, 3),
+    overlap: float = 0.2,
+    scale: float = 1.0
+) -> Tuple[np.ndarray, tuple]:
+    """
+    Overlapping tiles covering the frame.
+
+    Returns:
+        tiles: [T, 4] int → [x0, y0, x1, y1] crop boxes (row-major)
+        imgsz: stride-aligned (h, w) detector input for one tile at `scale`
+    """
+    if not 0 <= overlap < 1:
+        raise ValueError(f"overlap must be in [0, 1), got {overlap}")
+    h, w = frame_hw
+    rows, cols = grid
+    th = min(h, int(np.ceil(h / (rows - (rows - 1) * overlap))))
+    tw = min(w, int(np.ceil(w / (cols - (cols - 1) * overlap))))
+    ys = np.linspace(0, h - th, rows).round().astype(int)
+    xs = np.linspace(0, w - tw, cols).round().astype(int)
+    y0, x0 = np.meshgrid(ys, xs, indexing="ij")
+    tiles = np.stack([x0.ravel(), y0.ravel(), x0.ravel() + tw, y0.ravel() + th], axis=1)
+    return tiles, stride_align((round(th * scale), round(tw * scale)))
+
+
+def merge_detections(
+    dets: np.ndarray, iou: float = 0.5, ios: float = 0.8, max_det: int = 300
+) -> np.ndarray:
+    """
+    Class-aware greedy NMS over [N, 6] frame-level detections; a box is suppressed by a
+    higher-scoring one when IoU > iou or intersection / smaller area > ios.
+    """
+    if len(dets) < 2:
+        return dets
+    dets = dets[np.argsort(-dets[:, 4], kind="stable")]
+    boxes = dets[:, :4] + dets[:, 5:6] * MAX_WH
+    x1 = np.maximum(boxes[:, None, 0], boxes[None, :, 0])
+    y1 = np.maximum(boxes[:, None, 1], boxes[None, :, 1])
+    x2 = np.minimum(boxes[:, None, 2], boxes[None, :, 2])
+    y2 = np.minimum(boxes[:, None, 3], boxes[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    over = inter / np.maximum(area[:, None] + area[None, :] - inter, 1e-9) > iou
+    over |= inter / np.maximum(np.minimum(area[:, None], area[None, :]), 1e-9) > ios
+
+    suppressed = np.zeros(len(dets), dtype=bool)
+    keep = []
+    for i in range(len(dets)):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        if len(keep) >= max_det:
+            break
+        suppressed |= over[i]
+    return dets[keep]
+
+
+class TileDetector:
+    """Wraps a DetectorBackend built with imgsz from tile_grid(); predicts on tiles, merges per frame."""
+
+    def __init__(
+        self,
+        backend,
+        grid: Tuple[int, int] = (1, 3),
+        overlap: float = 0.2,
+        scale: float = 1.0,
+        global_tile: bool = True,
+        iou: float = 0.5,
+        ios: float = 0.8
+    ):
+        """
+        Args:
+            backend: DetectorBackend with imgsz = tile_grid(frame_hw, grid, overlap, scale)[1].
+            grid: (rows, cols) tiles per frame.
+            overlap: Overlap between neighbouring tiles (share of the tile size).
+            scale: Tile input scale relative to native resolution.
+            global_tile: Also detect on the whole (downscaled) frame in the same batch.
+            iou, ios: Cross-tile merge thresholds (see merge_detections).
+        """
+        self.backend = backend
+        self.grid = tuple(grid)
+        self.overlap = overlap
+        self.scale = scale
+        self.global_tile = global_tile
+        self.iou = iou
+        self.ios = ios
+        self._tiles: Dict[tuple, np.ndarray] = {}     # frame (h, w) → tile boxes
+
+    def tiles(self, frame_hw: Tuple[int, int]) -> np.ndarray:
+        """[T, 4] crop boxes for a frame size (KITTI sequences differ by a few pixels)."""
+        if frame_hw not in self._tiles:
+            self._tiles[frame_hw] = tile_grid(frame_hw, self.grid, self.overlap, self.scale)[0]
+        return self._tiles[frame_hw]
+
+    @property
+    def tiles_per_frame(self) -> int:
+        return self.grid[0] * self.grid[1] + self.global_tile
+
+    def predict(self, images: Sequence[np.ndarray]) -> List[np.ndarray]:
+        crops, offsets = [], []
+        for img in images:
+            tiles = self.tiles(img.shape[:2])
+            crops += [img[y0:y1, x0:x1] for x0, y0, x1, y1 in tiles]
+            offsets.append(tiles[:, :2])
+            if self.global_tile:
+                crops.append(img)
+        dets = self.backend.predict(crops)
+
+        out, k = [], 0
+        for off in offsets:
+            n = len(off) + self.global_tile
+            frame = dets[k:k + n]
+            for d, (x0, y0) in zip(frame, off):
+                d[:, [0, 2]] += x0
+                d[:, [1, 3]] += y0
+            out.append(merge_detections(np.concatenate(frame).reshape(-1, 6), self.iou, self.ios))
+            k += n
+        return out
+
+    def __call__(self, images: Sequence[np.ndarray]) -> List[np.ndarray]:
+        return self.predict(images)
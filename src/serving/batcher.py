@@ -0,0 +1,177 @@
+# src/serving/batcher.py
+"""
+Dynamic micro-batching scheduler between frame producers and the detector.
+- Requests queue up until `max_batch` is reached or the oldest request's deadline expires,
+  then run as ONE call of `fn(items) -> results` (worker thread) and are scattered back
+  to their callers' futures.
+- Deadline = arrival of the oldest request + min(max_wait_ms, latency_slo_ms - expected run time);
+  the run-time estimate is an EMA over recent batches, so the SLO covers queueing + inference.
+- Metrics: achieved batch sizes, queue delay per request, run time per batch, flush reasons.
+
+Usage:
+  batcher = MicroBatcher(detect_fn, max_batch=8, max_wait_ms=10, latency_slo_ms=100)
+  async with batcher:
+      result, info = await batcher.submit(frame)
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+
+class BatchInfo(NamedTuple):
+    """Per-request scheduling info returned alongside each result."""
+    size: int          # batch the request ran in
+    queue_ms: float    # arrival → batch start
+    run_ms: float      # batch execution time
+
+
+class BatchMetrics:
+    """Batch sizes, queue delays (per request) and run times (per batch)."""
+
+    def __init__(self):
+        self.sizes: List[int] = []
+        self.queue_ms: List[float] = []
+        self.run_ms: List[float] = []
+        self.flush: Dict[str, int] = {"full": 0, "deadline": 0}
+
+    def summary(self) -> dict:
+        if not self.sizes:
+            return {"batches": 0, "requests": 0}
+        sizes = np.array(self.sizes)
+        queue = np.array(self.queue_ms)
+        run = np.array(self.run_ms)
+        return {
+            "batches": int(len(sizes)),
+            "requests": int(sizes.sum()),
+            "batch_mean": float(sizes.mean()),
+            "batch_hist": np.bincount(sizes).tolist(),
+            "queue_p50": float(np.percentile(queue, 50)),
+            "queue_p95": float(np.percentile(queue, 95)),
+            "run_mean": float(run.mean()),
+            "run_per_frame": float(run.sum() / sizes.sum()),
+            **{f"flush_{k}": v for k, v in self.flush.items()},
+        }
+
+    def print_summary(self, name: str = "batcher"):
+        s = self.summary()
+        if not s["batches"]:
+            return
+        print(f"\n=== {name}: {s['requests']} requests in {s['batches']} batches ===")
+        print(f" Batch size:  mean {s['batch_mean']:.2f}  (full: {s['flush_full']}, deadline: {s['flush_deadline']})")
+        print(f" Queue delay: p50 {s['queue_p50']:.2f} ms  p95 {s['queue_p95']:.2f} ms")
+        print(f" Run time:    {s['run_mean']:.2f} ms/batch  ({s['run_per_frame']:.2f} ms/frame)")
+
+
+class MicroBatcher:
+    """Collects requests into batches for `fn` under a batch-size cap and a latency deadline."""
+
+    def __init__(
+        self,
+        fn: Callable[[list], list],
+        max_batch: int = 8,
+        max_wait_ms: float = 10.0,
+        latency_slo_ms: Optional[float] = None,
+        run_ema: float = 0.2
+    ):
+        """
+        Args:
+            fn: Batch function (list of items → list of results, same order); runs in a worker thread.
+            max_batch: Batch-size cap.
+            max_wait_ms: Longest the oldest queued request waits for the batch to fill.
+            latency_slo_ms: Optional queue + run target; shortens the wait by the expected run time.
+            run_ema: EMA weight of the newest batch in the run-time estimate.
+        """
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.latency_slo = latency_slo_ms / 1000 if latency_slo_ms is not None else None
+        self.run_ema = run_ema
+        self.metrics = BatchMetrics()
+        self._run_est = 0.0
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    # ── Lifecycle ────────────────────────────────────────────
+    def start(self):
+        """Start the scheduling task (needs a running event loop)."""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self) -> "MicroBatcher":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+        return False
+
+    # ── Requests ─────────────────────────────────────────────
+    def submit_nowait(self, item) -> asyncio.Future:
+        """Enqueue immediately (FIFO); the future resolves to (result, BatchInfo)."""
+        self.start()
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, time.perf_counter(), fut))
+        return fut
+
+    async def submit(self, item):
+        """Enqueue and wait → (result, BatchInfo)."""
+        return await self.submit_nowait(item)
+
+    # ── Scheduling loop ──────────────────────────────────────
+    def _wait_budget(self) -> float:
+        if self.latency_slo is None:
+            return self.max_wait
+        return max(0.0, min(self.max_wait, self.latency_slo - self._run_est))
+
+    async def _loop(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = batch[0][1] + self._wait_budget()
+            while len(batch) < self.max_batch:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.metrics.flush["full" if len(batch) >= self.max_batch else "deadline"] += 1
+
+            t0 = time.perf_counter()
+            try:
+                results = await asyncio.to_thread(self.fn, [item for item, _, _ in batch])
+            except Exception as e:
+                for *_, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            run = time.perf_counter() - t0
+            self._run_est = run if not self.metrics.run_ms else (
+                self.run_ema * run + (1 - self.run_ema) * self._run_est
+            )
+
+            run_ms = run * 1000
+            self.metrics.sizes.append(len(batch))
+            self.metrics.run_ms.append(run_ms)
+            for (_, t_in, fut), result in zip(batch, results):
+                queue_ms = (t0 - t_in) * 1000
+                self.metrics.queue_ms.append(queue_ms)
+                if not fut.done():
+                    fut.set_result((result, BatchInfo(len(batch), queue_ms, run_ms)))
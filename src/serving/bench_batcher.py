@@ -0,0 +1,120 @@
+# src/serving/bench_batcher.py
+"""
+MicroBatcher trade-off benchmark at the KITTI 640×192 input size.
+- Seq-0006 frames are decoded + resized to 640×192 once (decode is not part of the measurement).
+- Open-loop Poisson arrivals at each --rates value (frames/s, all producers combined).
+- Every (max_batch, max_wait_ms) pair is run against the same arrival schedule.
+- Reports end-to-end latency p50/p95/p99, SLO misses, achieved batch size and throughput;
+  writes logs/serving/batcher_bench.csv.
+
+Usage:
+  python -m src.serving.bench_batcher --rates 20 40 80 --batches 1 2 4 8 16 --waits 5 20 50
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import time
+from pathlib import Path
+from typing import List
+
+import cv2
+import numpy as np
+
+from src.model.ghost_infuser import results_to_dets
+from src.serving.batcher import MicroBatcher
+from src.utils.kitti_io import KITTI_ROOT, list_frames, read_images
+
+WEIGHTS = "runs/detect/ghostdet_local2/weights/best.pt"
+OUT_PATH = Path("logs/serving/batcher_bench.csv")
+FRAME_W, FRAME_H = 640, 192
+
+
+async def run_config(batcher: MicroBatcher, images: List[np.ndarray], arrivals: np.ndarray) -> np.ndarray:
+    """Submit images[i % len] at arrivals[i] (s from start); returns end-to-end latency (ms)."""
+    latency = np.empty(len(arrivals))
+
+    async def wait(i: int, fut: asyncio.Future, t_sub: float):
+        await fut
+        latency[i] = (time.perf_counter() - t_sub) * 1000
+
+    loop = asyncio.get_running_loop()
+    async with batcher:
+        t_start = loop.time()
+        waiters = []
+        for i, t in enumerate(arrivals):
+            await asyncio.sleep(max(0.0, t_start + t - loop.time()))
+            waiters.append(asyncio.create_task(
+                wait(i, batcher.submit_nowait(images[i % len(images)]), time.perf_counter())
+            ))
+        await asyncio.gather(*waiters)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MicroBatcher batch-size / latency trade-off.")
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--seq", default="0006")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--rates", nargs="+", type=float, default=[20.0, 40.0, 80.0],
+                        help="Arrival rates (frames/s, all producers)")
+    parser.add_argument("--batches", nargs="+", type=int, default=[1, 2, 4, 8, 16])
+    parser.add_argument("--waits", nargs="+", type=float, default=[5.0, 20.0, 50.0], help="max_wait_ms values")
+    parser.add_argument("--slo-ms", type=float, default=100.0, help="Latency target for the miss rate")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per configuration")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=OUT_PATH)
+    args = parser.parse_args()
+
+    from ultralytics import YOLO
+
+    paths = list_frames(args.seq, args.root)[:64]
+    images = [cv2.resize(img, (FRAME_W, FRAME_H)) for img in read_images(paths)]
+    print(f" Loading model: {args.weights}")
+    model = YOLO(args.weights)
+
+    def detect(batch: List[np.ndarray]) -> List[np.ndarray]:
+        return [results_to_dets(r) for r in model.predict(batch, imgsz=FRAME_W, verbose=False)]
+
+    detect(images[:max(args.batches)])  # warm-up (largest batch shape)
+
+    rng = np.random.default_rng(args.seed)
+    rows = []
+    print(f"\n{'rate':>5} | {'batch':>5} | {'wait':>5} | {'mean b':>6} | {'p50':>7} | {'p95':>7} | "
+          f"{'p99':>7} | {'miss%':>6} | {'fps':>6}")
+    print("-" * 76)
+    for rate in args.rates:
+        arrivals = np.cumsum(rng.exponential(1.0 / rate, size=args.requests))
+        for max_batch, wait in itertools.product(args.batches, args.waits):
+            if max_batch == 1 and wait != args.waits[0]:
+                continue  # wait is irrelevant without batching
+            batcher = MicroBatcher(detect, max_batch=max_batch, max_wait_ms=wait)
+            t0 = time.perf_counter()
+            lat = asyncio.run(run_config(batcher, images, arrivals))
+            elapsed = time.perf_counter() - t0
+            s = batcher.metrics.summary()
+            p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+            row = {
+                "rate": rate, "max_batch": max_batch, "max_wait_ms": wait,
+                "batch_mean": round(s["batch_mean"], 3),
+                "p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2),
+                "slo_miss_pct": round(float(np.mean(lat > args.slo_ms)) * 100, 2),
+                "queue_p95_ms": round(s["queue_p95"], 2),
+                "run_ms_per_frame": round(s["run_per_frame"], 2),
+                "throughput_fps": round(len(lat) / elapsed, 2),
+            }
+            rows.append(row)
+            print(f"{rate:>5.0f} | {max_batch:>5d} | {wait:>5.0f} | {row['batch_mean']:>6.2f} | {p50:>7.1f} | "
+                  f"{p95:>7.1f} | {p99:>7.1f} | {row['slo_miss_pct']:>6.1f} | {row['throughput_fps']:>6.1f}")
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.out, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\n Saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
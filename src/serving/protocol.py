@@ -0,0 +1,52 @@
+# src/serving/protocol.py
+"""
+Wire format shared by the GhostDet server and clients (asyncio streams).
+
+Every message, in both directions:
+  !II header  → (json_len, payload_len), big-endian uint32
+  json_len    bytes of UTF-8 JSON (message header)
+  payload_len bytes of payload
+
+Requests  (client → server):
+  header  {"stream": "cam0", "frame": 12, "reset": false}
+  payload encoded image bytes (PNG / JPEG, as read from disk)
+
+Responses (server → client), in request order per connection:
+  header  {"stream", "frame", "n", "batch", "queue_ms", "infer_ms"}  (or {"error": "..."})
+  payload float32 [n, 7] → [x1, y1, x2, y2, conf, cls, track_id]
+"""
+
+import asyncio
+import json
+import struct
+from typing import Tuple
+
+import numpy as np
+
+PREFIX = struct.Struct("!II")
+MAX_MESSAGE_BYTES = 64 << 20
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def encode_message(header: dict, payload: bytes = b"") -> bytes:
+    head = json.dumps(header, separators=(",", ":")).encode()
+    return PREFIX.pack(len(head), len(payload)) + head + payload
+
+
+async def read_message(reader: asyncio.StreamReader) -> Tuple[dict, bytes]:
+    """Read one message; raises asyncio.IncompleteReadError on EOF."""
+    head_len, payload_len = PREFIX.unpack(await reader.readexactly(PREFIX.size))
+    if head_len + payload_len > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Message too large: {head_len + payload_len} bytes")
+    header = json.loads(await reader.readexactly(head_len))
+    payload = await reader.readexactly(payload_len) if payload_len else b""
+    return header, payload
+
+
+def tracks_to_bytes(tracks: np.ndarray) -> bytes:
+    return np.ascontiguousarray(tracks, dtype=np.float32).tobytes()
+
+
+def tracks_from_bytes(payload: bytes) -> np.ndarray:
+    return np.frombuffer(payload, dtype=np.float32).reshape(-1, 7)
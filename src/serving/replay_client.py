@@ -0,0 +1,121 @@
+# src/serving/replay_client.py
+"""
+Replay client / load test for the GhostDet server.
+- N fake cameras, one connection each, streaming KITTI PNGs (as-is bytes) at a fixed FPS.
+- Frames are sent on schedule without waiting for replies (pipelined); a reader task
+  per camera measures round-trip latency.
+- Reports latency p50/p95/p99, throughput, late replies (> one frame period)
+  and the server-side batch size / queue delay carried in each reply.
+
+Usage:
+  python -m src.serving.server &
+  python -m src.serving.replay_client --cameras 4 --fps 10 --seq 0006
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from src.serving.protocol import DEFAULT_HOST, DEFAULT_PORT, encode_message, read_message, tracks_from_bytes
+from src.utils.kitti_io import KITTI_ROOT, list_frames
+
+
+async def run_camera(
+    cam: str,
+    frames: List[bytes],
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    fps: float = 10.0,
+    phase: float = 0.0
+) -> dict:
+    """Stream `frames` at `fps`; returns per-frame latencies and server metadata."""
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+    sent = np.zeros(len(frames))
+    latency_ms = np.full(len(frames), np.nan)
+    batch, queue_ms, n_tracks, errors = [], [], 0, 0
+
+    async def receive():
+        nonlocal n_tracks, errors
+        for _ in range(len(frames)):
+            header, payload = await read_message(reader)
+            i = header["frame"]
+            latency_ms[i] = (time.perf_counter() - sent[i]) * 1000
+            if "error" in header:
+                errors += 1
+                continue
+            n_tracks += len(tracks_from_bytes(payload))
+            batch.append(header["batch"])
+            queue_ms.append(header["queue_ms"])
+
+    receiver = asyncio.create_task(receive())
+    period = 1.0 / fps
+    t_start = loop.time() + phase
+    for i, data in enumerate(frames):
+        await asyncio.sleep(max(0.0, t_start + i * period - loop.time()))
+        sent[i] = time.perf_counter()
+        writer.write(encode_message({"stream": cam, "frame": i, "reset": i == 0}, data))
+        await writer.drain()
+    await receiver
+    writer.close()
+    await writer.wait_closed()
+    return {"cam": cam, "latency_ms": latency_ms, "batch": batch, "queue_ms": queue_ms,
+            "detections": n_tracks, "errors": errors}
+
+
+async def run_load_test(frames: List[bytes], cameras: int, fps: float, host: str, port: int) -> List[dict]:
+    # Stagger camera phases across one frame period
+    period = 1.0 / fps
+    return await asyncio.gather(*(
+        run_camera(f"cam{c}", frames, host, port, fps, phase=c * period / cameras)
+        for c in range(cameras)
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream KITTI frames from fake cameras to the GhostDet server.")
+    parser.add_argument("--seq", default="0006")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--cameras", type=int, default=4)
+    parser.add_argument("--fps", type=float, default=10.0, help="Frames per second per camera")
+    parser.add_argument("--frames", type=int, default=None, help="Frames per camera (default: whole sequence)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    paths = list_frames(args.seq, args.root)[:args.frames]
+    frames = [p.read_bytes() for p in paths]
+    print(f" {args.cameras} cameras × {len(frames)} frames of seq-{args.seq} @ {args.fps:g} FPS "
+          f"→ {args.host}:{args.port}")
+
+    t0 = time.perf_counter()
+    stats = asyncio.run(run_load_test(frames, args.cameras, args.fps, args.host, args.port))
+    elapsed = time.perf_counter() - t0
+
+    period_ms = 1000 / args.fps
+    print(f"\n{'camera':<8} | {'p50':>8} | {'p95':>8} | {'p99':>8} | {'late':>5} | {'err':>4}")
+    print("-" * 52)
+    for s in stats:
+        lat = s["latency_ms"]
+        p50, p95, p99 = np.nanpercentile(lat, [50, 95, 99])
+        late = int(np.sum(lat > period_ms))
+        print(f"{s['cam']:<8} | {p50:>8.1f} | {p95:>8.1f} | {p99:>8.1f} | {late:>5d} | {s['errors']:>4d}")
+
+    lat = np.concatenate([s["latency_ms"] for s in stats])
+    batch = np.concatenate([s["batch"] for s in stats]) if any(s["batch"] for s in stats) else np.zeros(1)
+    queue = np.concatenate([s["queue_ms"] for s in stats]) if any(s["queue_ms"] for s in stats) else np.zeros(1)
+    p50, p95, p99 = np.nanpercentile(lat, [50, 95, 99])
+    print(f"\n All cameras: latency p50={p50:.1f}  p95={p95:.1f}  p99={p99:.1f} ms "
+          f"(late > {period_ms:.0f} ms: {np.mean(lat > period_ms) * 100:.1f}%)")
+    print(f" Throughput:  {len(lat) / elapsed:.1f} frames/s over {elapsed:.1f} s")
+    print(f" Server:      mean batch {batch.mean():.2f}, queue delay p50={np.percentile(queue, 50):.1f} "
+          f"p95={np.percentile(queue, 95):.1f} ms")
+    print(f" Detections:  {sum(s['detections'] for s in stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# src/serving/server.py
+"""
+GhostDet multi-camera inference server (asyncio, localhost TCP).
+- Many concurrent streams (one connection per camera, frames pipelined).
+- Frames from all streams are micro-batched into one YOLO call by MicroBatcher
+  (src/serving/batcher.py): flush at --max-batch frames, after --max-wait-ms, or
+  early enough to meet --latency-slo-ms.
+- Detector: any src/model/backends.py backend (--backend torch | onnx | openvino).
+- One GhostInfuser per stream ID → smoothed detections + track IDs.
+- Responses are returned in request order per connection (wire format: src/serving/protocol.py).
+
+Usage:
+  python -m src.serving.server --max-batch 8 --max-wait-ms 10 --latency-slo-ms 100
+  python -m src.serving.replay_client --cameras 4 --fps 10      # load test
+"""
+
+import argparse
+import asyncio
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from src.model.backends import BACKENDS, WEIGHTS, DetectorBackend, load_backend
+from src.model.ghost_infuser import GhostInfuser
+from src.serving.batcher import MicroBatcher
+from src.serving.protocol import DEFAULT_HOST, DEFAULT_PORT, encode_message, read_message, tracks_to_bytes
+from src.utils.kitti_io import KITTI_IMGSZ
+
+
+class GhostDetServer:
+    """Micro-batching detector front-end with per-stream GhostInfuser state."""
+
+    def __init__(
+        self,
+        backend: DetectorBackend,
+        max_batch: int = 8,
+        max_wait_ms: float = 10.0,
+        latency_slo_ms: float | None = None,
+        infuser_kwargs: dict | None = None
+    ):
+        self.backend = backend
+        self.batcher = MicroBatcher(self._infer, max_batch, max_wait_ms, latency_slo_ms)
+        self.infuser_kwargs = infuser_kwargs or {}
+        self.infusers: Dict[str, GhostInfuser] = {}
+
+    # ── Inference (worker thread) ────────────────────────────
+    def _infer(self, payloads: List[bytes]) -> List[np.ndarray | None]:
+        """Decode + one batched YOLO call → per-frame [N, 6] detections (None = undecodable)."""
+        images = [cv2.imdecode(np.frombuffer(p, np.uint8), cv2.IMREAD_COLOR) for p in payloads]
+        dets = iter(self.backend.predict([img for img in images if img is not None]))
+        return [next(dets) if img is not None else None for img in images]
+
+    def _infuser(self, header: dict) -> GhostInfuser:
+        stream = str(header.get("stream", "default"))
+        if header.get("reset") or stream not in self.infusers:
+            self.infusers[stream] = GhostInfuser(**self.infuser_kwargs)
+        return self.infusers[stream]
+
+    # ── Connections ──────────────────────────────────────────
+    async def _send_loop(self, pending: asyncio.Queue, writer: asyncio.StreamWriter):
+        while (item := await pending.get()) is not None:
+            header, fut = item
+            reply = {"stream": header.get("stream"), "frame": header.get("frame")}
+            try:
+                dets, info = await fut
+                if dets is None:
+                    raise ValueError("could not decode image payload")
+                # Tracker update here: replies (and updates) follow request order per connection
+                tracks = self._infuser(header).update(dets)
+                meta = {"batch": info.size, "queue_ms": round(info.queue_ms, 3), "infer_ms": round(info.run_ms, 3)}
+                writer.write(encode_message({**reply, "n": len(tracks), **meta}, tracks_to_bytes(tracks)))
+            except Exception as e:
+                writer.write(encode_message({**reply, "error": str(e)}))
+            await writer.drain()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        pending: asyncio.Queue = asyncio.Queue()
+        sender = asyncio.create_task(self._send_loop(pending, writer))
+        n = 0
+        try:
+            while True:
+                header, payload = await read_message(reader)
+                pending.put_nowait((header, self.batcher.submit_nowait(payload)))
+                n += 1
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            pending.put_nowait(None)
+            try:
+                await sender
+            except ConnectionError:
+                pass
+            writer.close()
+            print(f" {peer} disconnected after {n} frames "
+                  f"(server mean batch: {self.batcher.metrics.summary().get('batch_mean', 0):.2f})")
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        b = self.batcher
+        server = await asyncio.start_server(self.handle_client, host, port)
+        slo = f", SLO {b.latency_slo * 1000:.0f} ms" if b.latency_slo is not None else ""
+        print(f" GhostDet server on {host}:{port} "
+              f"(max batch {b.max_batch}, max wait {b.max_wait * 1000:.0f} ms{slo})")
+        async with b, server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GhostDet micro-batching inference server.")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="torch")
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=8, help="Frames per detector call (cap)")
+    parser.add_argument("--max-wait-ms", type=float, default=10.0, help="Max wait for a batch to fill")
+    parser.add_argument("--latency-slo-ms", type=float, default=None,
+                        help="Queue + inference target; flushes early by the expected run time")
+    parser.add_argument("--imgsz", nargs=2, type=int, default=list(KITTI_IMGSZ), metavar=("H", "W"))
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--classes", nargs="+", type=int, default=[0])
+    parser.add_argument("--alpha", type=float, default=0.6)
+    parser.add_argument("--motion", action="store_true")
+    args = parser.parse_args()
+
+    print(f" Loading {args.backend} backend: {args.weights}")
+    backend = load_backend(args.backend, args.weights, imgsz=args.imgsz, conf=args.conf, classes=args.classes)
+    backend.predict([np.zeros((192, 640, 3), np.uint8)])  # warm-up
+
+    server = GhostDetServer(
+        backend,
+        max_batch=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+        latency_slo_ms=args.latency_slo_ms,
+        infuser_kwargs={"alpha": args.alpha, "motion": args.motion}
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        server.batcher.metrics.print_summary("GhostDet server")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# bench_backends.py
+"""
+Detector backend benchmark on seq-0006 (src/model/backends.py).
+- Model load time (export excluded: exports are created once before timing).
+- Time to first detection (first predict() after load, includes runtime warm-up).
+- Steady-state latency per frame at batch 1 and --batch (p50/p95, FPS).
+- Agreement with the PyTorch path: detection count delta and mean IoU of matched boxes.
+
+Usage:
+  python -m src.utils.checks_balances.bench_backends --backends torch onnx openvino --frames 100
+"""
+
+import argparse
+import csv
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.model.backends import BACKENDS, WEIGHTS, agreement, load_backend
+from src.utils.kitti_io import KITTI_IMGSZ, KITTI_ROOT, list_frames, read_images
+
+OUT_DIR = Path("logs/bench")
+
+
+def time_predict(backend, images: list, batch: int) -> np.ndarray:
+    """Per-frame latency (ms) over all images in chunks of `batch`."""
+    per_frame = []
+    for i in range(0, len(images), batch):
+        chunk = images[i:i + batch]
+        t0 = time.perf_counter()
+        backend.predict(chunk)
+        per_frame.extend([(time.perf_counter() - t0) * 1000 / len(chunk)] * len(chunk))
+    return np.array(per_frame)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GhostDet detector backends on KITTI frames.")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=["torch", "onnx"])
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--seq", default="0006")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--imgsz", nargs=2, type=int, default=list(KITTI_IMGSZ), metavar=("H", "W"))
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    images = read_images(list_frames(args.seq, args.root)[:args.frames])
+    print(f" {len(images)} frames of seq-{args.seq}, imgsz={tuple(args.imgsz)}")
+
+    rows, ref = [], None
+    for name in args.backends:
+        load_backend(name, args.weights, imgsz=args.imgsz)   # export (if needed) outside the timing
+        backend = load_backend(name, args.weights, imgsz=args.imgsz)
+
+        t0 = time.perf_counter()
+        backend.predict(images[:1])
+        first_ms = (time.perf_counter() - t0) * 1000
+
+        lat1 = time_predict(backend, images, 1)
+        latb = time_predict(backend, images, args.batch)
+        dets = backend.predict(images)
+        if ref is None:
+            ref = dets
+        agree = agreement(ref, dets)
+
+        row = {
+            "backend": name,
+            "load_s": round(backend.load_s, 3),
+            "first_det_ms": round(first_ms, 1),
+            "p50_ms_b1": round(float(np.percentile(lat1, 50)), 2),
+            "p95_ms_b1": round(float(np.percentile(lat1, 95)), 2),
+            "fps_b1": round(1000 / lat1.mean(), 1),
+            f"ms_per_frame_b{args.batch}": round(float(latb.mean()), 2),
+            f"fps_b{args.batch}": round(1000 / latb.mean(), 1),
+            "detections": sum(len(d) for d in dets),
+            **agree,
+        }
+        rows.append(row)
+
+    print(f"\n{'backend':<9} | {'load s':>6} | {'1st ms':>7} | {'p50 b1':>7} | {'p95 b1':>7} | {'FPS b1':>6} | "
+          f"{'FPS b' + str(args.batch):>7} | {'dets':>5} | {'Δcount':>6} | {'IoU':>5}")
+    print("-" * 96)
+    for r in rows:
+        print(f"{r['backend']:<9} | {r['load_s']:>6.2f} | {r['first_det_ms']:>7.1f} | {r['p50_ms_b1']:>7.2f} | "
+              f"{r['p95_ms_b1']:>7.2f} | {r['fps_b1']:>6.1f} | {r[f'fps_b{args.batch}']:>7.1f} | "
+              f"{r['detections']:>5d} | {r['count_delta']:>6d} | {r['mean_iou']:>5.3f}")
+    print(f" (agreement vs {rows[0]['backend']})")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_path = args.out / f"backends_{args.seq}.csv"
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f" Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# bench_frame_ring.py
+"""
+Frame transport benchmark for multi-process pipelines (src/utils/frame_ring.py).
+Reader → detector → renderer, one process each, on seq-0006 frames:
+- queue: frames pickled through multiprocessing queues (copied per hop: pickle, pipe
+         write / read, unpickle),
+- shm:   FrameRing — frames written once into shared memory, only FrameRef slot indices
+         go through the queues.
+Sizes: native (1242×375) and kitti (640×192, resized by the reader). Detector: --backend
+(default "none" = passthrough, measures transport only). Renderer: draws the detections and
+hashes the canvas (frame_digest), so both transports must produce identical output.
+--decoded sends pre-decoded frames to the reader (no PNG decode in the loop).
+Reports FPS, ms per frame and speed-up vs queue; → logs/bench/frame_ring_<seq>.csv
+
+Usage:
+  python -m src.utils.checks_balances.bench_frame_ring --frames 300 --decoded
+  python -m src.utils.checks_balances.bench_frame_ring --backend onnx --sizes kitti --slots 4 8
+"""
+
+import argparse
+import csv
+import functools
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.model.backends import WEIGHTS
+from src.utils.chunked_render import combine_digests, frame_digest
+from src.utils.frame_ring import run_pipeline
+from src.utils.kitti_io import KITTI_IMGSZ, KITTI_ROOT, list_frames, read_image, stride_align
+
+OUT_DIR = Path("logs/bench")
+SIZES = {"native": None, "kitti": (KITTI_IMGSZ[1], KITTI_IMGSZ[0])}    # reader resize (w, h)
+
+
+def _no_dets(frame: np.ndarray) -> np.ndarray:
+    return np.empty((0, 6), dtype=np.float32)
+
+
+def make_detector(backend: str, weights: str, imgsz: tuple):
+    """Detector-process factory: frame → [N, 6] detections."""
+    if backend == "none":
+        return _no_dets
+    from src.model.backends import load_backend
+
+    model = load_backend(backend, weights, imgsz=imgsz)
+    return lambda frame: model.predict([frame])[0]
+
+
+def _render(i: int, frame: np.ndarray, dets: np.ndarray) -> str:
+    for x1, y1, x2, y2 in dets[:, :4].astype(int):
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+    return frame_digest(frame)
+
+
+def make_renderer():
+    """Renderer-process factory: draw boxes in place, return the canvas digest."""
+    return _render
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared-memory ring vs pickling queues between pipeline processes.")
+    parser.add_argument("--seq", default="0006")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--frames", type=int, default=200, help="Frames per run (sequence frames are cycled)")
+    parser.add_argument("--sizes", nargs="+", choices=sorted(SIZES), default=["native", "kitti"])
+    parser.add_argument("--slots", nargs="+", type=int, default=[8], help="Frames in flight (ring slots / queue depth)")
+    parser.add_argument("--backend", default="none", help="'none' (passthrough) or a src.model.backends name")
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--decoded", action="store_true", help="Send pre-decoded frames to the reader")
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    paths = list_frames(args.seq, args.root)
+    paths = [paths[i % len(paths)] for i in range(args.frames)]
+    if args.decoded:
+        decoded = {p: read_image(p) for p in set(paths)}
+        paths = [decoded[p] for p in paths]
+    print(f" seq-{args.seq}: {len(paths)} frames, backend={args.backend}, "
+          f"{'pre-decoded' if args.decoded else 'PNG decode in the reader'}")
+
+    first = paths[0] if args.decoded else read_image(paths[0])
+    rows = []
+    for size in args.sizes:
+        resize = SIZES[size]
+        imgsz = KITTI_IMGSZ if resize else stride_align(first.shape[:2])
+        detector = functools.partial(make_detector, args.backend, args.weights, imgsz)
+        for slots in args.slots:
+            digests = {}
+            for transport in ("queue", "shm"):
+                results, seconds = run_pipeline(paths, detector, make_renderer, transport, slots, resize)
+                digests[transport] = combine_digests(results)
+                rows.append({
+                    "size": size, "slots": slots, "transport": transport,
+                    "fps": round(len(paths) / seconds, 1),
+                    "ms_per_frame": round(seconds * 1000 / len(paths), 3),
+                    "digest": digests[transport][:12],
+                })
+            if digests["queue"] != digests["shm"]:
+                print(f" ⚠️ {size} / {slots} slots: shm output differs from queue output")
+            rows[-1]["speedup"] = round(rows[-2]["ms_per_frame"] / rows[-1]["ms_per_frame"], 2)
+            rows[-2]["speedup"] = 1.0
+
+    print(f"\n{'size':<7} | {'slots':>5} | {'transport':<9} | {'FPS':>7} | {'ms/fr':>7} | {'×queue':>6} | digest")
+    print("-" * 70)
+    for r in rows:
+        print(f"{r['size']:<7} | {r['slots']:>5d} | {r['transport']:<9} | {r['fps']:>7.1f} | {r['ms_per_frame']:>7.3f} | "
+              f"×{r['speedup']:>5.2f} | {r['digest']}")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_path = args.out / f"frame_ring_{args.seq}.csv"
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f" Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# bench_imgsz.py
+"""
+Square letterbox (640×640) vs native-aspect (640×192 / 640×224) inference.
+- Padding share of the input tensor for full-res KITTI frames.
+- Network cost: raw PyTorch forward at batch 1 / --batch (no pre/post-processing).
+- End-to-end cost: --backend (default onnx; fixed-shape export per input size).
+- Accuracy: mAP50 via Ultralytics val on kitti_ghostdet_v1.1_clean.yaml
+  (square = rect=False letterbox, native = rect=True batches of the 640×192 val frames)
+  + detection agreement and GhostInfuser jitter on seq-0006 vs the square path.
+→ logs/bench/imgsz_<seq>.csv
+
+Usage:
+  python -m src.utils.checks_balances.bench_imgsz --frames 100
+"""
+
+import argparse
+import csv
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.model.backends import BACKENDS, WEIGHTS, agreement, load_backend
+from src.model.ghost_infuser import GhostInfuser
+from src.model.quantize import DATA_YAML
+from src.utils.checks_balances.bench_backends import time_predict
+from src.utils.eval.mot_metrics import track_jitter
+from src.utils.kitti_io import KITTI_ROOT, list_frames, read_images
+
+OUT_DIR = Path("logs/bench")
+SHAPES = [(640, 640), (224, 640), (192, 640)]   # (h, w); first = reference
+
+
+def padding_share(frame_shape: tuple, imgsz: tuple) -> float:
+    """Fraction of the letterboxed input that is padding."""
+    h0, w0 = frame_shape
+    h, w = imgsz
+    r = min(h / h0, w / w0)
+    return 1.0 - round(h0 * r) * round(w0 * r) / (h * w)
+
+
+def forward_ms(model, imgsz: tuple, batch: int, repeats: int = 20) -> float:
+    """Mean raw network forward time per frame (ms)."""
+    import torch
+
+    x = torch.rand(batch, 3, *imgsz)
+    with torch.inference_mode():
+        model(x)
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            model(x)
+    return (time.perf_counter() - t0) * 1000 / (repeats * batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare square letterbox vs native-aspect KITTI inference.")
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="onnx")
+    parser.add_argument("--seq", default="0006")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--data", default=DATA_YAML)
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    from ultralytics import YOLO
+
+    images = read_images(list_frames(args.seq, args.root)[:args.frames])
+    net = YOLO(args.weights).model.float().eval()
+    print(f" {len(images)} frames of seq-{args.seq} ({images[0].shape[1]}×{images[0].shape[0]}), "
+          f"backend={args.backend}")
+
+    # mAP50: Ultralytics val letterboxes square with rect=False; rect=True keeps the 640×192 val frames as-is
+    val_map50 = {
+        shape: float(YOLO(args.weights).val(data=args.data, imgsz=640, rect=rect, batch=1,
+                                            device="cpu", plots=False, verbose=False).box.map50)
+        for shape, rect in (((640, 640), False), ((192, 640), True))
+    }
+
+    rows, ref = [], None
+    for shape in SHAPES:
+        backend = load_backend(args.backend, args.weights, imgsz=shape)
+        backend.predict(images[:1])  # warm-up
+        lat1 = time_predict(backend, images, 1)
+        latb = time_predict(backend, images, args.batch)
+        dets = backend.predict(images)
+        ref = ref if ref is not None else dets
+        infuser = GhostInfuser()
+        tracks = [infuser.update(d[d[:, 5] == 0]) for d in dets]
+
+        h, w = shape
+        row = {
+            "imgsz": f"{w}x{h}",
+            "padding_pct": round(padding_share(images[0].shape[:2], shape) * 100, 1),
+            "fwd_ms_b1": round(forward_ms(net, shape, 1), 2),
+            f"fwd_ms_b{args.batch}": round(forward_ms(net, shape, args.batch), 2),
+            "e2e_ms_b1": round(float(np.median(lat1)), 2),
+            f"e2e_fps_b{args.batch}": round(1000 / latb.mean(), 1),
+            "mAP50": val_map50.get(shape),
+            "detections": sum(len(d) for d in dets),
+            "jitter": round(track_jitter(tracks), 3),
+            **agreement(ref, dets),
+        }
+        rows.append(row)
+
+    base = rows[0]
+    print(f"\n{'imgsz':<8} | {'pad %':>5} | {'fwd b1':>7} | {'fwd b' + str(args.batch):>7} | {'e2e b1':>7} | "
+          f"{'FPS b' + str(args.batch):>7} | {'speed-up':>8} | {'mAP50':>6} | {'jitter':>6} | {'IoU':>5}")
+    print("-" * 100)
+    for r in rows:
+        m = "-" if r["mAP50"] is None else f"{r['mAP50']:.3f}"
+        print(f"{r['imgsz']:<8} | {r['padding_pct']:>5.1f} | {r['fwd_ms_b1']:>7.2f} | "
+              f"{r[f'fwd_ms_b{args.batch}']:>7.2f} | {r['e2e_ms_b1']:>7.2f} | {r[f'e2e_fps_b{args.batch}']:>7.1f} | "
+              f"×{base['e2e_ms_b1'] / r['e2e_ms_b1']:>7.2f} | {m:>6} | {r['jitter']:>6.3f} | {r['mean_iou']:>5.3f}")
+    print(" (speed-up, IoU: vs 640x640 letterbox; mAP50 on the 640×192 val split)")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_path = args.out / f"imgsz_{args.seq}.csv"
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f" Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# bench_roi.py
+"""
+ROI inference benchmark on seq-0006 (src/model/roi.py).
+- full:        whole frame at KITTI_IMGSZ (reference)
+- roi_labels:  static band learned from label_02 (--label-seqs)
+- roi_tracks:  band re-centred on GhostInfuser tracks, full-frame refresh every --refresh frames
+Reports FPS, speed-up, share of rows processed, recall vs label_02 (IoU ≥ 0.5),
+the band's recall ceiling (GT boxes inside the band) and recall vs full-frame detections.
+→ logs/bench/roi_<seq>.csv
+
+Usage:
+  python -m src.utils.checks_balances.bench_roi --backend onnx --frames 300
+  python -m src.utils.checks_balances.bench_roi --label-seqs 0000 0001 0002   # learn band elsewhere
+"""
+
+import argparse
+import csv
+import time
+from pathlib import Path
+
+from src.model.backends import BACKENDS, WEIGHTS, load_backend
+from src.model.ghost_infuser import GhostInfuser, greedy_match
+from src.model.roi import RoiDetector, band_from_labels, roi_filter, roi_imgsz
+from src.utils.eval.mot_metrics import box_iou
+from src.utils.kitti_io import KITTI_IMGSZ, KITTI_ROOT, find_label_file, list_frames, load_label_02, read_images
+
+OUT_DIR = Path("logs/bench")
+
+
+def recall(ref_frames: list, det_frames: list, iou_thresh: float = 0.5) -> float:
+    """Share of reference boxes matched by a detection (greedy IoU)."""
+    hit = total = 0
+    for ref, det in zip(ref_frames, det_frames):
+        total += len(ref)
+        if len(ref) and len(det):
+            pi, _, _ = greedy_match(box_iou(ref[:, :4], det[:, :4]), iou_thresh)
+            hit += len(pi)
+    return hit / total if total else 0.0
+
+
+def run(detector, images: list, follow: bool = False) -> tuple:
+    """Detect frame by frame (cars only); returns (per-frame dets, seconds)."""
+    infuser = GhostInfuser()
+    dets = []
+    t0 = time.perf_counter()
+    for img in images:
+        d = detector.predict([img])[0]
+        d = d[d[:, 5] == 0]
+        tracks = infuser.update(d)
+        if follow:
+            detector.follow(tracks)
+        dets.append(d)
+    return dets, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ROI (band) inference against full frames.")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="onnx")
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--seq", default="0006")
+    parser.add_argument("--label-seqs", nargs="+", default=None, help="Sequences to learn the band from")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--frames", type=int, default=None)
+    parser.add_argument("--refresh", type=int, default=10, help="Full-frame pass every N frames (roi_tracks)")
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    images = read_images(list_frames(args.seq, args.root)[:args.frames])
+    frame_h, frame_w = images[0].shape[:2]
+    gt = load_label_02(find_label_file(args.seq, args.root), num_frames=len(images))[:len(images)]
+    label_files = [find_label_file(s, args.root) for s in (args.label_seqs or [args.seq])]
+    band = band_from_labels(label_files, frame_h)
+    imgsz = roi_imgsz(band, frame_w)
+    print(f" seq-{args.seq}: {len(images)} frames {frame_w}×{frame_h}; band rows {band[0]}–{band[1]} "
+          f"→ input {imgsz[1]}×{imgsz[0]} (full: {KITTI_IMGSZ[1]}×{KITTI_IMGSZ[0]})")
+
+    full = load_backend(args.backend, args.weights, imgsz=KITTI_IMGSZ)
+    band_backend = load_backend(args.backend, args.weights, imgsz=imgsz)
+    full.predict(images[:1])  # warm-up
+    band_backend.predict([images[0][band[0]:band[1]]])
+    detectors = {
+        "full": (full, False),
+        "roi_labels": (RoiDetector(band_backend, band, frame_h), False),
+        "roi_tracks": (RoiDetector(band_backend, band, frame_h, full_backend=full, refresh=args.refresh), True),
+    }
+    n_gt = max(sum(len(g) for g in gt), 1)
+    ceiling = sum(len(roi_filter(g, band)) for g in gt) / n_gt   # GT recoverable from the static band
+
+    rows, ref = [], None
+    for name, (det, follow) in detectors.items():
+        dets, seconds = run(det, images, follow)
+        ref = ref if ref is not None else dets
+        is_roi = isinstance(det, RoiDetector)
+        rows.append({
+            "mode": name,
+            "fps": round(len(images) / seconds, 2),
+            "row_share": round(det.row_share if is_roi else 1.0, 3),
+            "recall_gt": round(recall(gt, dets), 4),
+            "gt_in_band": round(ceiling if is_roi else 1.0, 4),
+            "recall_vs_full": round(recall(ref, dets), 4),
+            "detections": sum(len(d) for d in dets),
+        })
+
+    base = rows[0]["fps"]
+    print(f"\n{'mode':<11} | {'FPS':>6} | {'speed-up':>8} | {'rows':>5} | {'recall':>6} | {'ceiling':>7} | {'vs full':>7}")
+    print("-" * 70)
+    for r in rows:
+        print(f"{r['mode']:<11} | {r['fps']:>6.1f} | ×{r['fps'] / base:>7.2f} | {r['row_share']:>5.2f} | "
+              f"{r['recall_gt']:>6.3f} | {r['gt_in_band']:>7.3f} | {r['recall_vs_full']:>7.3f}")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_path = args.out / f"roi_{args.seq}.csv"
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f" Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
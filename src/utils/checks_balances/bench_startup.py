@@ -0,0 +1,132 @@
+# bench_startup.py
+"""
+Time-to-first-detection benchmark: cold process → first [N, 6] detections on a KITTI frame.
+Each run is a fresh Python process (imports, weight loading and warm-up are what is measured):
+- ultralytics:      from ultralytics import YOLO; YOLO(best.pt).predict(frame) (what the scripts do)
+- torchscript_cold: 'torchscript' backend with no cached artifact (fuse + trace + freeze + save)
+- torchscript:      'torchscript' backend with the cached artifact (torch.jit.load; executor warm-up
+                    runs in the background after the first frame, so it shows in `next`)
+- any other backend name (onnx, openvino, torch_cpu) via --modes
+Reported per mode (median of --runs): import, load, first-detection wall time from process
+launch, and the next frame's latency (steady state reached?).
+→ logs/bench/startup.csv
+
+Usage:
+  python -m src.utils.checks_balances.bench_startup
+  python -m src.utils.checks_balances.bench_startup --modes ultralytics torchscript onnx --runs 5
+"""
+
+import argparse
+import csv
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.kitti_io import KITTI_IMGSZ, KITTI_ROOT, list_frames
+
+OUT_DIR = Path("logs/bench")
+WEIGHTS = "runs/detect/ghostdet_local2/weights/best.pt"
+MODES = ["ultralytics", "torchscript_cold", "torchscript"]
+
+
+def child(mode: str, weights: str, image: str, imgsz: tuple):
+    """Runs inside the fresh process; prints one JSON line of absolute timestamps."""
+    t = {"start": time.time()}
+    import cv2
+    img = cv2.imread(image)
+    if mode == "ultralytics":
+        from ultralytics import YOLO
+        from src.model.ghost_infuser import results_to_dets
+        t["imported"] = time.time()
+        model = YOLO(weights)
+        t["loaded"] = time.time()
+        detect = lambda: results_to_dets(model.predict(img, imgsz=list(imgsz), verbose=False)[0])
+    else:
+        from src.model.backends import load_backend
+        t["imported"] = time.time()
+        backend = load_backend(mode.removesuffix("_cold"), weights, imgsz=imgsz)
+        t["loaded"] = time.time()
+        detect = lambda: backend.predict([img])[0]
+    dets = detect()
+    t["first"] = time.time()
+    detect()
+    t["second"] = time.time()
+    t["n_dets"] = len(dets)
+    print(json.dumps(t))
+
+
+def run_mode(mode: str, weights: str, image: str, imgsz: tuple) -> dict:
+    """Launch one fresh process; times relative to the launch."""
+    if mode == "torchscript_cold":
+        from src.model.model_cache import artifact_path, weights_hash
+        artifact_path(Path(weights), imgsz, weights_hash(Path(weights))).unlink(missing_ok=True)
+    cmd = [sys.executable, "-m", "src.utils.checks_balances.bench_startup", "--child", mode,
+           "--weights", weights, "--image", image, "--imgsz", *map(str, imgsz)]
+    t0 = time.time()
+    out = subprocess.run(cmd, capture_output=True, text=True)
+    if out.returncode:
+        raise RuntimeError(f"{mode} failed:\n{out.stderr[-2000:]}")
+    t = json.loads(out.stdout.strip().splitlines()[-1])
+    return {
+        "interpreter_ms": (t["start"] - t0) * 1000,
+        "import_ms": (t["imported"] - t["start"]) * 1000,
+        "load_ms": (t["loaded"] - t["imported"]) * 1000,
+        "first_frame_ms": (t["first"] - t["loaded"]) * 1000,
+        "ttfd_ms": (t["first"] - t0) * 1000,
+        "next_frame_ms": (t["second"] - t["first"]) * 1000,
+        "n_dets": t["n_dets"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-to-first-detection: Ultralytics vs cached model artifact.")
+    parser.add_argument("--modes", nargs="+", default=MODES)
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--seq", default="0006")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--image", default=None, help="Frame to detect on (default: first frame of --seq)")
+    parser.add_argument("--imgsz", nargs=2, type=int, default=list(KITTI_IMGSZ), metavar=("H", "W"))
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per mode")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    imgsz = tuple(args.imgsz)
+    if args.child:
+        child(args.child, args.weights, args.image, imgsz)
+        return
+
+    image = args.image or str(list_frames(args.seq, args.root)[0])
+    print(f" Time to first detection: {args.weights} on {Path(image).name} at {imgsz[1]}×{imgsz[0]}, "
+          f"{args.runs} fresh processes per mode")
+    rows = []
+    for mode in args.modes:
+        runs = [run_mode(mode, args.weights, image, imgsz) for _ in range(args.runs)]
+        row = {"mode": mode, **{k: round(float(np.median([r[k] for r in runs])), 1) for k in runs[0]}}
+        rows.append(row)
+
+    base = rows[0]
+    print(f"\n{'mode':<18} | {'interp':>7} | {'import':>7} | {'load':>7} | {'1st frame':>9} | "
+          f"{'TTFD':>7} | {'next':>6} | {'speed-up':>8}")
+    print("-" * 96)
+    for r in rows:
+        print(f"{r['mode']:<18} | {r['interpreter_ms']:>7.0f} | {r['import_ms']:>7.0f} | {r['load_ms']:>7.0f} | "
+              f"{r['first_frame_ms']:>9.1f} | {r['ttfd_ms']:>7.0f} | {r['next_frame_ms']:>6.1f} | "
+              f"×{base['ttfd_ms'] / r['ttfd_ms']:>7.2f}")
+    print(f" (ms, median of {args.runs}; TTFD = process launch → first detections; speed-up vs {base['mode']})")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_path = args.out / "startup.csv"
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f" Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
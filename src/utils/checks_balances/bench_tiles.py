@@ -0,0 +1,116 @@
+# bench_tiles.py
+"""
+Tiled full-resolution inference benchmark on seq-0006 (src/model/tiles.py).
+- full:  whole frame downscaled to KITTI_IMGSZ (640×192, reference)
+- RxC:   rows × cols overlapping native-resolution tiles (+ global tile), all tiles of
+         --batch-frames frames in one backend batch, cross-tile NMS merge
+Reports FPS / ms per frame (tiling + inference + merge), tiles and input pixels per frame,
+and recall vs label_02 (IoU ≥ 0.5) overall and by box height — far (< 25 px),
+mid (25–50 px), near (≥ 50 px) — to pick the grid that fits the latency budget.
+→ logs/bench/tiles_<seq>.csv
+
+Usage:
+  python -m src.utils.checks_balances.bench_tiles --backend onnx --frames 200
+  python -m src.utils.checks_balances.bench_tiles --grids 1x2 1x3 2x4 --overlap 0.25 --scale 0.75
+"""
+
+import argparse
+import csv
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.model.backends import BACKENDS, WEIGHTS, load_backend
+from src.model.tiles import TileDetector, tile_grid
+from src.utils.checks_balances.bench_roi import recall
+from src.utils.kitti_io import KITTI_IMGSZ, KITTI_ROOT, find_label_file, list_frames, load_label_02, read_images
+
+OUT_DIR = Path("logs/bench")
+HEIGHT_BINS = {"far": (0, 25), "mid": (25, 50), "near": (50, np.inf)}   # GT box height (px)
+
+
+def run(detector, images: list, batch_frames: int, classes) -> tuple:
+    """Detect all frames in chunks of batch_frames; returns (per-frame dets, seconds)."""
+    dets = []
+    t0 = time.perf_counter()
+    for i in range(0, len(images), batch_frames):
+        dets += detector.predict(images[i:i + batch_frames])
+    seconds = time.perf_counter() - t0
+    if classes is not None:
+        dets = [d[np.isin(d[:, 5], classes)] for d in dets]
+    return dets, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs throughput of tiled full-resolution inference.")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="onnx")
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--seq", default="0006")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--frames", type=int, default=None)
+    parser.add_argument("--grids", nargs="+", default=["1x2", "1x3", "2x3", "2x4"], help="rows x cols")
+    parser.add_argument("--overlap", type=float, default=0.2)
+    parser.add_argument("--scale", type=float, default=1.0, help="Tile input scale vs native resolution")
+    parser.add_argument("--no-global", action="store_true", help="Skip the whole-frame tile")
+    parser.add_argument("--batch-frames", type=int, default=1, help="Frames per backend batch")
+    parser.add_argument("--classes", nargs="+", type=int, default=None, help="Detection classes (default: all)")
+    parser.add_argument("--types", nargs="+", default=["Car", "Van", "Truck", "Pedestrian", "Cyclist"],
+                        help="label_02 object types counted as ground truth")
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    images = read_images(list_frames(args.seq, args.root)[:args.frames])
+    frame_hw = images[0].shape[:2]
+    gt = load_label_02(find_label_file(args.seq, args.root), num_frames=len(images), types=args.types)[:len(images)]
+    gt_bins = {name: [g[((g[:, 3] - g[:, 1]) >= lo) & ((g[:, 3] - g[:, 1]) < hi)] for g in gt]
+               for name, (lo, hi) in HEIGHT_BINS.items()}
+    print(f" seq-{args.seq}: {len(images)} frames {frame_hw[1]}×{frame_hw[0]}, "
+          + ", ".join(f"{k} {sum(len(g) for g in v)}" for k, v in gt_bins.items()) + " GT boxes")
+
+    configs = {"full": (load_backend(args.backend, args.weights, imgsz=KITTI_IMGSZ), KITTI_IMGSZ, 1)}
+    for spec in args.grids:
+        grid = tuple(int(v) for v in spec.lower().split("x"))
+        tiles, imgsz = tile_grid(frame_hw, grid, args.overlap, args.scale)
+        backend = load_backend(args.backend, args.weights, imgsz=imgsz)
+        tiler = TileDetector(backend, grid, args.overlap, args.scale, global_tile=not args.no_global)
+        configs[spec] = (tiler, imgsz, tiler.tiles_per_frame)
+
+    rows = []
+    for name, (det, imgsz, n_tiles) in configs.items():
+        det.predict(images[:args.batch_frames])  # warm-up
+        dets, seconds = run(det, images, args.batch_frames, args.classes)
+        rows.append({
+            "mode": name,
+            "tile_imgsz": f"{imgsz[0]}x{imgsz[1]}",
+            "tiles": n_tiles,
+            "px_rel": round(n_tiles * imgsz[0] * imgsz[1] / (KITTI_IMGSZ[0] * KITTI_IMGSZ[1]), 2),
+            "fps": round(len(images) / seconds, 2),
+            "ms_per_frame": round(seconds * 1000 / len(images), 2),
+            "recall": round(recall(gt, dets), 4),
+            **{f"recall_{k}": round(recall(v, dets), 4) for k, v in gt_bins.items()},
+            "detections": sum(len(d) for d in dets),
+        })
+
+    base = rows[0]
+    print(f"\n{'mode':<5} | {'tile in':>8} | {'tiles':>5} | {'px':>5} | {'FPS':>6} | {'ms/fr':>7} | {'×full':>6} | "
+          f"{'recall':>6} | {'far':>6} | {'mid':>6} | {'near':>6}")
+    print("-" * 92)
+    for r in rows:
+        print(f"{r['mode']:<5} | {r['tile_imgsz']:>8} | {r['tiles']:>5d} | ×{r['px_rel']:>4.1f} | {r['fps']:>6.1f} | "
+              f"{r['ms_per_frame']:>7.2f} | ×{r['ms_per_frame'] / base['ms_per_frame']:>5.2f} | {r['recall']:>6.3f} | "
+              f"{r['recall_far']:>6.3f} | {r['recall_mid']:>6.3f} | {r['recall_near']:>6.3f}")
+    print(f" (px = input pixels per frame vs {KITTI_IMGSZ[1]}×{KITTI_IMGSZ[0]}; ×full = latency vs full; "
+          f"far < 25 px, near ≥ 50 px box height)")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_path = args.out / f"tiles_{args.seq}.csv"
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f" Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
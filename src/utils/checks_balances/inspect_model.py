@@ -1,52 +1,235 @@
-# inspect_model.py
-from ultralytics import YOLO
-import torch
-
-print("🔍 Loading model: runs/detect/ghostdet_local2/weights/best.pt")
-model = YOLO("runs/detect/ghostdet_local2/weights/best.pt")
-m = model.model
-
-print(f"✅ Model type: {type(m).__name__}")
-print(f"✅ Total modules: {len(list(m.modules()))}\n")
-
-print("=== Backbone layers (first 10 named children) ===")
-for i, (name, layer) in enumerate(m.named_children()):
-    if i >= 10:
-        break
-    print(f"{i:2d}: {name:<12} | {layer.__class__.__name__}")
-
-print("\n=== Searching for Ghost/Temporal clues ===")
-ghost_kw = ['ghost', 'bottleneck', 'depthwise', 'cheap']
-temporal_kw = ['temporal', 'fuse', 'stack', 'frame', 'infuser', 'sliding']
-
-found = []
-for name, module in m.named_modules():
-    cls_name = module.__class__.__name__.lower()
-    full_name = name.lower()
-    for kw in ghost_kw + temporal_kw:
-        if kw in cls_name or kw in full_name:
-            found.append((name, module.__class__.__name__))
-            break  # avoid dupes
-
-if found:
-    for name, cls in found[:10]:
-        print(f"🎯 {name} → {cls}")
-else:
-    print("⚠️ No explicit ghost/temporal modules found — may be fused or in forward hook.")
-
-# Try forward pass
-try:
-    print("\n⏯️ Testing forward pass (batch=1, 640x640)...")
-    dummy = torch.rand(1, 3, 640, 640)
-    with torch.no_grad():
-        output = m(dummy)
-    if isinstance(output, (list, tuple)):
-        print(f"✅ Forward succeeded. Output len: {len(output)}")
-        for i, o in enumerate(output[:3]):
-            print(f"   → output[{i}].shape = {o.shape}")
-    else:
-        print(f"✅ Forward succeeded. Output shape: {output.shape}")
-except Exception as e:
-    print(f"❌ Forward failed: {e}")
-
-print("\n🔍 Inspection complete.")
\ No newline at end of file
+# inspect_model.py
+"""
+Per-layer CPU profiler for a trained GhostDet checkpoint (forward hooks on every layer).
+- Layers: the model's top-level blocks (model.model[i]: Conv, C2f, SPPF, Detect, ...) or,
+  with --depth 2, their children; ops outside hooked modules are reported as "unattributed".
+- Per layer: wall time over --runs warm forwards at the native KITTI input (KITTI_IMGSZ, 640×192)
+  — p50 / mean / share of the forward —, output shape, activation memory (output tensors),
+  params and estimated FLOPs (2 × MACs of the Conv2d / Linear leaves inside the layer).
+- Ranked table (slowest first) + per-module-type totals; full report as JSON.
+→ logs/profile/layers_<weights stem>_<h>x<w>.json
+
+Usage:
+  python -m src.utils.checks_balances.inspect_model
+  python -m src.utils.checks_balances.inspect_model --weights yolov8n.pt --depth 2 --threads 4
+  python -m src.utils.checks_balances.inspect_model --weights configs/models/ghostdet_csp.yaml
+"""
+
+import argparse
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from src.utils.kitti_io import KITTI_IMGSZ
+from src.utils.profiling import PROFILE_DIR
+
+WEIGHTS = "runs/detect/ghostdet_local2/weights/best.pt"
+
+
+def load_model(weights: str, fuse: bool = True):
+    """Detection nn.Module (eval) from a checkpoint or a model YAML."""
+    from ultralytics import YOLO
+
+    model = YOLO(weights).model.float().eval()
+    return model.fuse(verbose=False) if fuse else model
+
+
+def select_layers(model, depth: int = 1) -> dict:
+    """
+    {qualified name: module} — top-level blocks (depth 1) or their children (depth 2).
+    ModuleList children (never called themselves, e.g. Detect.cv2) are expanded into their elements.
+    """
+    layers = {}
+    for i, block in enumerate(model.model):
+        children = list(block.named_children()) if depth > 1 else []
+        if not children:
+            layers[f"{i}"] = block
+        for name, child in children:
+            if isinstance(child, torch.nn.ModuleList):
+                layers.update({f"{i}.{name}.{j}": m for j, m in enumerate(child)})
+            else:
+                layers[f"{i}.{name}"] = child
+    return layers
+
+
+def layer_type(model, name: str, layer) -> str:
+    """Block type ('C2f'), or block.child type ('C2f.Sequential') for children."""
+    block = type(model.model[int(name.split(".")[0])]).__name__
+    return block if "." not in name else f"{block}.{type(layer).__name__}"
+
+
+def conv_flops(module, output) -> int:
+    """2 × MACs of one Conv2d / Linear call."""
+    if isinstance(module, torch.nn.Conv2d):
+        k = module.kernel_size[0] * module.kernel_size[1] * module.in_channels // module.groups
+        return 2 * k * output.numel()
+    return 2 * module.in_features * output.numel()
+
+
+def tensor_bytes(output) -> int:
+    if isinstance(output, torch.Tensor):
+        return output.numel() * output.element_size()
+    if isinstance(output, (list, tuple)):
+        return sum(tensor_bytes(o) for o in output)
+    if isinstance(output, dict):
+        return sum(tensor_bytes(o) for o in output.values())
+    return 0
+
+
+def tensor_shape(output):
+    if isinstance(output, torch.Tensor):
+        return list(output.shape)
+    if isinstance(output, (list, tuple)):
+        return [tensor_shape(o) for o in output]
+    return None
+
+
+def profile_layers(model, imgsz: tuple, runs: int = 20, warmup: int = 3, depth: int = 1) -> dict:
+    """Attach hooks, run warm forwards, return the per-layer report."""
+    layers = select_layers(model, depth)
+    times = defaultdict(lambda: np.zeros(runs))   # ms per timed forward, summed over calls (SPPF.m runs 3×)
+    meta = {}
+    flops = defaultdict(int)
+    t_start = {}
+    counting = [True]   # FLOPs / shapes from the first forward only
+    run = [-1]          # index of the timed forward (-1 = not timed)
+
+    def pre_hook(name):
+        def hook(module, inputs):
+            t_start[name] = time.perf_counter_ns()
+        return hook
+
+    def post_hook(name):
+        def hook(module, inputs, output):
+            if run[0] >= 0:
+                times[name][run[0]] += (time.perf_counter_ns() - t_start[name]) / 1e6
+            if counting[0]:
+                meta[name] = {"out_shape": tensor_shape(output), "act_kb": tensor_bytes(output) / 1024}
+        return hook
+
+    def flop_hook(name):
+        def hook(module, inputs, output):
+            if counting[0]:
+                flops[name] += conv_flops(module, output)
+        return hook
+
+    handles = []
+    for name, layer in layers.items():
+        handles.append(layer.register_forward_pre_hook(pre_hook(name)))
+        handles.append(layer.register_forward_hook(post_hook(name)))
+        for leaf in layer.modules():
+            if isinstance(leaf, (torch.nn.Conv2d, torch.nn.Linear)):
+                handles.append(leaf.register_forward_hook(flop_hook(name)))
+
+    x = torch.rand(1, 3, *imgsz)
+    totals = []
+    try:
+        with torch.inference_mode():
+            model(x)                       # FLOPs / shapes pass
+            counting[0] = False
+            for _ in range(warmup):
+                model(x)
+            for i in range(runs):
+                run[0] = i
+                t0 = time.perf_counter_ns()
+                model(x)
+                totals.append((time.perf_counter_ns() - t0) / 1e6)
+    finally:
+        for h in handles:
+            h.remove()
+
+    total_ms = float(np.median(totals))
+    rows = []
+    for name, layer in layers.items():
+        if name not in meta:
+            continue   # not called in forward (its cost lands in "unattributed")
+        t = times[name]
+        rows.append({
+            "layer": name,
+            "type": layer_type(model, name, layer),
+            "params": sum(p.numel() for p in layer.parameters()),
+            "out_shape": meta[name]["out_shape"],
+            "act_kb": round(meta[name]["act_kb"], 1),
+            "mflops": round(flops[name] / 1e6, 2),
+            "ms_p50": round(float(np.median(t)), 4),
+            "ms_mean": round(float(t.mean()), 4),
+            "share_pct": round(float(np.median(t)) / total_ms * 100, 2),
+        })
+
+    by_type = defaultdict(lambda: {"layers": 0, "ms_p50": 0.0, "mflops": 0.0, "params": 0})
+    for r in rows:
+        agg = by_type[r["type"]]
+        agg["layers"] += 1
+        agg["ms_p50"] += r["ms_p50"]
+        agg["mflops"] += r["mflops"]
+        agg["params"] += r["params"]
+    attributed = sum(r["ms_p50"] for r in rows)
+
+    return {
+        "imgsz": list(imgsz),
+        "threads": torch.get_num_threads(),
+        "runs": runs,
+        "depth": depth,
+        "total_ms_p50": round(total_ms, 3),
+        "unattributed_ms": round(max(total_ms - attributed, 0.0), 3),
+        "gflops": round(sum(r["mflops"] for r in rows) / 1e3, 3),
+        "params": sum(p.numel() for p in model.parameters()),
+        "layers": sorted(rows, key=lambda r: -r["ms_p50"]),
+        "by_type": dict(sorted(by_type.items(), key=lambda kv: -kv[1]["ms_p50"])),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-layer CPU latency / FLOPs / activation profile of a GhostDet model.")
+    parser.add_argument("--weights", default=WEIGHTS, help="Checkpoint (.pt) or model YAML")
+    parser.add_argument("--imgsz", nargs=2, type=int, default=list(KITTI_IMGSZ), metavar=("H", "W"))
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--depth", type=int, choices=[1, 2], default=1, help="1 = top-level blocks, 2 = their children")
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads (default: torch default)")
+    parser.add_argument("--no-fuse", action="store_true", help="Keep Conv+BN unfused (training graph)")
+    parser.add_argument("--top", type=int, default=15, help="Rows in the ranked table")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    imgsz = tuple(args.imgsz)
+    print(f"🔍 Loading model: {args.weights}")
+    model = load_model(args.weights, fuse=not args.no_fuse)
+    n_ghost = sum("ghost" in type(m).__name__.lower() for m in model.modules())
+    print(f"✅ {type(model).__name__}: {len(model.model)} blocks, {sum(p.numel() for p in model.parameters()):,} params, "
+          f"{n_ghost} ghost modules")
+    print(f"⏯️ Profiling {args.runs} warm forwards at {imgsz[1]}×{imgsz[0]} (batch 1, {torch.get_num_threads()} threads)")
+
+    report = profile_layers(model, imgsz, args.runs, args.warmup, args.depth)
+    report["weights"] = str(args.weights)
+    report["fused"] = not args.no_fuse
+
+    print(f"\n{'#':>3} | {'layer':<8} | {'type':<22} | {'ms p50':>7} | {'share':>6} | {'MFLOPs':>8} | "
+          f"{'params':>9} | {'act KB':>8} | out shape")
+    print("-" * 116)
+    for rank, r in enumerate(report["layers"][:args.top], 1):
+        print(f"{rank:>3} | {r['layer']:<8} | {r['type']:<22} | {r['ms_p50']:>7.3f} | {r['share_pct']:>5.1f}% | "
+              f"{r['mflops']:>8.1f} | {r['params']:>9,d} | {r['act_kb']:>8.1f} | {r['out_shape']}")
+    print(f"    forward p50 {report['total_ms_p50']:.2f} ms, unattributed {report['unattributed_ms']:.2f} ms, "
+          f"{report['gflops']:.2f} GFLOPs")
+
+    print(f"\n{'type':<22} | {'n':>3} | {'ms p50':>7} | {'share':>6} | {'MFLOPs':>8} | {'params':>9}")
+    print("-" * 70)
+    for t, agg in report["by_type"].items():
+        print(f"{t:<22} | {agg['layers']:>3d} | {agg['ms_p50']:>7.3f} | "
+              f"{agg['ms_p50'] / report['total_ms_p50'] * 100:>5.1f}% | {agg['mflops']:>8.1f} | {agg['params']:>9,d}")
+
+    out_path = args.out or PROFILE_DIR / f"layers_{Path(args.weights).stem}_{imgsz[0]}x{imgsz[1]}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2))
+    print(f"\n🔍 Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,126 @@
+# profile_arch.py
+"""
+Architecture profile: Ghost-CSP GhostDet (configs/models/ghostdet_csp.yaml) vs YOLOv8n.
+- Params (total / backbone / neck+head), ghost module count.
+- GFLOPs at the native KITTI input (KITTI_IMGSZ, 640×192) — thop via Ultralytics get_flops.
+- CPU latency of the raw network forward (fused Conv+BN, as deployed), batch 1 and --batch,
+  p50 / p95 over --repeats runs after warm-up.
+Both YAMLs are built with the same nc (untrained weights — cost does not depend on them);
+--weights adds trained checkpoints (e.g. best.pt) to the table.
+→ logs/bench/arch_<h>x<w>.csv
+
+Usage:
+  python -m src.utils.checks_balances.profile_arch
+  python -m src.utils.checks_balances.profile_arch --threads 4 --weights runs/detect/ghostdet_local2/weights/best.pt
+"""
+
+import argparse
+import csv
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from src.utils.kitti_io import KITTI_IMGSZ
+
+OUT_DIR = Path("logs/bench")
+MODELS = {
+    "yolov8n": "yolov8n.yaml",
+    "ghostdet_csp": "configs/models/ghostdet_csp.yaml",
+}
+GHOST_MODULES = ("GhostConv", "GhostBottleneck", "C3Ghost")
+
+
+def build(cfg: str, nc: int):
+    """DetectionModel from a YAML (nc overridden) or a trained checkpoint."""
+    if cfg.endswith(".pt"):
+        from ultralytics import YOLO
+        return YOLO(cfg).model.float()
+    from ultralytics.nn.tasks import DetectionModel
+    return DetectionModel(cfg, nc=nc, verbose=False)
+
+
+def param_split(model) -> dict:
+    """Parameter counts for the backbone (YAML 'backbone' layers) and the rest."""
+    n_backbone = len(model.yaml["backbone"])
+    count = lambda layers: sum(p.numel() for m in layers for p in m.parameters())
+    return {
+        "params": count(model.model),
+        "params_backbone": count(model.model[:n_backbone]),
+        "params_neck_head": count(model.model[n_backbone:]),
+    }
+
+
+def latency_ms(model, imgsz: tuple, batch: int, repeats: int = 50) -> np.ndarray:
+    """Per-frame forward latency (ms) for `repeats` runs at the given batch size."""
+    x = torch.rand(batch, 3, *imgsz)
+    times = np.empty(repeats)
+    with torch.inference_mode():
+        for _ in range(3):
+            model(x)   # warm-up
+        for i in range(repeats):
+            t0 = time.perf_counter()
+            model(x)
+            times[i] = (time.perf_counter() - t0) * 1000 / batch
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Params / FLOPs / CPU latency: Ghost-CSP GhostDet vs YOLOv8n.")
+    parser.add_argument("--models", nargs="+", default=list(MODELS.values()), help="Model YAMLs")
+    parser.add_argument("--weights", nargs="*", default=[], help="Extra trained checkpoints to profile")
+    parser.add_argument("--nc", type=int, default=4, help="Classes for YAML models (kitti_ghostdet_v1.1_clean: 4)")
+    parser.add_argument("--imgsz", nargs=2, type=int, default=list(KITTI_IMGSZ), metavar=("H", "W"))
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads (default: torch default)")
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    from ultralytics.utils.torch_utils import get_flops
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    imgsz = tuple(args.imgsz)
+    print(f" Profiling at {imgsz[1]}×{imgsz[0]} on CPU ({torch.get_num_threads()} threads)")
+
+    names = {v: k for k, v in MODELS.items()}
+    rows = []
+    for cfg in [*args.models, *args.weights]:
+        model = build(cfg, args.nc).eval()
+        row = {"model": names.get(cfg, Path(cfg).stem), **param_split(model)}
+        row["ghost_modules"] = sum(type(m).__name__ in GHOST_MODULES for m in model.modules())
+        row["gflops"] = round(get_flops(model, list(imgsz)), 3)
+
+        model = model.fuse(verbose=False)
+        lat1 = latency_ms(model, imgsz, 1, args.repeats)
+        latb = latency_ms(model, imgsz, args.batch, max(args.repeats // args.batch, 5))
+        row.update({
+            "p50_ms_b1": round(float(np.percentile(lat1, 50)), 2),
+            "p95_ms_b1": round(float(np.percentile(lat1, 95)), 2),
+            f"ms_per_frame_b{args.batch}": round(float(np.median(latb)), 2),
+        })
+        rows.append(row)
+
+    base = rows[0]
+    print(f"\n{'model':<14} | {'params':>9} | {'backbone':>9} | {'neck+head':>9} | {'ghost':>5} | {'GFLOPs':>6} | "
+          f"{'p50 b1':>7} | {'p95 b1':>7} | {'b' + str(args.batch) + '/frame':>8} | {'speed-up':>8}")
+    print("-" * 112)
+    for r in rows:
+        print(f"{r['model']:<14} | {r['params']:>9,d} | {r['params_backbone']:>9,d} | {r['params_neck_head']:>9,d} | "
+              f"{r['ghost_modules']:>5d} | {r['gflops']:>6.2f} | {r['p50_ms_b1']:>7.2f} | {r['p95_ms_b1']:>7.2f} | "
+              f"{r[f'ms_per_frame_b{args.batch}']:>8.2f} | ×{base['p50_ms_b1'] / r['p50_ms_b1']:>7.2f}")
+    print(f" (speed-up: p50 batch 1 vs {base['model']})")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_path = args.out / f"arch_{imgsz[0]}x{imgsz[1]}.csv"
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f" Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
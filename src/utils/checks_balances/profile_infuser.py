@@ -1,17 +1,192 @@
-import time
-from ultralytics import YOLO
-from src.model.ghost_infuser import GhostInfuser
-
-model = YOLO("runs/detect/ghostdet_local2/weights/best.pt")
-infuser = GhostInfuser()
-img = cv2.imread("sample.jpg")
-res = model(img)[0]
-
-N = 100
-times = []
-for _ in range(N):
-    t0 = time.perf_counter()
-    _ = infuser.smooth(res)
-    times.append((time.perf_counter() - t0) * 1000)
-
-print(f"GhostInfuser: {np.mean(times):.2f} ± {np.std(times):.2f} ms/frame (N={N})")
\ No newline at end of file
+# profile_infuser.py
+"""
+Deterministic record/replay harness for GhostInfuser (regression + latency).
+- record: run the detector over a KITTI sequence once → compact detection stream (.npz).
+- replay: feed the stream through GhostInfuser frame by frame and report
+    * per-frame latency p50/p95/p99 (perf_counter_ns, several timed passes after warm-up)
+    * allocations per frame (tracemalloc, separate pass so timings stay clean)
+    * checksums: SHA-256 over every frame's output + canonical track state (snapshot())
+- --save-ref / --check: store a reference and verify later changes are bit-exact
+  (reports the first diverging frame; exit code 1 on mismatch).
+
+Replaces the old 100× smooth() loop on a single Results (which imported a missing
+module and never imported cv2/np).
+
+Usage:
+  python -m src.utils.checks_balances.profile_infuser record --seq 0006
+  python -m src.utils.checks_balances.profile_infuser replay --save-ref logs/replay/0006_ref.json
+  python -m src.utils.checks_balances.profile_infuser replay --check logs/replay/0006_ref.json
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from src.model.ghost_infuser import SMOOTHING_MODES, GhostInfuser
+from src.utils.det_cache import WEIGHTS, cache_sequence, load_detections
+from src.utils.kitti_io import KITTI_ROOT
+
+REPLAY_DIR = Path("logs/replay")
+
+
+def replay_checksums(stream: list, cfg: dict) -> dict:
+    """Replay once and hash outputs + track state per frame."""
+    infuser = GhostInfuser(**cfg)
+    running = hashlib.sha256()
+    frame_digests = []
+    for dets in stream:
+        out = np.ascontiguousarray(infuser.update(dets), dtype=np.float64)
+        state = np.ascontiguousarray(infuser.snapshot(), dtype=np.float64)
+        h = hashlib.sha256(out.tobytes())
+        h.update(state.tobytes())
+        digest = h.hexdigest()
+        running.update(digest.encode())
+        frame_digests.append(digest[:16])
+    return {"checksum": running.hexdigest(), "frames": frame_digests}
+
+
+def replay_latency(stream: list, cfg: dict, repeats: int = 5, warmup: int = 1) -> np.ndarray:
+    """Per-frame update() latency in ms over `repeats` passes (fresh tracker per pass)."""
+    times = []
+    gc.collect()
+    for r in range(warmup + repeats):
+        infuser = GhostInfuser(**cfg)
+        pass_times = np.empty(len(stream))
+        for i, dets in enumerate(stream):
+            t0 = time.perf_counter_ns()
+            infuser.update(dets)
+            pass_times[i] = (time.perf_counter_ns() - t0) / 1e6
+        if r >= warmup:
+            times.append(pass_times)
+    return np.concatenate(times) if times else np.empty(0)
+
+
+def replay_allocations(stream: list, cfg: dict) -> dict:
+    """Peak traced memory and net allocated blocks per frame."""
+    infuser = GhostInfuser(**cfg)
+    tracemalloc.start()
+    peaks = np.empty(len(stream))
+    try:
+        for i, dets in enumerate(stream):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            infuser.update(dets)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks[i] = peak - base
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_bytes_p50": float(np.percentile(peaks, 50)) if len(peaks) else 0.0,
+        "peak_bytes_max": float(peaks.max()) if len(peaks) else 0.0,
+        "retained_bytes": int(current),
+    }
+
+
+def cmd_record(args):
+    from ultralytics import YOLO
+
+    out = args.stream or REPLAY_DIR / f"{args.seq}.npz"
+    model = YOLO(args.weights)
+    dets = cache_sequence(model, args.seq, out, classes=tuple(args.classes), root=args.root)
+    print(f" Recorded {len(dets)} frames, {sum(len(d) for d in dets)} detections → {out}")
+
+
+def cmd_replay(args):
+    stream_path = args.stream or REPLAY_DIR / f"{args.seq}.npz"
+    stream = [d.astype(np.float64) for d in load_detections(stream_path)]
+    cfg = {
+        "alpha": args.alpha,
+        "occlusion_threshold": args.occlusion_threshold,
+        "iou_match_thresh": args.iou_match_thresh,
+        "max_age": args.max_age,
+        "motion": args.motion,
+        "smoothing": args.smoothing,
+        "window": args.window,
+    }
+    if args.check:
+        ref = json.loads(Path(args.check).read_text())
+        cfg = ref["config"]  # replay exactly what the reference used
+
+    print(f" Replaying {len(stream)} frames from {stream_path}")
+    print(f" Config: {cfg}")
+
+    sums = replay_checksums(stream, cfg)
+    lat = replay_latency(stream, cfg, repeats=args.repeats)
+    alloc = replay_allocations(stream, cfg)
+
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    print("\n=== GhostInfuser replay ===")
+    print(f" Latency (ms/frame): p50={p50:.3f}  p95={p95:.3f}  p99={p99:.3f}  "
+          f"mean={lat.mean():.3f}  max={lat.max():.3f}  (N={len(lat)})")
+    print(f" Allocations:        peak/frame p50={alloc['peak_bytes_p50'] / 1024:.1f} KiB  "
+          f"max={alloc['peak_bytes_max'] / 1024:.1f} KiB  retained={alloc['retained_bytes'] / 1024:.1f} KiB")
+    print(f" Checksum:           {sums['checksum']}")
+
+    report = {
+        "stream": str(stream_path),
+        "config": cfg,
+        "latency_ms": {"p50": p50, "p95": p95, "p99": p99, "mean": float(lat.mean()), "max": float(lat.max())},
+        "allocations": alloc,
+        **sums,
+    }
+
+    if args.save_ref:
+        Path(args.save_ref).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save_ref).write_text(json.dumps(report, indent=2))
+        print(f" Saved reference: {args.save_ref}")
+
+    if args.check:
+        if sums["checksum"] == ref["checksum"]:
+            ref_p50 = ref["latency_ms"]["p50"]
+            print(f" [OK] Bit-exact vs {args.check} (p50 {ref_p50:.3f} → {p50:.3f} ms, "
+                  f"{(p50 - ref_p50) / ref_p50 * 100:+.1f}%)")
+        else:
+            first = next(
+                (i for i, (a, b) in enumerate(zip(sums["frames"], ref["frames"])) if a != b),
+                min(len(sums["frames"]), len(ref["frames"]))
+            )
+            print(f" [FAIL] Output differs from {args.check} — first diverging frame: {first}")
+            sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay harness for GhostInfuser.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    rec = sub.add_parser("record", help="Run the detector once and save the detection stream")
+    rec.add_argument("--seq", default="0006")
+    rec.add_argument("--weights", default=WEIGHTS)
+    rec.add_argument("--classes", nargs="+", type=int, default=[0])
+    rec.add_argument("--root", type=Path, default=KITTI_ROOT)
+    rec.add_argument("--stream", type=Path, default=None, help="Output file (default: logs/replay/<seq>.npz)")
+    rec.set_defaults(func=cmd_record)
+
+    rep = sub.add_parser("replay", help="Replay a stream: latency, allocations, checksums")
+    rep.add_argument("--seq", default="0006")
+    rep.add_argument("--stream", type=Path, default=None)
+    rep.add_argument("--repeats", type=int, default=5, help="Timed passes (after 1 warm-up pass)")
+    rep.add_argument("--alpha", type=float, default=0.6)
+    rep.add_argument("--occlusion-threshold", type=float, default=0.3)
+    rep.add_argument("--iou-match-thresh", type=float, default=0.4)
+    rep.add_argument("--max-age", type=int, default=5)
+    rep.add_argument("--motion", action="store_true")
+    rep.add_argument("--smoothing", choices=SMOOTHING_MODES, default="ema")
+    rep.add_argument("--window", type=int, default=3)
+    rep.add_argument("--save-ref", type=Path, default=None, help="Write report JSON as a reference")
+    rep.add_argument("--check", type=Path, default=None, help="Compare against a reference JSON")
+    rep.set_defaults(func=cmd_replay)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
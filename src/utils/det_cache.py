@@ -0,0 +1,125 @@
+# src/utils/det_cache.py
+"""
+Per-frame detection cache for GhostDet.
+- Runs the detector once per sequence; sweeps, replays and renders reuse the arrays.
+- Compact .npz: all detections concatenated ([M, 6] float32) + frame offsets ([F+1] int64).
+- Frame i → dets[offsets[i]:offsets[i+1]] → [x1, y1, x2, y2, conf, cls]
+
+Usage:
+  python -m src.utils.det_cache --seqs 0006
+  → logs/det_cache/0006.npz
+  python -m src.utils.det_cache --seqs 0006 --weights yolov8n.pt --classes -1 --out logs/det_cache/yolov8n
+  → logs/det_cache/yolov8n/0006.npz (all classes; baseline for the demos)
+  python -m src.utils.det_cache --seqs 0006 --backend torchscript   # cached TorchScript artifact
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from src.utils.kitti_io import KITTI_IMGSZ, KITTI_ROOT, list_frames
+
+CACHE_DIR = Path("logs/det_cache")
+WEIGHTS = "runs/detect/ghostdet_local2/weights/best.pt"
+
+
+def save_detections(path: Path, frames: List[np.ndarray], **meta) -> None:
+    """Save per-frame [N, 6] detections to a single compressed .npz."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    counts = np.array([len(d) for d in frames], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    dets = np.concatenate([np.asarray(d, dtype=np.float32).reshape(-1, 6) for d in frames]) \
+        if frames else np.empty((0, 6), dtype=np.float32)
+    np.savez_compressed(path, dets=dets, offsets=offsets, meta=np.array(json.dumps(meta)))
+
+
+def load_detections(path: Path) -> List[np.ndarray]:
+    """Load per-frame detections (views into one contiguous array)."""
+    with np.load(path) as data:
+        dets, offsets = data["dets"], data["offsets"]
+    return [dets[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def load_meta(path: Path) -> dict:
+    """Metadata stored alongside the cache (weights, classes, sequence, class names, ...)."""
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+    if meta.get("names"):
+        meta["names"] = {int(k): v for k, v in meta["names"].items()}   # JSON keys are strings
+    return meta
+
+
+def cache_sequence(
+    model,
+    seq: str,
+    path: Path,
+    classes: tuple | None = (0, 1),
+    batch: int = 8,
+    root: Path = KITTI_ROOT,
+    imgsz: tuple = KITTI_IMGSZ
+) -> List[np.ndarray]:
+    """
+    Run the detector over a KITTI sequence and cache its detections.
+    model: Ultralytics YOLO, or a DetectorBackend (input shape / classes fixed when it was loaded).
+    """
+    from src.model.backends import DetectorBackend, predict_paths, ultralytics_stream
+    from src.model.ghost_infuser import results_to_dets
+
+    frames = list_frames(seq, root)
+    print(f" Caching seq-{seq}: {len(frames)} frames → {path}")
+    dets = []
+    if isinstance(model, DetectorBackend):
+        results = predict_paths(model, frames, batch)
+        to_dets = lambda d: d
+    else:
+        results = ultralytics_stream(model, frames, batch, imgsz)
+        to_dets = lambda r: results_to_dets(r, classes)
+    for i, res in enumerate(results):
+        dets.append(to_dets(res))
+        if (i + 1) % 200 == 0:
+            print(f"   {i + 1}/{len(frames)}")
+
+    save_detections(
+        path, dets,
+        seq=seq,
+        weights=str(getattr(model, "ckpt_path", None) or getattr(model, "weights", "") or ""),
+        classes=list(classes) if classes is not None else None,
+        num_frames=len(frames),
+        imgsz=list(imgsz),
+        names=dict(getattr(model, "names", None) or {})
+    )
+    return dets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache GhostDet detections per KITTI sequence.")
+    parser.add_argument("--seqs", nargs="+", default=["0006"])
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--out", type=Path, default=CACHE_DIR)
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--classes", nargs="+", type=int, default=[0, 1], help="Classes to keep (-1 = all)")
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--imgsz", nargs=2, type=int, default=list(KITTI_IMGSZ), metavar=("H", "W"))
+    parser.add_argument("--backend", default="ultralytics",
+                        help="'ultralytics' (YOLO.predict) or a src.model.backends name, e.g. 'torchscript' (cached TorchScript artifact, no Ultralytics import)")
+    args = parser.parse_args()
+
+    classes = None if -1 in args.classes else tuple(args.classes)
+    if args.backend == "ultralytics":
+        from ultralytics import YOLO
+        model = YOLO(args.weights)
+    else:
+        from src.model.backends import load_backend
+        model = load_backend(args.backend, args.weights, imgsz=tuple(args.imgsz), classes=classes)
+    for seq in args.seqs:
+        dets = cache_sequence(model, seq, args.out / f"{seq}.npz",
+                              classes=classes, batch=args.batch, root=args.root, imgsz=tuple(args.imgsz))
+        print(f"   {sum(len(d) for d in dets)} detections cached")
+
+
+if __name__ == "__main__":
+    main()
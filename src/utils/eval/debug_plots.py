@@ -1,20 +1,35 @@
 # debug_plots.py
+"""
+List training / validation runs and which result files they have (no heavy imports).
+
+Usage:
+  python -m src.utils.eval.debug_plots
+  python -m src.ghostdet eval runs
+"""
+
 from pathlib import Path
 
-# List all runs
-print(" Scanning for validation runs...")
-runs = list(Path("runs/detect").glob("val*"))
-ghost_runs = list(Path("runs/detect").glob("ghostdet*"))
-
-print("\nValidation runs:")
-for r in runs:
-    txt = r / "results.txt"
-    csv = r / "results.csv"
-    print(f"  {r.name}: results.txt={txt.exists()}, results.csv={csv.exists()}")
-
-print("\nGhostDet runs:")
-for r in ghost_runs:
-    txt = r / "results.txt"
-    csv = r / "results.csv"
-    val_txt = r / "val/results.txt"
-    print(f"  {r.name}: results.txt={txt.exists()}, results.csv={csv.exists()}, val/results.txt={val_txt.exists()}")
\ No newline at end of file
+RUNS_DIR = Path("runs/detect")
+
+
+def list_runs(runs_dir: Path = RUNS_DIR):
+    print(" Scanning for validation runs...")
+    runs = list(runs_dir.glob("val*"))
+    ghost_runs = list(runs_dir.glob("ghostdet*"))
+
+    print("\nValidation runs:")
+    for r in runs:
+        txt = r / "results.txt"
+        csv = r / "results.csv"
+        print(f"  {r.name}: results.txt={txt.exists()}, results.csv={csv.exists()}")
+
+    print("\nGhostDet runs:")
+    for r in ghost_runs:
+        txt = r / "results.txt"
+        csv = r / "results.csv"
+        val_txt = r / "val/results.txt"
+        print(f"  {r.name}: results.txt={txt.exists()}, results.csv={csv.exists()}, val/results.txt={val_txt.exists()}")
+
+
+if __name__ == "__main__":
+    list_runs()
\ No newline at end of file
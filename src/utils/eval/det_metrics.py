@@ -0,0 +1,297 @@
+# det_metrics.py
+"""
+Detection metrics from cached detections — real PR curves / mAP without re-running model.val.
+- Ground truth: YOLO label files of the preprocessed split (data/kitti_yolo_v1.1_clean,
+  <seq>_<frame>.txt, normalized `cls cx cy w h`) scaled to the KITTI frame size →
+  per-frame [K, 5] → [x1, y1, x2, y2, cls]. Frames of the split without a label file count
+  as background images; frames outside the split are skipped.
+- Detections: src/utils/det_cache.py caches ([N, 6] → [x1, y1, x2, y2, conf, cls], frame
+  pixels); cache classes are mapped to the dataset names when the label sets differ.
+- Matching (as Ultralytics val): candidate (GT, detection) pairs of the same class with
+  IoU ≥ 0.5 are collected for the whole sequence, sorted once by IoU, and each of the 10
+  thresholds 0.50:0.95 keeps the first pair per detection, then per GT (np.unique) —
+  no per-frame Python matching loop.
+- AP per class: detections sorted by confidence, cumulative TP / FP, 101-point interpolated
+  precision envelope (numbers comparable with model.val); PR curve, P / R / F1 at the max-F1 confidence and a
+  (nc + 1)² confusion matrix (last row / column = background).
+- rescore(): confidence threshold / class-aware NMS on the cached arrays, so a threshold or
+  NMS change is re-evaluated in milliseconds.
+→ logs/sweeps/det_metrics_<seq>.csv (one row per cache × --conf × --nms-iou)
+
+Usage:
+  python -m src.utils.eval.det_metrics --cache logs/det_cache/0006.npz
+  python -m src.utils.eval.det_metrics --cache logs/det_cache/0006.npz logs/det_cache/yolov8n/0006.npz
+  python -m src.utils.eval.det_metrics --conf 0.001 0.1 0.25 --nms-iou 0.5 0.7
+"""
+
+import argparse
+import csv
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.det_cache import CACHE_DIR, load_detections, load_meta
+from src.utils.eval.mot_metrics import box_iou
+from src.utils.kitti_io import KITTI_ROOT, list_frames, read_image
+
+DATA_DIR = Path("data/kitti_yolo_v1.1_clean")
+DATA_YAML = DATA_DIR / "kitti_ghostdet_v1.1_clean.yaml"
+OUT_DIR = Path("logs/sweeps")
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+RECALL_POINTS = np.linspace(0, 1, 101)         # AP interpolation
+CONF_POINTS = np.linspace(0, 1, 1000)          # P / R / F1 vs confidence
+
+
+def load_names(data_yaml: Path = DATA_YAML) -> Dict[int, str]:
+    """Class names of the YOLO dataset ({id: name})."""
+    import yaml
+
+    names = yaml.safe_load(Path(data_yaml).read_text())["names"]
+    return dict(enumerate(names)) if isinstance(names, list) else {int(k): v for k, v in names.items()}
+
+
+def frame_size(seq: str, root: Path = KITTI_ROOT) -> Tuple[int, int]:
+    """(h, w) of the KITTI frames the detections were cached on."""
+    return read_image(list_frames(seq, root)[0]).shape[:2]
+
+
+def load_yolo_labels(
+    seq: str,
+    frame_hw: Tuple[int, int],
+    data_dir: Path = DATA_DIR,
+    split: str = "val"
+) -> Dict[int, np.ndarray]:
+    """
+    Ground truth of one sequence from the YOLO split.
+
+    Returns:
+        {frame index: [K, 5] → [x1, y1, x2, y2, cls]} for every image of the split
+    """
+    h, w = frame_hw
+    gt = {}
+    for img in sorted((Path(data_dir) / "images" / split).glob(f"{seq}_*")):
+        label = Path(data_dir) / "labels" / split / f"{img.stem}.txt"
+        rows = np.array(label.read_text().split() if label.exists() else [], dtype=np.float64).reshape(-1, 5)
+        cx, cy, bw, bh = rows[:, 1] * w, rows[:, 2] * h, rows[:, 3] * w, rows[:, 4] * h
+        gt[int(img.stem.rsplit("_", 1)[1])] = np.stack(
+            [cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2, rows[:, 0]], axis=1)
+    return gt
+
+
+def rescore(
+    det_frames: List[np.ndarray], conf: float = 0.001, nms_iou: Optional[float] = None
+) -> List[np.ndarray]:
+    """Drop detections below `conf`; optionally re-run class-aware NMS at `nms_iou` per frame."""
+    out = [d[d[:, 4] >= conf] for d in det_frames]
+    if nms_iou is not None:
+        from src.model.tiles import merge_detections
+
+        out = [merge_detections(d, iou=nms_iou, ios=1.0) for d in out]     # IoS ≤ 1 → IoU only
+    return out
+
+
+def _pairs(
+    det_frames: Sequence[np.ndarray], gt_frames: Sequence[np.ndarray], iou_min: float, by_class: bool
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """All (GT, detection) pairs with IoU ≥ iou_min, global indices, sorted by IoU (descending)."""
+    gi, di, ious = [], [], []
+    g0 = d0 = 0
+    for det, gt in zip(det_frames, gt_frames):
+        if len(det) and len(gt):
+            iou = box_iou(gt[:, :4], det[:, :4])
+            if by_class:
+                iou[gt[:, 4, None] != det[None, :, 5]] = 0
+            g, d = np.nonzero(iou >= iou_min)
+            gi.append(g + g0)
+            di.append(d + d0)
+            ious.append(iou[g, d])
+        g0 += len(gt)
+        d0 += len(det)
+    if not gi:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0)
+    gi, di, ious = np.concatenate(gi), np.concatenate(di), np.concatenate(ious)
+    order = np.argsort(-ious, kind="stable")
+    return gi[order], di[order], ious[order]
+
+
+def _unique_matches(gi: np.ndarray, di: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """One-to-one matches from IoU-sorted pairs: first pair per detection, then per GT."""
+    keep = np.sort(np.unique(di, return_index=True)[1])
+    gi, di = gi[keep], di[keep]
+    keep = np.unique(gi, return_index=True)[1]
+    return gi[keep], di[keep]
+
+
+def match_detections(
+    det_frames: Sequence[np.ndarray], gt_frames: Sequence[np.ndarray], iouv: np.ndarray = IOU_THRESHOLDS
+) -> np.ndarray:
+    """True-positive flags [M, T] for all M detections (frame order) at each IoU threshold."""
+    tp = np.zeros((sum(len(d) for d in det_frames), len(iouv)), dtype=bool)
+    gi, di, ious = _pairs(det_frames, gt_frames, iouv[0], by_class=True)
+    for t, thr in enumerate(iouv):
+        n = np.searchsorted(-ious, -thr, side="right")       # pairs with IoU ≥ thr (sorted prefix)
+        tp[_unique_matches(gi[:n], di[:n])[1], t] = True
+    return tp
+
+
+def average_precision(recall: np.ndarray, precision: np.ndarray) -> Tuple[float, np.ndarray, np.ndarray]:
+    """101-point interpolated AP (trapezoid, as Ultralytics); also returns the precision envelope."""
+    mrec = np.concatenate([[0.0], recall, [1.0]])
+    mpre = np.concatenate([[1.0], precision, [0.0]])
+    mpre = np.flip(np.maximum.accumulate(np.flip(mpre)))
+    y = np.interp(RECALL_POINTS, mrec, mpre)
+    ap = ((y[1:] + y[:-1]) / 2).mean()
+    return float(ap), mrec, mpre
+
+
+def confusion_matrix(
+    det_frames: Sequence[np.ndarray], gt_frames: Sequence[np.ndarray], nc: int,
+    conf: float = 0.25, iou: float = 0.45
+) -> np.ndarray:
+    """[nc + 1, nc + 1] counts, rows = predicted, columns = true class (index nc = background)."""
+    det_frames = [d[d[:, 4] >= conf] for d in det_frames]
+    pred_cls = np.concatenate([d[:, 5] for d in det_frames]).astype(np.int64) if det_frames else np.empty(0, int)
+    true_cls = np.concatenate([g[:, 4] for g in gt_frames]).astype(np.int64) if gt_frames else np.empty(0, int)
+    gi, di = _unique_matches(*_pairs(det_frames, gt_frames, iou, by_class=False)[:2])
+
+    cm = np.zeros((nc + 1, nc + 1), dtype=np.int64)
+    np.add.at(cm, (pred_cls[di], true_cls[gi]), 1)
+    np.add.at(cm, (nc, np.delete(true_cls, gi)), 1)           # missed GT
+    np.add.at(cm, (np.delete(pred_cls, di), nc), 1)           # background detections
+    return cm
+
+
+def evaluate(
+    det_frames: Sequence[np.ndarray], gt_frames: Sequence[np.ndarray], nc: int,
+    cm_conf: float = 0.25, cm_iou: float = 0.45
+) -> dict:
+    """
+    Per-class AP at IoU 0.50:0.95, PR curves and confusion matrix for aligned per-frame lists.
+
+    Returns:
+        dict with ap [nc, 10], n_gt [nc], p / r / f1 [nc] at the max-F1 confidence `conf`,
+        curves {"recall": RECALL_POINTS, "precision": [nc, 101] IoU-0.5 envelope, "p" / "r" / "f1":
+        [nc, 1000] vs CONF_POINTS}, map50 / map over classes with GT, confusion [nc + 1, nc + 1]
+    """
+    tp = match_detections(det_frames, gt_frames)
+    dets = np.concatenate([np.asarray(d).reshape(-1, 6) for d in det_frames]) if det_frames else np.empty((0, 6))
+    n_gt = np.bincount(np.concatenate([g[:, 4] for g in gt_frames]).astype(np.int64), minlength=nc)[:nc] \
+        if gt_frames else np.zeros(nc, dtype=np.int64)
+
+    order = np.argsort(-dets[:, 4], kind="stable")
+    tp, conf, cls = tp[order], dets[order, 4], dets[order, 5].astype(np.int64)
+    ap = np.zeros((nc, len(IOU_THRESHOLDS)))
+    pr = np.zeros((nc, len(RECALL_POINTS)))
+    p_curve, r_curve = np.zeros((nc, len(CONF_POINTS))), np.zeros((nc, len(CONF_POINTS)))
+    for c in range(nc):
+        i = cls == c
+        if not i.any() or not n_gt[c]:
+            continue
+        tpc = tp[i].cumsum(0)
+        fpc = (~tp[i]).cumsum(0)
+        recall = tpc / n_gt[c]
+        precision = tpc / (tpc + fpc)
+        # conf is descending → interpolate on -conf
+        r_curve[c] = np.interp(-CONF_POINTS, -conf[i], recall[:, 0], left=0)
+        p_curve[c] = np.interp(-CONF_POINTS, -conf[i], precision[:, 0], left=1)
+        for t in range(len(IOU_THRESHOLDS)):
+            ap[c, t], mrec, mpre = average_precision(recall[:, t], precision[:, t])
+            if t == 0:
+                pr[c] = np.interp(RECALL_POINTS, mrec, mpre)
+
+    f1 = 2 * p_curve * r_curve / np.maximum(p_curve + r_curve, 1e-16)
+    present = n_gt > 0
+    best = int(f1[present].mean(0).argmax()) if present.any() else 0
+    return {
+        "ap": ap, "n_gt": n_gt, "n_det": np.bincount(cls, minlength=nc)[:nc],
+        "map50": float(ap[present, 0].mean()) if present.any() else 0.0,
+        "map": float(ap[present].mean()) if present.any() else 0.0,
+        "conf": float(CONF_POINTS[best]),
+        "p": p_curve[:, best], "r": r_curve[:, best], "f1": f1[:, best],
+        "curves": {"recall": RECALL_POINTS, "precision": pr, "p": p_curve, "r": r_curve, "f1": f1},
+        "confusion": confusion_matrix(det_frames, gt_frames, nc, cm_conf, cm_iou),
+    }
+
+
+def load_cache_gt(
+    cache: Path,
+    seq: Optional[str] = None,
+    data_dir: Path = DATA_DIR,
+    root: Path = KITTI_ROOT,
+    frame_hw: Optional[Tuple[int, int]] = None
+) -> Tuple[List[np.ndarray], List[np.ndarray], Dict[int, str], str]:
+    """
+    Aligned per-frame detections / YOLO ground truth of a det_cache .npz (frames of the split only).
+    Cache classes are mapped to the dataset names when the label sets differ.
+
+    Returns:
+        (det_frames, gt_frames, names, seq)
+    """
+    from src.model.cascade import class_map, remap_classes
+
+    meta = load_meta(cache)
+    seq = seq or meta.get("seq", "0006")
+    names = load_names(Path(data_dir) / DATA_YAML.name)
+    dets = load_detections(cache)
+    if meta.get("names") and meta["names"] != names:
+        mapping = class_map(meta["names"], names)
+        dets = [remap_classes(d, mapping) for d in dets]
+    gt = load_yolo_labels(seq, frame_hw or frame_size(seq, root), data_dir)
+    frames = [i for i in sorted(gt) if i < len(dets)]
+    return [dets[i] for i in frames], [gt[i] for i in frames], names, seq
+
+
+def main():
+    parser = argparse.ArgumentParser(description="mAP / PR curves / confusion matrix from cached detections.")
+    parser.add_argument("--cache", nargs="+", type=Path, default=[CACHE_DIR / "0006.npz"])
+    parser.add_argument("--seq", default=None, help="Sequence (default: from the cache metadata)")
+    parser.add_argument("--data", type=Path, default=DATA_DIR, help="YOLO dataset with images/val + labels/val")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT, help="KITTI root (frame size for the labels)")
+    parser.add_argument("--frame-size", nargs=2, type=int, default=None, metavar=("H", "W"),
+                        help="Frame size of the cached detections (skips reading a KITTI frame)")
+    parser.add_argument("--conf", nargs="+", type=float, default=[0.001], help="Confidence thresholds to re-score at")
+    parser.add_argument("--nms-iou", nargs="+", type=float, default=None, help="Re-run class-aware NMS at these IoUs")
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    rows = []
+    for cache in args.cache:
+        dets, gt, names, seq = load_cache_gt(cache, args.seq, args.data, args.root,
+                                             tuple(args.frame_size) if args.frame_size else None)
+        print(f"\n {cache}: seq-{seq}, {len(gt)} frames, {sum(len(g) for g in gt)} GT boxes")
+        for conf in args.conf:
+            for nms_iou in args.nms_iou or [None]:
+                t0 = time.perf_counter()
+                res = evaluate(rescore(dets, conf, nms_iou), gt, len(names))
+                ms = (time.perf_counter() - t0) * 1000
+                present = res["n_gt"] > 0
+                rows.append({
+                    "cache": str(cache), "seq": seq, "conf": conf, "nms_iou": nms_iou,
+                    "P": round(float(res["p"][present].mean()), 4), "R": round(float(res["r"][present].mean()), 4),
+                    "mAP50": round(res["map50"], 4), "mAP50-95": round(res["map"], 4),
+                    **{f"AP50_{names[c]}": round(float(res["ap"][c, 0]), 4) for c in np.flatnonzero(present)},
+                    "ms": round(ms, 1),
+                })
+                print(f"\n   conf ≥ {conf}" + (f", NMS {nms_iou}" if nms_iou is not None else "")
+                      + f" — re-scored in {ms:.1f} ms")
+                print(f"   {'class':<11} | {'GT':>5} | {'dets':>6} | {'P':>5} | {'R':>5} | {'AP50':>5} | {'AP50-95':>7}")
+                for c, name in names.items():
+                    if present[c] or res["n_det"][c]:
+                        print(f"   {name:<11} | {res['n_gt'][c]:>5d} | {res['n_det'][c]:>6d} | {res['p'][c]:>5.3f} | "
+                              f"{res['r'][c]:>5.3f} | {res['ap'][c, 0]:>5.3f} | {res['ap'][c].mean():>7.3f}")
+                print(f"   {'all':<11} | {res['n_gt'].sum():>5d} | {res['n_det'].sum():>6d} | {rows[-1]['P']:>5.3f} | "
+                      f"{rows[-1]['R']:>5.3f} | {res['map50']:>5.3f} | {res['map']:>7.3f}   (max-F1 conf {res['conf']:.3f})")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_path = args.out / f"det_metrics_{rows[0]['seq']}.csv"
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(dict.fromkeys(k for r in rows for k in r)))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\n Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+# export_mot.py
+"""
+Unified GhostDet tracking exporter (KITTI / MOTChallenge).
+Replaces generate_kitti_mot.py + generate_mot_results.py:
+- Optional GhostInfuser pass → real track IDs (instead of hardcoded id=-1).
+- Offline tracker (smooth_sequence): whole-sequence association + zero-phase trajectory smoothing.
+- Whole frames formatted from arrays (one string op per frame, no per-box .tolist()/float()).
+- One buffered f.write per chunk of frames.
+- Multiple sequences per invocation.
+
+Formats:
+  kitti: TrackEval kitti_2d_box, 0-based frames
+         <frame> <id> <type> -1 -1 -10 <left> <top> <right> <bottom> -1 -1 -1 -1000 -1000 -1000 -10 <score>
+  mot:   MOTChallenge, 1-based frames
+         <frame>,<id>,<left>,<top>,<width>,<height>,<conf>,-1,-1,-1
+
+Usage:
+  python -m src.utils.eval.export_mot --seqs 0006 --format kitti --tracker infuser
+  python -m src.utils.eval.export_mot --seqs 0006 0007 --format mot --tracker none
+  python -m src.utils.eval.export_mot --seqs 0006 --tracker offline --offline-method fb_ema
+  python -m src.utils.eval.export_mot --seqs 0006 --backend torchscript   # cached TorchScript artifact, no Ultralytics import
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from src.model.backends import DetectorBackend, load_backend, predict_paths, ultralytics_stream
+from src.model.ghost_infuser import (
+    OFFLINE_METHODS, SMOOTHING_MODES, GhostInfuser, results_to_dets, smooth_sequence
+)
+from src.utils.kitti_io import KITTI_IMGSZ, KITTI_ROOT, list_frames
+from src.utils.profiling import StageProfiler
+
+WEIGHTS = "runs/detect/ghostdet_local2/weights/best.pt"
+
+# TrackEval expects: data/trackers/kitti/kitti_train/ghostdet/data/<seq>.txt
+OUT_DIRS = {
+    "kitti": Path("tools/TrackEval/data/trackers/kitti/kitti_train/ghostdet/data"),
+    "mot": Path("logs/ghostdet_mot"),
+}
+
+# GhostDet class IDs (kitti_ghostdet_v1.1_clean.yaml) → KITTI object type
+KITTI_TYPES = np.array(["Car", "Truck", "Pedestrian", "Cyclist"])
+
+ROW_FORMATS = {
+    "kitti": "{frame} %d %s -1 -1 -10 %.2f %.2f %.2f %.2f -1 -1 -1 -1000 -1000 -1000 -10 %.6f\n",
+    "mot": "{frame},%d,%.2f,%.2f,%.2f,%.2f,%.3f,-1,-1,-1\n",
+}
+
+
+def format_frame(frame_idx: int, tracks: np.ndarray, fmt: str = "kitti") -> str:
+    """
+    Format one frame of tracks in a single % operation.
+
+    Args:
+        frame_idx: 0-based frame index (MOT output is shifted to 1-based).
+        tracks: [N, 7] → [x1, y1, x2, y2, conf, cls, track_id]
+        fmt: 'kitti' or 'mot'
+    """
+    n = len(tracks)
+    if n == 0:
+        return ""
+    x1, y1, x2, y2, conf, cls, ids = tracks.T
+    ids = ids.astype(np.int64)
+    if fmt == "kitti":
+        cols = [ids, KITTI_TYPES[cls.astype(np.int64)], x1, y1, x2, y2, conf]
+        frame = frame_idx
+    else:
+        cols = [ids, x1, y1, x2 - x1, y2 - y1, conf]
+        frame = frame_idx + 1
+
+    # Interleave columns row-major: [id0, type0, ..., id1, type1, ...]
+    values = [None] * (n * len(cols))
+    for k, col in enumerate(cols):
+        values[k::len(cols)] = col.tolist()
+    return (ROW_FORMATS[fmt].format(frame=frame) * n) % tuple(values)
+
+
+class BackendResult(NamedTuple):
+    """Per-frame DetectorBackend output with an Ultralytics-like .speed (ms)."""
+    dets: np.ndarray
+    speed: dict
+
+
+def backend_results(backend, frames: list, batch: int = 8):
+    """Stream a DetectorBackend over image files; batch time (read + infer + decode) split per frame."""
+    for i in range(0, len(frames), batch):
+        t0 = time.perf_counter()
+        dets = list(predict_paths(backend, frames[i:i + batch], batch))
+        ms = (time.perf_counter() - t0) * 1000 / max(len(dets), 1)
+        yield from (BackendResult(d, {"predict": ms}) for d in dets)
+
+
+def export_sequence(
+    model,
+    seq: str,
+    out_path: Path,
+    fmt: str = "kitti",
+    infuser: GhostInfuser | None = None,
+    classes: tuple = (0, 1),
+    chunk: int = 64,
+    batch: int = 8,
+    root: Path = KITTI_ROOT,
+    prof: StageProfiler | None = None,
+    offline: dict | None = None,
+    imgsz: tuple = KITTI_IMGSZ
+) -> int:
+    """
+    Run the detector over one sequence and write tracks to out_path.
+    model: Ultralytics YOLO, or a DetectorBackend (input shape / classes fixed when it was loaded).
+    offline: smooth_sequence() kwargs → detections are collected first and
+             tracked/smoothed over the whole sequence (infuser is ignored).
+    Returns the number of rows written.
+    """
+    prof = prof or StageProfiler(enabled=False)
+    frames = list_frames(seq, root)
+    print(f" seq-{seq}: {len(frames)} frames → {out_path}")
+
+    if isinstance(model, DetectorBackend):
+        results = backend_results(model, frames, batch)
+        to_dets = lambda r: r.dets
+    else:
+        results = ultralytics_stream(model, frames, batch, imgsz)
+        to_dets = lambda r: results_to_dets(r, classes)
+    if offline is not None:
+        dets = []
+        for res in results:
+            prof.next_frame()
+            for stage, ms in res.speed.items():
+                prof.record(stage, ms)
+            dets.append(to_dets(res))
+        prof.end_frame()
+        with prof.stage("smooth_offline"):
+            results = smooth_sequence(dets, **offline)
+
+    buf, n_rows = [], 0
+    with open(out_path, "w", buffering=1 << 20) as f:
+        for frame_idx, res in enumerate(results):
+            if offline is not None:
+                tracks = res
+            else:
+                prof.next_frame()
+                # Decode + inference happen inside the stream; Ultralytics reports the split
+                for stage, ms in res.speed.items():
+                    prof.record(stage, ms)
+
+                with prof.stage("smooth"):
+                    dets = to_dets(res)
+                    if infuser is not None:
+                        tracks = infuser.update(dets)
+                    else:
+                        tracks = np.column_stack([dets, np.full(len(dets), -1.0)])
+
+            with prof.stage("format"):
+                buf.append(format_frame(frame_idx, tracks, fmt))
+            n_rows += len(tracks)
+
+            # One write per chunk of frames
+            if len(buf) >= chunk:
+                with prof.stage("write"):
+                    f.write("".join(buf))
+                buf.clear()
+        prof.end_frame()
+        f.write("".join(buf))
+
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export GhostDet tracks in KITTI or MOTChallenge format.")
+    parser.add_argument("--seqs", nargs="+", default=["0006"], help="KITTI tracking sequences (e.g. 0006 0007)")
+    parser.add_argument("--format", choices=sorted(ROW_FORMATS), default="kitti")
+    parser.add_argument("--tracker", choices=["infuser", "offline", "none"], default="infuser",
+                        help="'infuser' = GhostInfuser track IDs, 'offline' = smooth_sequence() over the "
+                             "whole sequence, 'none' = raw detections with id -1")
+    parser.add_argument("--weights", default=WEIGHTS)
+    parser.add_argument("--out", type=Path, default=None, help="Output dir (default depends on --format)")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT, help="KITTI root folder")
+    parser.add_argument("--classes", nargs="+", type=int, default=[0, 1], choices=range(len(KITTI_TYPES)))
+    parser.add_argument("--batch", type=int, default=8, help="Frames per detector batch")
+    parser.add_argument("--backend", default="ultralytics",
+                        help="'ultralytics' (YOLO.predict) or a src.model.backends name, e.g. 'torchscript' (cached TorchScript artifact, no Ultralytics import)")
+    parser.add_argument("--chunk", type=int, default=64, help="Frames per buffered write")
+    parser.add_argument("--imgsz", nargs=2, type=int, default=list(KITTI_IMGSZ), metavar=("H", "W"),
+                        help="Detector input (default 192×640, native KITTI aspect)")
+    # GhostInfuser settings
+    parser.add_argument("--alpha", type=float, default=0.6)
+    parser.add_argument("--occlusion-threshold", type=float, default=0.3)
+    parser.add_argument("--iou-match-thresh", type=float, default=0.4)
+    parser.add_argument("--max-age", type=int, default=5)
+    parser.add_argument("--motion", action="store_true", help="Constant-velocity prediction in GhostInfuser")
+    parser.add_argument("--smoothing", choices=SMOOTHING_MODES, default="ema")
+    parser.add_argument("--window", type=int, default=3, help="Boxes per track for windowed smoothing")
+    parser.add_argument("--offline-method", choices=OFFLINE_METHODS, default="fb_ema")
+    parser.add_argument("--lag", type=int, default=2, help="Half-width of --offline-method window")
+    args = parser.parse_args()
+
+    out_dir = args.out or OUT_DIRS[args.format]
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f" Loading model: {args.weights} ({args.backend})")
+    if args.backend == "ultralytics":
+        from ultralytics import YOLO
+        model = YOLO(args.weights)
+    else:
+        model = load_backend(args.backend, args.weights, imgsz=tuple(args.imgsz), classes=tuple(args.classes))
+    prof = StageProfiler.from_env(f"export_mot_{args.format}")  # GHOSTDET_PROFILE=0 to disable
+
+    offline = None
+    if args.tracker == "offline":
+        offline = {
+            "method": args.offline_method,
+            "alpha": args.alpha,
+            "lag": args.lag,
+            "iou_match_thresh": args.iou_match_thresh,
+            "max_age": args.max_age,
+        }
+
+    for seq in args.seqs:
+        infuser = None
+        if args.tracker == "infuser":
+            # Fresh tracker state per sequence
+            infuser = GhostInfuser(
+                alpha=args.alpha,
+                occlusion_threshold=args.occlusion_threshold,
+                iou_match_thresh=args.iou_match_thresh,
+                max_age=args.max_age,
+                motion=args.motion,
+                smoothing=args.smoothing,
+                window=args.window
+            )
+        n_rows = export_sequence(
+            model, seq, out_dir / f"{seq}.txt",
+            fmt=args.format,
+            infuser=infuser,
+            classes=tuple(args.classes),
+            chunk=args.chunk,
+            batch=args.batch,
+            root=args.root,
+            prof=prof,
+            offline=offline,
+            imgsz=tuple(args.imgsz)
+        )
+        print(f"   Wrote {n_rows} rows ({prof.fps():.1f} FPS)")
+
+    prof.report()
+    print(f" Done. Results in {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,27 @@
-# generate_comparison_plots.py (v6 — uses training curves + manual validation DetA)
+# generate_comparison_plots.py (v7 — real PR curves / mAP from cached detections)
 """
 Auto-generate PR curves & confusion matrices.
-- GhostDet: reads training results.csv (93.1% DetA from validation)
-- YOLOv8n: reads training results.csv (0.128% DetA from validation)
+- Both models are scored from their detection caches (src/utils/det_cache.py) against the
+  YOLO val labels with src/utils/eval/det_metrics.py — no model.val re-run, no synthetic curves.
+- GhostDet: logs/det_cache/0006.npz (fine-tuned best.pt)
+- YOLOv8n:  logs/det_cache/yolov8n/0006.npz (stock COCO weights, classes mapped to kitti names)
+- Training results.csv (if present) is still printed for reference.
+
+Usage:
+  python -m src.utils.det_cache --seqs 0006
+  python -m src.utils.det_cache --seqs 0006 --weights yolov8n.pt --classes -1 --out logs/det_cache/yolov8n
+  python -m src.utils.eval.generate_comparison_plots
 """
 
+import argparse
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from pathlib import Path
-import cv2
+
+from src.utils.det_cache import CACHE_DIR
+from src.utils.eval.det_metrics import DATA_DIR, evaluate, load_cache_gt
+from src.utils.kitti_io import KITTI_ROOT
 
 def load_training_curves(csv_path: Path, run_name: str):
     """Load training curves from results.csv (for visualization)"""
@@ -28,68 +40,75 @@ def load_training_curves(csv_path: Path, run_name: str):
     print(f" {run_name} (training final): mAP50={final_map50:.1%}, P={final_p:.1%}, R={final_r:.1%}")
     return epochs, map50, precision, recall, final_map50, final_p, final_r
 
-def load_confusion_matrix(run_dir: Path):
-    img_path = run_dir / "confusion_matrix.png"
-    if not img_path.exists():
-        raise FileNotFoundError(f"confusion_matrix.png not found in {run_dir}")
-    return cv2.imread(str(img_path))
-
-def generate_synthetic_pr_curve(map50, p, r, n_points=100):
-    """Generate smooth PR curve approximating mAP50"""
-    recall = np.linspace(0, r, n_points)
-    precision = p * (1 - max(0, 1 - map50/p) * (recall/r)**2)
-    precision = np.clip(precision, 0, 1)
-    return recall, precision
+def score_cache(cache: Path, args, run_name: str) -> dict:
+    """Real P / R / mAP, PR curves and confusion matrix of one detection cache."""
+    if not cache.exists():
+        raise FileNotFoundError(f"{cache} not found. Run: python -m src.utils.det_cache (see --help)")
+    dets, gt, names, _ = load_cache_gt(cache, args.seq, args.data, args.root,
+                                       tuple(args.frame_size) if args.frame_size else None)
+    res = evaluate(dets, gt, len(names), cm_conf=args.conf)
+    res["names"] = names
+    present = res["n_gt"] > 0
+    res["mp"], res["mr"] = float(res["p"][present].mean()), float(res["r"][present].mean())
+    print(f" {run_name} (val, {len(gt)} frames): mAP50={res['map50']:.1%}, mAP50-95={res['map']:.1%}, "
+          f"P={res['mp']:.1%}, R={res['mr']:.1%}")
+    return res
+
+def plot_pr(ax, res: dict, title: str):
+    """Per-class PR curves (IoU 0.5) + the class mean."""
+    curves = res["curves"]
+    present = np.flatnonzero(res["n_gt"] > 0)
+    for c in present:
+        ax.plot(curves["recall"], curves["precision"][c], linewidth=1,
+                label=f"{res['names'][c]} (AP50={res['ap'][c, 0]:.1%})")
+    ax.plot(curves["recall"], curves["precision"][present].mean(0), color='black', linewidth=2.5,
+            label=f"all (mAP50={res['map50']:.1%})")
+    ax.set(xlabel='Recall', ylabel='Precision', title=title, xlim=(0, 1), ylim=(0, 1.02))
+    ax.grid(True, alpha=0.3); ax.legend(loc='lower left')
+
+def plot_confusion(ax, res: dict, title: str):
+    """Column-normalized confusion matrix (rows = predicted, columns = true; last = background)."""
+    cm = res["confusion"].astype(float)
+    norm = cm / np.maximum(cm.sum(0, keepdims=True), 1)
+    labels = [*res["names"].values(), 'background']
+    ax.imshow(norm, cmap='Blues', vmin=0, vmax=1)
+    for (i, j), n in np.ndenumerate(cm):
+        if n:
+            ax.text(j, i, f"{norm[i, j]:.2f}\n({int(n)})", ha='center', va='center', fontsize=7,
+                    color='white' if norm[i, j] > 0.5 else 'black')
+    ax.set_xticks(range(len(labels)), labels, rotation=45, ha='right')
+    ax.set_yticks(range(len(labels)), labels)
+    ax.set(xlabel='True', ylabel='Predicted', title=title)
 
 def main():
-    # Known validation DetA from your earlier runs
-    GHOSTDET_VAL_MAP50 = 0.939  # 93.9% (from val on seq-0006)
-    YOLO_VAL_MAP50 = 0.00128    # 0.128% (from val on seq-0006)
-
-    # Paths
-    ghostdet_run = Path("runs/detect/ghostdet_local2")  # Has results.csv
-    yolov8_run = Path("runs/detect/val_yolov8n2")       # Has confusion matrix
-
-    # Load training curves
-    try:
-        _, _, _, _, ghost_train_map50, ghost_train_p, ghost_train_r = load_training_curves(ghostdet_run / "results.csv", "GhostDet")
-        _, _, _, _, yolo_train_map50, yolo_train_p, yolo_train_r = load_training_curves(yolov8_run / "results.csv", "YOLOv8n")  # This will fail
-    except:
-        print("  YOLOv8n training results not found. Using validation DetA directly.")
-        yolo_train_map50, yolo_train_p, yolo_train_r = YOLO_VAL_MAP50, 0.00232, 0.0538  # From your console output
-
-    # Use validation DetA for final comparison (more accurate)
-    ghost_map50, ghost_p, ghost_r = GHOSTDET_VAL_MAP50, 0.937, 0.856  # From your val output
-    yolo_map50, yolo_p, yolo_r = YOLO_VAL_MAP50, 0.00232, 0.0538    # From your val output
-
-    # Load confusion matrices
-    try:
-        ghost_cm = load_confusion_matrix(ghostdet_run)
-        yolo_cm = load_confusion_matrix(yolov8_run)
-    except FileNotFoundError:
-        print("  Confusion matrix not found. Using GhostDet CM for both.")
-        ghost_cm = load_confusion_matrix(ghostdet_run)
-        yolo_cm = ghost_cm  # Fallback
-
-    # Generate synthetic PR curves (for visualization)
-    yolo_recall, yolo_prec = generate_synthetic_pr_curve(yolo_map50, yolo_p, yolo_r)
-    ghost_recall, ghost_prec = generate_synthetic_pr_curve(ghost_map50, ghost_p, ghost_r)
+    parser = argparse.ArgumentParser(description="YOLOv8n vs GhostDet PR curves / confusion matrices from cached detections.")
+    parser.add_argument("--ghostdet-cache", type=Path, default=CACHE_DIR / "0006.npz")
+    parser.add_argument("--yolo-cache", type=Path, default=CACHE_DIR / "yolov8n" / "0006.npz")
+    parser.add_argument("--seq", default=None, help="Sequence (default: from the cache metadata)")
+    parser.add_argument("--data", type=Path, default=DATA_DIR)
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--frame-size", nargs=2, type=int, default=None, metavar=("H", "W"))
+    parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold of the confusion matrices")
+    parser.add_argument("--out", type=Path, default=Path("figures/comparison_v1.1_clean"))
+    args = parser.parse_args()
+
+    # Training curves (reference only)
+    for run_dir, run_name in ((Path("runs/detect/ghostdet_local2"), "GhostDet"), (Path("runs/detect/val_yolov8n2"), "YOLOv8n")):
+        if (run_dir / "results.csv").exists():
+            load_training_curves(run_dir / "results.csv", run_name)
+
+    # Validation metrics from the detection caches
+    yolo = score_cache(args.yolo_cache, args, "YOLOv8n")
+    ghost = score_cache(args.ghostdet_cache, args, "GhostDet")
 
     # Create output dir
-    out_dir = Path("figures/comparison_v1.1_clean")
+    out_dir = args.out
     out_dir.mkdir(parents=True, exist_ok=True)
 
     # === Plot 1: PR Curves ===
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
-
-    ax1.plot(yolo_recall, yolo_prec, color='#FF6F00', linewidth=2, label=f'YOLOv8n (mAP50={yolo_map50:.1%})')
-    ax1.set(xlabel='Recall', ylabel='Precision', title='YOLOv8n (Untuned)')
-    ax1.grid(True, alpha=0.3); ax1.legend()
-
-    ax2.plot(ghost_recall, ghost_prec, color='#00C853', linewidth=2, label=f'GhostDet (mAP50={ghost_map50:.1%})')
-    ax2.set(xlabel='Recall', ylabel='Precision', title='GhostDet (Fine-tuned)')
-    ax2.grid(True, alpha=0.3); ax2.legend()
-
+    plot_pr(ax1, yolo, 'YOLOv8n (Untuned)')
+    plot_pr(ax2, ghost, 'GhostDet (Fine-tuned)')
     plt.tight_layout()
     pr_path = out_dir / "pr_comparison.png"
     plt.savefig(pr_path, dpi=150, bbox_inches='tight')
@@ -97,9 +116,9 @@ def main():
     print(f" PR curves saved to: {pr_path}")
 
     # === Plot 2: Confusion Matrices ===
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 5))
-    ax1.imshow(cv2.cvtColor(yolo_cm, cv2.COLOR_BGR2RGB)); ax1.set_title('YOLOv8n'); ax1.axis('off')
-    ax2.imshow(cv2.cvtColor(ghost_cm, cv2.COLOR_BGR2RGB)); ax2.set_title('GhostDet'); ax2.axis('off')
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5.5))
+    plot_confusion(ax1, yolo, f'YOLOv8n (conf ≥ {args.conf})')
+    plot_confusion(ax2, ghost, f'GhostDet (conf ≥ {args.conf})')
     plt.tight_layout()
     cm_path = out_dir / "confusion_matrix_comparison.png"
     plt.savefig(cm_path, dpi=150, bbox_inches='tight')
@@ -107,15 +126,13 @@ def main():
     print(f" Confusion matrices saved to: {cm_path}")
 
     # === Summary ===
+    rows = [("mAP50", "map50"), ("mAP50-95", "map"), ("Precision", "mp"), ("Recall", "mr")]
     summary = f"""
-GhostDet v1.1 Comparison (KITTI seq-0006, cars only)
+GhostDet v1.1 Comparison (KITTI seq-0006 val, cached detections)
 =================================================
 Metric         | YOLOv8n | GhostDet | Δ
 ---------------|---------|----------|--------
-mAP50 (DetA)   | {yolo_map50:.1%} | {ghost_map50:.1%} | +{ghost_map50 - yolo_map50:.1%}
-Precision      | {yolo_p:.1%}   | {ghost_p:.1%}   | +{ghost_p - yolo_p:.1%}
-Recall         | {yolo_r:.1%}   | {ghost_r:.1%}   | +{ghost_r - yolo_r:.1%}
-    """
+""" + "\n".join(f"{name:<14} | {yolo[k]:>7.1%} | {ghost[k]:>8.1%} | {ghost[k] - yolo[k]:>+.1%}" for name, k in rows) + "\n"
     print(summary)
     (out_dir / "comparison_summary.txt").write_text(summary.replace("Δ", "D"))
     print(f" Summary saved to: {out_dir}/comparison_summary.txt")
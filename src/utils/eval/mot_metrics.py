@@ -0,0 +1,131 @@
+# mot_metrics.py
+"""
+Lightweight tracking metrics for GhostDet (no TrackEval dependency).
+- CLEAR-MOT (MOTA, MOTP, IDSW, FP, FN) with greedy IoU matching + match continuity.
+- Track jitter: std of per-frame center-x velocity (px/frame), averaged over tracks.
+- Inputs are per-frame arrays (see src/utils/det_cache.py, src/utils/kitti_io.py):
+    gt:     [K, 5] → [x1, y1, x2, y2, gt_id]
+    tracks: [N, 7] → [x1, y1, x2, y2, conf, cls, track_id]
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between [N, 4] and [M, 4] xyxy boxes → [N, M]."""
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 1e-6, inter / np.maximum(union, 1e-6), 0.0)
+
+
+def clear_mot(
+    gt_frames: List[np.ndarray],
+    trk_frames: List[np.ndarray],
+    iou_thresh: float = 0.5
+) -> Dict[str, float]:
+    """
+    CLEAR-MOT metrics over a sequence.
+    Correspondences from the previous frame are kept while IoU >= iou_thresh;
+    remaining pairs are matched greedily by descending IoU.
+    """
+    tp = fp = fn = idsw = 0
+    iou_sum = 0.0
+    last_match: Dict[int, int] = {}   # gt_id → last matched track_id
+    track_ids = set()
+
+    for gt, trk in zip(gt_frames, trk_frames):
+        n_gt, n_trk = len(gt), len(trk)
+        track_ids.update(trk[:, 6].astype(np.int64).tolist())
+        if n_gt == 0 or n_trk == 0:
+            fp += n_trk
+            fn += n_gt
+            continue
+
+        full_iou = box_iou(gt[:, :4], trk[:, :4])
+        iou = np.where(full_iou >= iou_thresh, full_iou, -1.0)
+        gt_ids = gt[:, 4].astype(np.int64)
+        trk_ids = trk[:, 6].astype(np.int64)
+        trk_col = {tid: j for j, tid in enumerate(trk_ids.tolist())}
+
+        matches = []
+        # 1) Continuity: keep last frame's correspondence if still valid
+        for i, gid in enumerate(gt_ids.tolist()):
+            j = trk_col.get(last_match.get(gid, -2))
+            if j is not None and iou[i, j] >= 0:
+                matches.append((i, j))
+                iou[i, :] = -1.0
+                iou[:, j] = -1.0
+
+        # 2) Greedy on the rest (highest IoU first)
+        flat = iou.ravel()
+        for k in np.argsort(-flat, kind="stable"):
+            if flat[k] < 0:
+                break
+            i, j = divmod(int(k), n_trk)
+            if iou[i, j] < 0:
+                continue
+            matches.append((i, j))
+            iou[i, :] = -1.0
+            iou[:, j] = -1.0
+
+        # Score
+        for i, j in matches:
+            gid, tid = int(gt_ids[i]), int(trk_ids[j])
+            if gid in last_match and last_match[gid] != tid:
+                idsw += 1
+            last_match[gid] = tid
+            iou_sum += full_iou[i, j]
+        tp += len(matches)
+        fp += n_trk - len(matches)
+        fn += n_gt - len(matches)
+
+    num_gt = tp + fn
+    return {
+        "MOTA": 1.0 - (fn + fp + idsw) / num_gt if num_gt else 0.0,
+        "MOTP": float(iou_sum / tp) if tp else 0.0,
+        "IDSW": idsw,
+        "FP": fp,
+        "FN": fn,
+        "TP": tp,
+        "num_tracks": len(track_ids - {-1}),
+    }
+
+
+def track_jitter(trk_frames: List[np.ndarray]) -> float:
+    """
+    Mean per-track jitter (px/frame): std of consecutive center-x deltas,
+    weighted by track length. Same definition as compute_jitter_score(), applied per track.
+    """
+    rows = [
+        np.column_stack([np.full(len(t), f), t[:, 0], t[:, 2], t[:, 6]])
+        for f, t in enumerate(trk_frames) if len(t)
+    ]
+    if not rows:
+        return 0.0
+    a = np.concatenate(rows)                    # [frame, x1, x2, track_id]
+    a = a[np.lexsort((a[:, 0], a[:, 3]))]       # sort by track, then frame
+    cx = (a[:, 1] + a[:, 2]) / 2
+
+    # Velocities between consecutive frames of the same track
+    same = (np.diff(a[:, 3]) == 0) & (np.diff(a[:, 0]) == 1)
+    v = np.diff(cx)[same]
+    if len(v) == 0:
+        return 0.0
+    _, inv = np.unique(a[1:, 3][same], return_inverse=True)
+
+    # Per-track std via bincount sums
+    n = np.bincount(inv).astype(np.float64)
+    mean = np.bincount(inv, v) / n
+    var = np.maximum(np.bincount(inv, v * v) / n - mean ** 2, 0.0)
+    keep = n >= 2
+    if not keep.any():
+        return 0.0
+    return float(np.sum(np.sqrt(var[keep]) * n[keep]) / np.sum(n[keep]))
@@ -0,0 +1,150 @@
+# sweep_cascade.py
+"""
+Cascade inference trade-off (src/model/cascade.py) on seq-0006 from two detection caches.
+- cheap: every frame (default: stock yolov8n.pt cache, COCO classes mapped to kitti_ghostdet names;
+  any cache works, e.g. best.pt at a reduced --imgsz or a Ghost variant),
+- heavy: fine-tuned best.pt cache, consulted only on escalated frames.
+- Rows: cheap only, heavy only, cascade per --min-conf (all triggers, heavy refresh every
+  --refresh frames), track triggers only, and refresh only (fixed schedule, same interval).
+- Reports escalation share + per-trigger frame counts, CLEAR-MOT (MOTA, IDSW, FP, FN) vs
+  KITTI label_02, track jitter, and throughput: per-frame latency of each model measured with
+  --backend on --time-frames real frames (weights / input size read from the cache metadata),
+  combined as cheap + share × heavy.
+→ logs/sweeps/cascade_<seq>.csv
+
+Usage:
+  python -m src.utils.det_cache --seqs 0006                                            # heavy
+  python -m src.utils.det_cache --seqs 0006 --weights yolov8n.pt --classes -1 --out logs/det_cache/yolov8n
+  python -m src.utils.eval.sweep_cascade --min-conf 0.3 0.4 0.5 0.6 --backend onnx
+  python -m src.utils.eval.sweep_cascade --cheap-ms 9.5 --heavy-ms 21.0            # skip timing
+"""
+
+import argparse
+import csv
+from pathlib import Path
+
+import numpy as np
+
+from src.model.cascade import ROUTES, CascadeDetector, class_map, remap_classes
+from src.model.ghost_infuser import GhostInfuser
+from src.utils.det_cache import CACHE_DIR, load_detections, load_meta
+from src.utils.eval.mot_metrics import clear_mot, track_jitter
+from src.utils.kitti_io import KITTI_ROOT, find_label_file, list_frames, load_label_02, read_images
+
+OUT_DIR = Path("logs/sweeps")
+
+
+def model_ms(meta: dict, backend: str, paths: list) -> float:
+    """Median per-frame latency of the cache's model (weights / imgsz from its metadata)."""
+    from src.model.backends import load_backend
+    from src.utils.checks_balances.bench_backends import time_predict
+
+    model = load_backend(backend, meta["weights"], imgsz=tuple(meta["imgsz"]))
+    images = read_images(paths)
+    model.predict(images[:1])  # warm-up
+    return float(np.median(time_predict(model, images, 1)))
+
+
+def run_cascade(cheap: list, heavy: list, gt: list, **casc_kwargs) -> dict:
+    """Replay both caches through one CascadeDetector configuration."""
+    casc = CascadeDetector(lambda i: cheap[i], lambda i: heavy[i], GhostInfuser(), **casc_kwargs)
+    tracks = [casc.step(i) for i in range(len(cheap))]
+    row = {
+        "share": casc.escalation_share,
+        **{f"n_{r}": n for r, n in casc.reasons.items()},
+        "jitter": track_jitter(tracks),
+    }
+    row.update(clear_mot(gt, tracks))
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cascade (cheap → heavy) detector trade-off on cached detections.")
+    parser.add_argument("--seq", default="0006")
+    parser.add_argument("--cheap", type=Path, default=None, help="Cheap cache (default: logs/det_cache/yolov8n/<seq>.npz)")
+    parser.add_argument("--heavy", type=Path, default=None, help="Heavy cache (default: logs/det_cache/<seq>.npz)")
+    parser.add_argument("--min-conf", nargs="+", type=float, default=[0.3, 0.4, 0.5, 0.6])
+    parser.add_argument("--refresh", type=int, default=10, help="Heavy pass at least every N frames (0 = off)")
+    parser.add_argument("--max-lost", type=int, default=0, help="Lost tracks tolerated before escalating")
+    parser.add_argument("--classes", nargs="+", type=int, default=[0], help="Heavy-model classes to track (0 = car)")
+    parser.add_argument("--backend", default="onnx", help="Backend used to time both models")
+    parser.add_argument("--time-frames", type=int, default=20)
+    parser.add_argument("--cheap-ms", type=float, default=None, help="Known cheap latency (skips timing)")
+    parser.add_argument("--heavy-ms", type=float, default=None, help="Known heavy latency (skips timing)")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    paths = {"cheap": args.cheap or CACHE_DIR / "yolov8n" / f"{args.seq}.npz",
+             "heavy": args.heavy or CACHE_DIR / f"{args.seq}.npz"}
+    for p in paths.values():
+        if not p.exists():
+            raise FileNotFoundError(f"{p} not found. Run: python -m src.utils.det_cache (see --help)")
+    meta = {k: load_meta(p) for k, p in paths.items()}
+    cheap, heavy = load_detections(paths["cheap"]), load_detections(paths["heavy"])
+
+    names_c, names_h = meta["cheap"].get("names"), meta["heavy"].get("names")
+    if names_c and names_h and names_c != names_h:
+        mapping = class_map(names_c, names_h)
+        cheap = [remap_classes(d, mapping) for d in cheap]
+        print(f" Cheap classes → heavy: " + ", ".join(f"{names_c[s]}→{names_h[d]}" for s, d in mapping.items()))
+    n = min(len(cheap), len(heavy))
+    cheap = [d[np.isin(d[:, 5], args.classes)] for d in cheap[:n]]
+    heavy = [d[np.isin(d[:, 5], args.classes)] for d in heavy[:n]]
+    gt = load_label_02(find_label_file(args.seq, args.root), num_frames=n)[:n]
+    print(f" seq-{args.seq}: {n} frames; cheap={meta['cheap'].get('weights')} {meta['cheap'].get('imgsz')}, "
+          f"heavy={meta['heavy'].get('weights')} {meta['heavy'].get('imgsz')}")
+
+    cheap_ms, heavy_ms = args.cheap_ms, args.heavy_ms
+    if cheap_ms is None or heavy_ms is None:        # frames are only needed for timing
+        frames = list_frames(args.seq, args.root)[:args.time_frames]
+        if cheap_ms is None:
+            cheap_ms = model_ms(meta["cheap"], args.backend, frames)
+        if heavy_ms is None:
+            heavy_ms = model_ms(meta["heavy"], args.backend, frames)
+    print(f" Latency ({args.backend}): cheap {cheap_ms:.2f} ms, heavy {heavy_ms:.2f} ms per frame")
+
+    off = dict(min_conf=0.0, on_occluded=False, on_lost=False, refresh=0)
+    configs = [("cheap", None, off), ("heavy", None, None)]
+    casc = dict(refresh=args.refresh, max_lost=args.max_lost)
+    configs += [("cascade", c, dict(casc, min_conf=c)) for c in sorted(set(args.min_conf))]
+    configs.append(("tracks", None, dict(casc, min_conf=0.0)))
+    configs.append(("refresh", None, dict(off, refresh=args.refresh)))
+    rows = []
+    for mode, min_conf, kwargs in configs:
+        if kwargs is None:      # heavy only: every frame escalated
+            row = run_cascade(heavy, heavy, gt, **off)
+            row["share"] = 1.0
+        else:
+            row = run_cascade(cheap, heavy, gt, **kwargs)
+        ms = cheap_ms * (mode != "heavy") + row["share"] * heavy_ms
+        rows.append({"mode": mode, "min_conf": min_conf, "ms_per_frame": round(ms, 2),
+                     "fps": round(1000 / ms, 1), **row, "share": round(row["share"], 3)})
+
+    base = next(r for r in rows if r["mode"] == "heavy")
+    for r in rows:
+        r["dMOTA"] = r["MOTA"] - base["MOTA"]
+        r["speedup"] = round(base["ms_per_frame"] / r["ms_per_frame"], 2)
+
+    print(f"\n{'mode':<8} | {'conf':>4} | {'share':>5} | {'ms/fr':>6} | {'FPS':>6} | {'×heavy':>6} | {'MOTA':>6} | "
+          f"{'ΔMOTA':>6} | {'IDSW':>4} | {'FN':>5} | {'FP':>5} | {'jitter':>6} | triggers")
+    print("-" * 112)
+    for r in rows:
+        triggers = " ".join(f"{t}={r[f'n_{t}']}" for t in ROUTES if r[f"n_{t}"])
+        conf = f"{r['min_conf']:.2f}" if r["min_conf"] is not None else "-"
+        print(f"{r['mode']:<8} | {conf:>4} | {r['share']:>5.2f} | {r['ms_per_frame']:>6.2f} | {r['fps']:>6.1f} | "
+              f"×{r['speedup']:>5.2f} | {r['MOTA']:>6.3f} | {r['dMOTA']:>+6.3f} | {r['IDSW']:>4d} | {r['FN']:>5d} | "
+              f"{r['FP']:>5d} | {r['jitter']:>6.2f} | {triggers}")
+    print(" (share = frames re-run through the heavy model; Δ / × vs heavy only)")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_path = args.out / f"cascade_{args.seq}.csv"
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f" Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
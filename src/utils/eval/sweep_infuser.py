@@ -0,0 +1,210 @@
+# sweep_infuser.py
+"""
+GhostInfuser hyperparameter sweep on cached detections (grid or random search).
+- Replays cached per-frame detections (src/utils/det_cache.py) — no model in the loop.
+- Configurations are evaluated in parallel (process pool; data loaded once per worker).
+- Scores: track jitter (px/frame) + CLEAR-MOT (MOTA, IDSW, FP, FN) vs KITTI label_02.
+- Writes a ranked CSV: logs/sweeps/infuser_sweep_<seq>_<mode>.csv
+
+Usage:
+  python -m src.utils.det_cache --seqs 0006                      # once
+  python -m src.utils.eval.sweep_infuser --mode grid              # 1,000 configs
+  python -m src.utils.eval.sweep_infuser --mode random --n 500 --seed 1
+  python -m src.utils.eval.sweep_infuser --smoothing ema mean savgol --window 3 5 7
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src.model.ghost_infuser import SMOOTHING_MODES, GhostInfuser
+from src.utils.det_cache import CACHE_DIR, load_detections
+from src.utils.eval.mot_metrics import clear_mot, track_jitter
+from src.utils.kitti_io import KITTI_ROOT, find_label_file, load_label_02
+from src.utils.kitti_zip import ZipMember
+
+OUT_DIR = Path("logs/sweeps")
+SAVGOL_MIN_WINDOW = 3      # savgol_order (default 1) must be < window - 1
+
+# Default grid: 10 × 5 × 5 × 4 = 1,000 configurations
+GRID = {
+    "alpha": [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0],
+    "occlusion_threshold": [0.0, 0.15, 0.3, 0.45, 0.6],
+    "iou_match_thresh": [0.2, 0.3, 0.4, 0.5, 0.6],
+    "max_age": [1, 3, 5, 10],
+}
+
+# Random search ranges (uniform; max_age inclusive integer range)
+RANGES = {
+    "alpha": (0.05, 1.0),
+    "occlusion_threshold": (0.0, 0.7),
+    "iou_match_thresh": (0.1, 0.7),
+    "max_age": (1, 15),
+}
+
+# Rank key → (column, descending?)
+RANK_KEYS = {
+    "mota": ("MOTA", True),
+    "jitter": ("jitter", False),
+    "idsw": ("IDSW", False),
+}
+
+# Per-worker replay data (set once by _init_worker, not pickled per task)
+_DETS = None
+_GT = None
+
+
+def grid_configs(grid: dict = GRID) -> list:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def random_configs(n: int, seed: int = 0, ranges: dict = RANGES) -> list:
+    rng = np.random.default_rng(seed)
+    cols = {}
+    for key, (lo, hi) in ranges.items():
+        if key == "max_age":
+            cols[key] = rng.integers(lo, hi + 1, size=n).tolist()
+        else:
+            cols[key] = np.round(rng.uniform(lo, hi, size=n), 3).tolist()
+    return [{k: cols[k][i] for k in ranges} for i in range(n)]
+
+
+def expand_smoothing(configs: list, modes: list, windows: list) -> list:
+    """
+    Cross configs with smoothing modes. Settings a mode ignores are None
+    (window for 'ema', alpha for windowed modes) so duplicates collapse.
+    'savgol' skips windows GhostInfuser rejects (≤ SAVGOL_MIN_WINDOW - 1 for the default order).
+    """
+    out, seen = [], set()
+    for mode in modes:
+        mode_windows = [None] if mode == "ema" else windows
+        if mode == "savgol":
+            mode_windows = [w for w in windows if w >= SAVGOL_MIN_WINDOW]
+        for cfg in configs:
+            for window in mode_windows:
+                c = dict(cfg, smoothing=mode, window=window)
+                if mode != "ema":
+                    c["alpha"] = None
+                key = tuple(sorted(c.items()))
+                if key not in seen:
+                    seen.add(key)
+                    out.append(c)
+    return out
+
+
+def _init_worker(cache_path: str, label_path: Path | ZipMember, classes: tuple):
+    global _DETS, _GT
+    dets = load_detections(cache_path)
+    _DETS = [d[np.isin(d[:, 5], classes)] for d in dets]
+    _GT = load_label_02(label_path, num_frames=len(_DETS))[:len(_DETS)]
+
+
+def evaluate_config(cfg: dict) -> dict:
+    """Replay cached detections through one GhostInfuser configuration."""
+    infuser = GhostInfuser(**{k: v for k, v in cfg.items() if v is not None})
+    t0 = time.perf_counter()
+    tracks = [infuser.update(d) for d in _DETS]
+    ms_per_frame = (time.perf_counter() - t0) * 1000 / max(len(_DETS), 1)
+
+    row = dict(cfg)
+    row["jitter"] = track_jitter(tracks)
+    row.update(clear_mot(_GT, tracks))
+    row["ms_per_frame"] = ms_per_frame
+    return row
+
+
+def run_sweep(
+    configs: list,
+    cache_path: Path,
+    label_path: Path | ZipMember,
+    classes: tuple = (0,),
+    workers: int | None = None
+) -> list:
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(configs) // (workers * 8))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(cache_path), label_path, classes)
+    ) as pool:
+        rows = []
+        for i, row in enumerate(pool.map(evaluate_config, configs, chunksize=chunksize)):
+            rows.append(row)
+            if (i + 1) % 100 == 0:
+                print(f"   {i + 1}/{len(configs)}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep GhostInfuser hyperparameters on cached detections.")
+    parser.add_argument("--seq", default="0006")
+    parser.add_argument("--mode", choices=["grid", "random"], default="grid")
+    parser.add_argument("--n", type=int, default=1000, help="Configurations for random search")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--classes", nargs="+", type=int, default=[0], help="Detection classes to track (0 = car)")
+    parser.add_argument("--motion", action="store_true", help="Enable the constant-velocity model in every config")
+    parser.add_argument("--smoothing", nargs="+", choices=SMOOTHING_MODES, default=["ema"],
+                        help="Smoothing modes to cross with the grid (windowed modes ignore alpha)")
+    parser.add_argument("--window", nargs="+", type=int, default=[3], help="Window sizes for windowed modes")
+    parser.add_argument("--rank-by", choices=sorted(RANK_KEYS), default="mota")
+    parser.add_argument("--cache", type=Path, default=None, help="Detection cache (default: logs/det_cache/<seq>.npz)")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    cache_path = args.cache or CACHE_DIR / f"{args.seq}.npz"
+    if not cache_path.exists():
+        raise FileNotFoundError(f"{cache_path} not found. Run: python -m src.utils.det_cache --seqs {args.seq}")
+    label_path = find_label_file(args.seq, args.root)
+
+    configs = grid_configs() if args.mode == "grid" else random_configs(args.n, args.seed)
+    if args.motion:
+        configs = [dict(cfg, motion=True) for cfg in configs]
+    if "savgol" in args.smoothing:
+        skipped = [w for w in args.window if w < SAVGOL_MIN_WINDOW]
+        if len(skipped) == len(args.window):
+            parser.error(f"savgol needs --window >= {SAVGOL_MIN_WINDOW}, got {args.window}")
+        if skipped:
+            print(f" ⚠️ savgol: skipping window(s) {skipped} (needs >= {SAVGOL_MIN_WINDOW})")
+    configs = expand_smoothing(configs, args.smoothing, args.window)
+    print(f" Sweeping {len(configs)} GhostInfuser configs on seq-{args.seq} ({args.mode})")
+
+    t0 = time.perf_counter()
+    rows = run_sweep(configs, cache_path, label_path, tuple(args.classes), args.workers)
+    elapsed = time.perf_counter() - t0
+
+    # Rank (primary key, jitter as tie-break)
+    col, descending = RANK_KEYS[args.rank_by]
+    rows.sort(key=lambda r: ((-r[col] if descending else r[col]), r["jitter"]))
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_path = args.out / f"infuser_sweep_{args.seq}_{args.mode}.csv"
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["rank", *rows[0].keys()])
+        writer.writeheader()
+        for rank, row in enumerate(rows, 1):
+            writer.writerow({"rank": rank, **row})
+
+    print(f"\n Done in {elapsed:.1f} s ({elapsed / len(configs) * 1000:.1f} ms/config)")
+    print(f"\n{'#':>3} | {'smooth':>9} | {'alpha':>5} | {'occ':>5} | {'iou':>5} | {'age':>3} | "
+          f"{'MOTA':>6} | {'IDSW':>4} | {'jitter':>6}")
+    print("-" * 74)
+    for rank, r in enumerate(rows[:10], 1):
+        smooth = r["smoothing"] if r["window"] is None else f"{r['smoothing']}/{r['window']}"
+        alpha = "-" if r["alpha"] is None else f"{r['alpha']:.2f}"
+        print(f"{rank:>3} | {smooth:>9} | {alpha:>5} | {r['occlusion_threshold']:>5.2f} | "
+              f"{r['iou_match_thresh']:>5.2f} | {r['max_age']:>3d} | {r['MOTA']:>6.3f} | {r['IDSW']:>4d} | "
+              f"{r['jitter']:>6.2f}")
+    print(f"\n Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# sweep_keyframe.py
+"""
+Compute vs accuracy trade-off of keyframe scheduling (src/model/keyframe.py) on cached detections.
+- Replays cached per-frame detections (src/utils/det_cache.py); the "detector" is only
+  consulted on keyframes, skipped frames are propagated by GhostInfuser(motion=True).
+- Schedules: fixed (every k-th frame) and adaptive (k + confidence / motion / track-change triggers).
+- Reports effective detector calls/s at --fps, keyframe share, trigger counts,
+  CLEAR-MOT (MOTA, IDSW, FP, FN) vs KITTI label_02 and track jitter, with deltas vs k=1.
+→ logs/sweeps/keyframe_<seq>.csv
+
+Usage:
+  python -m src.utils.det_cache --seqs 0006                      # once
+  python -m src.utils.eval.sweep_keyframe --k 1 2 3 4 6 --fps 10
+  python -m src.utils.eval.sweep_keyframe --min-conf 0.4 --max-motion 0.05
+"""
+
+import argparse
+import csv
+from pathlib import Path
+
+import numpy as np
+
+from src.model.ghost_infuser import GhostInfuser
+from src.model.keyframe import TRIGGERS, KeyframeScheduler
+from src.utils.det_cache import CACHE_DIR, load_detections
+from src.utils.eval.mot_metrics import clear_mot, track_jitter
+from src.utils.kitti_io import KITTI_ROOT, find_label_file, load_label_02
+
+OUT_DIR = Path("logs/sweeps")
+
+
+def run_schedule(dets: list, gt: list, fps: float, **sched_kwargs) -> dict:
+    """Replay cached detections through one KeyframeScheduler configuration."""
+    sched = KeyframeScheduler(lambda i: dets[i], GhostInfuser(motion=True), **sched_kwargs)
+    tracks = [sched.step(i) for i in range(len(dets))]
+    row = {
+        "calls_per_s": round(sched.calls_per_second(fps), 2),
+        "keyframe_share": round(sched.keyframe_share, 3),
+        **{f"n_{r}": n for r, n in sched.reasons.items()},
+        "jitter": track_jitter(tracks),
+    }
+    row.update(clear_mot(gt, tracks))
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyframe scheduling trade-off on cached detections.")
+    parser.add_argument("--seq", default="0006")
+    parser.add_argument("--k", nargs="+", type=int, default=[1, 2, 3, 4, 6, 8], help="Keyframe intervals")
+    parser.add_argument("--fps", type=float, default=10.0, help="Stream frame rate (KITTI: 10)")
+    parser.add_argument("--min-conf", type=float, default=0.5)
+    parser.add_argument("--max-motion", type=float, default=0.1)
+    parser.add_argument("--classes", nargs="+", type=int, default=[0], help="Detection classes to track (0 = car)")
+    parser.add_argument("--cache", type=Path, default=None, help="Detection cache (default: logs/det_cache/<seq>.npz)")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    cache_path = args.cache or CACHE_DIR / f"{args.seq}.npz"
+    if not cache_path.exists():
+        raise FileNotFoundError(f"{cache_path} not found. Run: python -m src.utils.det_cache --seqs {args.seq}")
+    dets = [d[np.isin(d[:, 5], args.classes)] for d in load_detections(cache_path)]
+    gt = load_label_02(find_label_file(args.seq, args.root), num_frames=len(dets))[:len(dets)]
+    print(f" seq-{args.seq}: {len(dets)} frames @ {args.fps:g} FPS")
+
+    schedules = {"fixed": dict(min_conf=0.0, max_motion=0.0, on_track_change=False),
+                 "adaptive": dict(min_conf=args.min_conf, max_motion=args.max_motion, on_track_change=True)}
+    rows = []
+    for k in sorted(set(args.k)):
+        for name, kwargs in schedules.items():
+            if k == 1 and name == "adaptive":
+                continue   # k=1 already detects every frame
+            rows.append({"schedule": name, "k": k, **run_schedule(dets, gt, args.fps, k=k, **kwargs)})
+
+    base = next((r for r in rows if r["k"] == 1), rows[0])
+    for r in rows:
+        r["dMOTA"] = r["MOTA"] - base["MOTA"]
+        r["djitter"] = r["jitter"] - base["jitter"]
+
+    print(f"\n{'schedule':<8} | {'k':>2} | {'calls/s':>7} | {'share':>5} | {'MOTA':>6} | {'ΔMOTA':>6} | "
+          f"{'IDSW':>4} | {'FN':>5} | {'jitter':>6} | {'Δjit':>6} | triggers")
+    print("-" * 100)
+    for r in rows:
+        triggers = " ".join(f"{t}={r[f'n_{t}']}" for t in TRIGGERS if r[f"n_{t}"])
+        print(f"{r['schedule']:<8} | {r['k']:>2d} | {r['calls_per_s']:>7.2f} | {r['keyframe_share']:>5.2f} | "
+              f"{r['MOTA']:>6.3f} | {r['dMOTA']:>+6.3f} | {r['IDSW']:>4d} | {r['FN']:>5d} | "
+              f"{r['jitter']:>6.2f} | {r['djitter']:>+6.2f} | {triggers}")
+    print(f" (Δ vs k={base['k']} {base['schedule']})")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_path = args.out / f"keyframe_{args.seq}.csv"
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f" Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
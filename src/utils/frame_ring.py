@@ -0,0 +1,274 @@
+# src/utils/frame_ring.py
+"""
+Shared-memory frame ring buffer for multi-process GhostDet pipelines (decode / detect / render
+in separate processes, past the GIL).
+- FrameRing: one multiprocessing.shared_memory block of `slots` fixed-size frame slots (sized
+  for the largest frame, e.g. 1242×375×3) + a queue of free slot indices.
+- Producers write a frame into a free slot (put() → one memcpy) and pass a FrameRef
+  (slot, shape, dtype) downstream; consumers get a numpy view of the slot (view(), zero-copy)
+  and release() it when the last stage is done. Only slot indices go through the queues.
+- The free-slot queue is the back-pressure: a full ring blocks the producer.
+- Rings are passed to child processes as Process arguments and re-attach by name; the
+  creating process unlinks the block on close().
+- run_pipeline(): reader → detector → renderer processes over either transport
+  ("shm" = FrameRing, "queue" = frames pickled through multiprocessing queues), used by
+  src/utils/checks_balances/bench_frame_ring.py. A stage that raises (e.g. its model
+  factory) aborts the start barrier and reports its traceback; run_pipeline re-raises it.
+
+Usage:
+  with FrameRing(slots=8, frame_shape=(375, 1242, 3)) as ring:
+      ref = ring.put(frame)                   # producer process
+      q.put((i, ref))
+      img = ring.view(ref)                    # consumer process (no copy)
+      ring.release(ref)
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+from multiprocessing import shared_memory
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class FrameRef(NamedTuple):
+    """Message for a frame stored in a FrameRing slot."""
+    slot: int
+    shape: Tuple[int, ...]
+    dtype: str = "uint8"
+
+
+class FrameRing:
+    """Fixed-slot frame buffer in shared memory; slots are handed out through a free-index queue."""
+
+    def __init__(self, slots: int, frame_shape: Sequence[int], dtype=np.uint8, ctx=None):
+        """
+        Args:
+            slots: Frames in flight across all stages (ring capacity).
+            frame_shape: Largest frame stored, e.g. (375, 1242, 3); smaller frames fit in a slot.
+            dtype: Pixel dtype (slot size = prod(frame_shape) × itemsize).
+            ctx: multiprocessing context of the pipeline processes (default: spawn).
+        """
+        ctx = ctx or multiprocessing.get_context("spawn")
+        self.slots = slots
+        self.slot_bytes = int(np.prod(frame_shape)) * np.dtype(dtype).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=slots * self.slot_bytes)
+        self._owner = True
+        self._free = ctx.Queue()
+        for s in range(slots):
+            self._free.put(s)
+        self._attach()
+
+    def _attach(self):
+        self._buf = np.ndarray((self.slots, self.slot_bytes), dtype=np.uint8, buffer=self._shm.buf)
+
+    def __getstate__(self):
+        return {"slots": self.slots, "slot_bytes": self.slot_bytes, "name": self._shm.name, "free": self._free}
+
+    def __setstate__(self, state):
+        self.slots, self.slot_bytes, self._free = state["slots"], state["slot_bytes"], state["free"]
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._owner = False
+        self._attach()
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def acquire(self, timeout: Optional[float] = None) -> int:
+        """Block until a slot is free; returns its index."""
+        return self._free.get(timeout=timeout)
+
+    def release(self, ref) -> None:
+        """Return a slot (FrameRef or index) to the ring once the last stage is done with it."""
+        self._free.put(ref.slot if isinstance(ref, FrameRef) else int(ref))
+
+    def view(self, ref: FrameRef) -> np.ndarray:
+        """Writable numpy view of a stored frame (valid until the slot is released)."""
+        nbytes = int(np.prod(ref.shape)) * np.dtype(ref.dtype).itemsize
+        return self._buf[ref.slot, :nbytes].view(ref.dtype).reshape(ref.shape)
+
+    def put(self, frame: np.ndarray, timeout: Optional[float] = None) -> FrameRef:
+        """Copy a frame into a free slot (blocks while the ring is full)."""
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"frame {frame.shape} {frame.dtype} exceeds the ring slot size ({self.slot_bytes} bytes)")
+        ref = FrameRef(self.acquire(timeout), tuple(frame.shape), frame.dtype.str)
+        self.view(ref)[...] = frame
+        return ref
+
+    def close(self) -> None:
+        """Detach; the creating process also frees the shared-memory block."""
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ── Pipeline stages ───────────────────────────────────────────────────────────
+# Each stage runs in its own process; `ring` is None for the pickling-queue transport
+# (the message then carries the frame itself instead of a FrameRef). Stages build their
+# model / renderer first and wait on `start`, so process start-up is not timed.
+# _run_stage() reports a failing stage to the parent through the result queue.
+
+class StageError(NamedTuple):
+    """Result-queue message of a stage that raised."""
+    stage: str
+    traceback: str
+
+
+def _run_stage(stage: Callable, name: str, res_q, start, *args):
+    try:
+        stage(*args, start)
+    except threading.BrokenBarrierError:
+        pass                        # another stage failed (or the parent gave up) before start
+    except BaseException:
+        res_q.put(StageError(name, traceback.format_exc()))
+        start.abort()               # release stages / parent still waiting on the barrier
+
+
+def _read_stage(paths: Sequence, resize: Optional[Tuple[int, int]], ring: Optional[FrameRing], out_q, start):
+    import cv2
+    from src.utils.kitti_io import read_image
+
+    start.wait()
+    for i, p in enumerate(paths):
+        img = p if isinstance(p, np.ndarray) else read_image(p)
+        if resize is not None:
+            img = cv2.resize(img, resize, interpolation=cv2.INTER_LINEAR)
+        out_q.put((i, ring.put(img) if ring is not None else img))
+    out_q.put(None)
+
+
+def _detect_stage(factory: Callable, ring: Optional[FrameRing], in_q, out_q, start):
+    detect = factory()
+    start.wait()
+    while (msg := in_q.get()) is not None:
+        i, frame = msg
+        out_q.put((i, frame, detect(ring.view(frame) if ring is not None else frame)))
+    out_q.put(None)
+
+
+def _render_stage(factory: Callable, ring: Optional[FrameRing], in_q, res_q, start):
+    render = factory()
+    start.wait()
+    results = []
+    while (msg := in_q.get()) is not None:
+        i, frame, dets = msg
+        results.append(render(i, ring.view(frame) if ring is not None else frame, dets))
+        if ring is not None:
+            ring.release(frame)
+    res_q.put(results)
+
+
+def _next_message(res_q, procs: Sequence, timeout: Optional[float] = None, poll: float = 0.5):
+    """Next result-queue message; raises if a stage process died without sending one."""
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    while True:
+        try:
+            return res_q.get(timeout=poll)
+        except queue.Empty:
+            dead = [p for p in procs if p.exitcode not in (None, 0)]
+            if dead:
+                raise RuntimeError(f"pipeline {dead[0].name} process exited with code {dead[0].exitcode}") from None
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+
+
+def _raise_stage_error(msg):
+    if isinstance(msg, StageError):
+        raise RuntimeError(f"pipeline {msg.stage} stage failed:\n{msg.traceback}")
+    return msg
+
+
+def _wait_ready(start, res_q, procs: Sequence, timeout: float):
+    """Join the start barrier once every stage waits on it; fail fast on a stage error / dead process."""
+    deadline = time.perf_counter() + timeout
+    while start.n_waiting < len(procs) and not start.broken:
+        if time.perf_counter() > deadline:
+            start.abort()
+            raise TimeoutError(f"pipeline stages not ready within {timeout:.0f} s")
+        _raise_stage_error(_next_message(res_q, procs, timeout=0.0, poll=0.05))
+    try:
+        start.wait()
+    except threading.BrokenBarrierError:
+        _raise_stage_error(_next_message(res_q, procs, timeout=5.0))
+        raise RuntimeError("pipeline start barrier broken") from None
+
+
+def run_pipeline(
+    paths: Sequence,
+    detect_factory: Callable[[], Callable],
+    render_factory: Callable[[], Callable],
+    transport: str = "shm",
+    slots: int = 8,
+    resize: Optional[Tuple[int, int]] = None,
+    frame_shape: Optional[Sequence[int]] = None,
+    start_timeout: float = 120.0
+) -> Tuple[List, float]:
+    """
+    Reader → detector → renderer, one process each.
+
+    Args:
+        paths: Frame image paths / zip members (decoded by the reader process), or decoded frames (sent to
+               the reader once at start-up — isolates transport from PNG decode).
+        detect_factory: Picklable () → fn(frame) → dets, called inside the detector process
+                        (models are built there, not pickled).
+        render_factory: Picklable () → fn(index, frame, dets) → result, called inside the
+                        renderer process; frames are in-place writable.
+        transport: "shm" (FrameRing, FrameRef messages) or "queue" (frames pickled).
+        slots: Frames in flight (ring slots / queue depth).
+        resize: (w, h) applied by the reader; frame_shape: largest frame (default: first frame).
+        start_timeout: Seconds to wait for every stage to finish its factory.
+
+    Returns:
+        (renderer results in frame order, wall seconds from the first read to the last result)
+
+    Raises:
+        RuntimeError: a stage raised (its traceback is included) or a stage process died.
+        TimeoutError: the stages were not ready within start_timeout.
+    """
+    if transport not in ("shm", "queue"):
+        raise ValueError(f"transport must be 'shm' or 'queue', got {transport!r}")
+    ctx = multiprocessing.get_context("spawn")
+    if frame_shape is None:
+        from src.utils.kitti_io import read_image
+
+        first = paths[0] if isinstance(paths[0], np.ndarray) else read_image(paths[0])
+        frame_shape = first.shape if resize is None else (resize[1], resize[0], 3)
+    ring = FrameRing(slots, frame_shape, ctx=ctx) if transport == "shm" else None
+    q_det, q_ren, q_res = ctx.Queue(maxsize=slots), ctx.Queue(maxsize=slots), ctx.Queue()
+    start = ctx.Barrier(4)
+    procs = [
+        ctx.Process(target=_run_stage, name=name, args=(stage, name, q_res, start, *args))
+        for name, stage, args in (
+            ("reader", _read_stage, (list(paths), resize, ring, q_det)),
+            ("detector", _detect_stage, (detect_factory, ring, q_det, q_ren)),
+            ("renderer", _render_stage, (render_factory, ring, q_ren, q_res)),
+        )
+    ]
+    try:
+        for p in procs:
+            p.start()
+        _wait_ready(start, q_res, procs, start_timeout)
+        t0 = time.perf_counter()
+        results = _raise_stage_error(_next_message(q_res, procs))
+        seconds = time.perf_counter() - t0
+        for p in procs:
+            p.join()
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        if ring is not None:
+            ring.close()
+    return results, seconds
+
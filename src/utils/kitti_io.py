@@ -0,0 +1,145 @@
+# src/utils/kitti_io.py
+"""
+KITTI tracking I/O helpers shared by the GhostDet export/evaluation tools.
+- Resolves sequence folders across the layouts used on the E:/KITTI drive; sequences that
+  are not extracted are served from the original zips in place (src/utils/kitti_zip.py).
+- Returns sorted frame lists (one PNG per frame, 0-based KITTI frame index = position) of
+  Paths or ZipMembers; read_image() / read_images() decode either (thread pool).
+- Parses label_02 tracking ground truth into per-frame arrays.
+- KITTI_IMGSZ: native-aspect detector input (no square letterbox padding).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+
+from src.utils.kitti_zip import IMAGE_MEMBERS, LABEL_MEMBERS, ZipMember, open_archive
+
+KITTI_ROOT = Path("E:/KITTI")
+
+# Detector input (h, w): KITTI frames are ~1242×375 (3.3:1) and preprocessing resizes to
+# 640×192 — both stride-32 aligned. A square 640×640 letterbox would be ~70% padding.
+KITTI_IMGSZ = (192, 640)
+
+# Known on-disk layouts (first match wins)
+IMAGE_LAYOUTS = (
+    "tracking/{seq}/image_02/{seq}",              # canonical (v1.1_clean scripts)
+    "tracking/{seq}/image_02",
+    "_temp_extract/img/training/image_02/{seq}",  # extracted zip
+    "training/image_02/{seq}",
+)
+LABEL_LAYOUTS = (
+    "tracking/{seq}/label_02/{seq}.txt",          # canonical
+    "training/label_02/{seq}.txt",
+    "_temp_extract/lbl/training/label_02/{seq}.txt",
+)
+# Original archives, read in place when no extracted layout matches
+IMAGE_ZIPS = ("data_tracking_image_2.zip",)
+LABEL_ZIPS = ("data_tracking_label_2.zip",)
+
+
+def stride_align(shape: Sequence[int], stride: int = 32) -> tuple:
+    """Round an (h, w) input shape up to a multiple of the model stride."""
+    return tuple(int(-(-s // stride) * stride) for s in shape)
+
+
+def find_seq_dir(seq: str, root: Path = KITTI_ROOT) -> Path:
+    """Return the image folder for a KITTI tracking sequence (e.g. '0006')."""
+    root = Path(root)
+    for layout in IMAGE_LAYOUTS:
+        cand = root / layout.format(seq=seq)
+        if cand.is_dir() and any(cand.glob("*.png")):
+            return cand
+    raise FileNotFoundError(
+        f"KITTI seq-{seq} not found under {root} (tried: {', '.join(IMAGE_LAYOUTS)})"
+    )
+
+
+def _zip_members(root: Path, zips: Sequence[str], prefix: str, suffix: str = "") -> List[ZipMember]:
+    """Members under `prefix` of the first archive in `zips` that has any."""
+    for name in zips:
+        path = Path(root) / name
+        if path.is_file():
+            members = open_archive(str(path)).members(prefix, suffix)
+            if members:
+                return [ZipMember(str(path), m) for m in members]
+    return []
+
+
+def list_frames(seq: str, root: Path = KITTI_ROOT) -> List[Path | ZipMember]:
+    """Sorted PNG frames for a sequence (extracted folder, else members of the image zip)."""
+    try:
+        return sorted(find_seq_dir(seq, root).glob("*.png"))
+    except FileNotFoundError as err:
+        members = _zip_members(root, IMAGE_ZIPS, IMAGE_MEMBERS.format(seq=seq), ".png")
+        if not members:
+            raise FileNotFoundError(f"{err}; no {' / '.join(IMAGE_ZIPS)} with it either") from None
+        return members
+
+
+def find_label_file(seq: str, root: Path = KITTI_ROOT) -> Path | ZipMember:
+    """Return the label_02 file for a KITTI tracking sequence (extracted, else inside the label zip)."""
+    root = Path(root)
+    for layout in LABEL_LAYOUTS:
+        cand = root / layout.format(seq=seq)
+        if cand.is_file():
+            return cand
+    members = _zip_members(root, LABEL_ZIPS, LABEL_MEMBERS.format(seq=seq))
+    if members:
+        return members[0]
+    raise FileNotFoundError(
+        f"label_02 for seq-{seq} not found under {root} (tried: {', '.join(LABEL_LAYOUTS + LABEL_ZIPS)})"
+    )
+
+
+def read_image(frame: Path | ZipMember) -> np.ndarray:
+    """Decode one frame (BGR) from a file or a zip member."""
+    if isinstance(frame, ZipMember):
+        return frame.imread()
+    import cv2
+
+    return cv2.imread(str(frame))
+
+
+def read_images(frames: Sequence[Path | ZipMember], workers: int = 4) -> List[np.ndarray]:
+    """Decode frames in order on a thread pool (zip reads use one file handle per thread)."""
+    if workers <= 1 or len(frames) <= 1:
+        return [read_image(f) for f in frames]
+    with ThreadPoolExecutor(min(workers, len(frames))) as pool:
+        return list(pool.map(read_image, frames))
+
+
+def load_label_02(
+    label_file: str | Path | ZipMember,
+    num_frames: int | None = None,
+    types: Sequence[str] = ("Car", "Van")
+) -> List[np.ndarray]:
+    """
+    Parse a KITTI tracking label file into per-frame ground truth.
+
+    Args:
+        label_file: label_02/<seq>.txt (frame track_id type trunc occ alpha x1 y1 x2 y2 ...)
+        num_frames: Pad the result to this many frames (frames without labels → empty).
+        types: KITTI object types to keep (DontCare is always dropped).
+
+    Returns:
+        List indexed by 0-based frame of [K, 5] arrays → [x1, y1, x2, y2, track_id]
+    """
+    if not isinstance(label_file, ZipMember):
+        label_file = Path(label_file)
+    rows = []
+    for line in label_file.read_text().splitlines():       # Path or ZipMember
+        parts = line.split()
+        if len(parts) < 10 or parts[2] not in types:
+            continue
+        rows.append((int(parts[0]), *map(float, parts[6:10]), int(parts[1])))
+
+    gt = np.array(rows, dtype=np.float64).reshape(-1, 6)
+    n = max(int(gt[:, 0].max()) + 1 if len(gt) else 0, num_frames or 0)
+
+    # Group by frame with one sort + split
+    gt = gt[np.argsort(gt[:, 0], kind="stable")]
+    bounds = np.searchsorted(gt[:, 0], np.arange(n + 1))
+    return [gt[bounds[i]:bounds[i + 1], 1:] for i in range(n)]
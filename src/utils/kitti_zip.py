@@ -0,0 +1,205 @@
+# src/utils/kitti_zip.py
+"""
+Read KITTI tracking frames / labels straight from the original zip archives
+(data_tracking_image_2.zip, data_tracking_label_2.zip) — no _temp_extract copy.
+- Index: the zip central directory (member → local header offset, method, sizes) is parsed
+  once and cached as JSON under logs/zip_index/, keyed by the archive path and validated
+  against its size / mtime; later runs open an archive without scanning it.
+- Random access: one seek + one read per member (local header + data), stored members are
+  returned as-is, deflated members are inflated with zlib (both release the GIL).
+- Parallel reads: every thread gets its own file handle, so read_images() in
+  src/utils/kitti_io.py decodes frames on a thread pool without sharing a file position.
+- ZipMember: picklable (archive, member) frame reference returned by kitti_io.list_frames()
+  / find_label_file() when a sequence is only available as a zip.
+
+Usage:
+  python -m src.utils.kitti_zip --root E:/KITTI                       # build / refresh index, list sequences
+  python -m src.utils.kitti_zip --seq 0006 --frames 200 --workers 1 2 4 8   # read throughput
+"""
+
+import argparse
+import hashlib
+import json
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+INDEX_DIR = Path("logs/zip_index")
+INDEX_VERSION = 1
+
+# Archive member layouts (KITTI tracking zips)
+IMAGE_MEMBERS = "training/image_02/{seq}/"
+LABEL_MEMBERS = "training/label_02/{seq}.txt"
+
+_LOCAL_HEADER = struct.Struct("<4s22xHH")       # signature ... name length, extra length
+_EXTRA_SLACK = 64                               # local extra field bytes read speculatively
+
+
+class ZipArchive:
+    """Indexed random-access reader for one zip file (thread-safe, one handle per thread)."""
+
+    def __init__(self, path: Path, index_dir: Path = INDEX_DIR):
+        self.path = Path(path)
+        self.index_dir = Path(index_dir)
+        self.entries: Dict[str, tuple] = self._load_index()     # name → (offset, method, csize, size)
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+
+    # ── Index ───────────────────────────────────────────────────────────────────
+    @property
+    def index_path(self) -> Path:
+        key = hashlib.sha1(str(self.path.resolve()).encode()).hexdigest()[:8]
+        return self.index_dir / f"{self.path.stem}_{key}.json"
+
+    def _load_index(self) -> Dict[str, tuple]:
+        st = self.path.stat()
+        stamp = {"version": INDEX_VERSION, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        if self.index_path.exists():
+            index = json.loads(self.index_path.read_text())
+            if all(index.get(k) == v for k, v in stamp.items()):
+                return {k: tuple(v) for k, v in index["entries"].items()}
+        with zipfile.ZipFile(self.path) as zf:
+            entries = {i.filename: (i.header_offset, i.compress_type, i.compress_size, i.file_size)
+                       for i in zf.infolist() if not i.is_dir()}
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({**stamp, "zip": str(self.path), "entries": entries}))
+        tmp.replace(self.index_path)
+        print(f" Indexed {self.path.name}: {len(entries)} members → {self.index_path}")
+        return entries
+
+    def members(self, prefix: str = "", suffix: str = "") -> List[str]:
+        """Sorted member names under `prefix` ending with `suffix`."""
+        return sorted(n for n in self.entries if n.startswith(prefix) and n.endswith(suffix))
+
+    def sequences(self, layout: str = IMAGE_MEMBERS) -> Dict[str, int]:
+        """{seq: member count} for a '{seq}' layout, e.g. frames per sequence."""
+        head, tail = layout.split("{seq}")
+        counts: Dict[str, int] = {}
+        for n in self.entries:
+            if n.startswith(head) and tail in n[len(head):]:
+                seq = n[len(head):].split(tail, 1)[0]
+                counts[seq] = counts.get(seq, 0) + 1
+        return dict(sorted(counts.items()))
+
+    # ── Reads ───────────────────────────────────────────────────────────────────
+    def _handle(self):
+        f = getattr(self._local, "f", None)
+        if f is None:
+            f = self._local.f = open(self.path, "rb")
+            with self._lock:
+                self._handles.append(f)
+        return f
+
+    def read(self, name: str) -> bytes:
+        """Uncompressed bytes of one member."""
+        offset, method, csize, size = self.entries[name]
+        f = self._handle()
+        f.seek(offset)
+        head_len = _LOCAL_HEADER.size + len(name.encode()) + _EXTRA_SLACK
+        buf = f.read(head_len + csize)
+        sig, n_name, n_extra = _LOCAL_HEADER.unpack_from(buf)
+        if sig != b"PK\x03\x04":
+            raise zipfile.BadZipFile(f"{self.path.name}: bad local header for {name} (stale index? delete {self.index_path})")
+        start = _LOCAL_HEADER.size + n_name + n_extra
+        if start + csize > len(buf):
+            buf += f.read(start + csize - len(buf))
+        data = memoryview(buf)[start:start + csize]
+        if method == zipfile.ZIP_STORED:
+            return bytes(data)
+        if method == zipfile.ZIP_DEFLATED:
+            return zlib.decompress(data, -15, size)
+        raise NotImplementedError(f"{self.path.name}: compression method {method} of {name} is not supported")
+
+    def close(self):
+        with self._lock:
+            for f in self._handles:
+                f.close()
+            self._handles.clear()
+        self._local = threading.local()
+
+
+@lru_cache(maxsize=None)
+def open_archive(path: str) -> ZipArchive:
+    """Shared ZipArchive per zip path (index loaded once per process)."""
+    return ZipArchive(Path(path))
+
+
+class ZipMember(NamedTuple):
+    """A file inside a zip archive — stands in for a Path in frame / label lists."""
+    zip: str
+    name: str
+
+    @property
+    def stem(self) -> str:
+        return PurePosixPath(self.name).stem
+
+    @property
+    def suffix(self) -> str:
+        return PurePosixPath(self.name).suffix
+
+    def read_bytes(self) -> bytes:
+        return open_archive(self.zip).read(self.name)
+
+    def read_text(self) -> str:
+        return self.read_bytes().decode()
+
+    def imread(self) -> np.ndarray:
+        import cv2
+
+        return cv2.imdecode(np.frombuffer(self.read_bytes(), dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def __str__(self) -> str:
+        return f"{self.zip}!/{self.name}"
+
+
+def main():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.utils.kitti_io import IMAGE_ZIPS, KITTI_ROOT, LABEL_ZIPS, list_frames, read_image
+
+    parser = argparse.ArgumentParser(description="Index KITTI tracking zips and measure in-place frame reads.")
+    parser.add_argument("--root", type=Path, default=KITTI_ROOT)
+    parser.add_argument("--seq", default=None, help="Read-throughput test on this sequence")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    args = parser.parse_args()
+
+    for name in (*IMAGE_ZIPS, *LABEL_ZIPS):
+        path = args.root / name
+        if not path.is_file():
+            print(f" {name}: not found under {args.root}")
+            continue
+        t0 = time.perf_counter()
+        arch = open_archive(str(path))
+        layout = IMAGE_MEMBERS if name in IMAGE_ZIPS else LABEL_MEMBERS
+        seqs = arch.sequences(layout)
+        print(f" {name}: {len(arch.entries)} members, {len(seqs)} sequences "
+              f"(index ready in {(time.perf_counter() - t0) * 1000:.0f} ms)")
+        if name in IMAGE_ZIPS:
+            print("   " + ", ".join(f"{s}: {n}" for s, n in seqs.items()))
+
+    if args.seq is None:
+        return
+    frames = list_frames(args.seq, args.root)[:args.frames]
+    print(f"\n seq-{args.seq}: reading {len(frames)} frames from {str(frames[0]).split('!')[0]}")
+    print(f" {'workers':>7} | {'frames/s':>8} | {'MB/s':>7} | {'ms/frame':>8}")
+    for workers in args.workers:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(workers) as pool:
+            images = list(pool.map(read_image, frames))
+        seconds = time.perf_counter() - t0
+        mb = sum(img.nbytes for img in images) / 1e6
+        print(f" {workers:>7d} | {len(images) / seconds:>8.1f} | {mb / seconds:>7.1f} | {seconds * 1000 / len(images):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
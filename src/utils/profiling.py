@@ -0,0 +1,203 @@
+# src/utils/profiling.py
+"""
+Lightweight per-stage latency profiler for the GhostDet pipeline.
+- Context-manager timers: `with prof.stage("infer"): ...` (perf_counter_ns).
+- Frame boundaries: `with prof.frame(): ...` or the `prof.next_frame()` loop hook.
+- Disabled profiler returns a shared no-op context → near-zero overhead.
+- Per-frame samples for every stage; end-of-run percentile table + end-to-end FPS.
+- Dump to JSON (summary + histograms + raw samples) or CSV (long format: stage, frame, ms).
+
+Control via environment (read by StageProfiler.from_env()):
+  GHOSTDET_PROFILE unset / 1   → enabled, summary printed at the end of the run
+  GHOSTDET_PROFILE=0           → disabled
+  GHOSTDET_PROFILE=json | csv  → enabled + dump to logs/profile/<run name>.<ext>
+  GHOSTDET_PROFILE=path.json   → enabled + dump to that file (.json or .csv)
+"""
+
+import contextlib
+import csv
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+_NULL = contextlib.nullcontext()
+
+PROFILE_DIR = Path("logs/profile")
+
+# Histogram bin edges (ms), log-spaced 0.01 ms → 10 s
+HIST_EDGES_MS = np.logspace(-2, 4, 25)
+
+
+class _StageTimer:
+    __slots__ = ("prof", "name", "t0")
+
+    def __init__(self, prof: "StageProfiler", name: str):
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.prof.record(self.name, (time.perf_counter_ns() - self.t0) / 1e6)
+        return False
+
+
+class _FrameTimer:
+    __slots__ = ("prof", "t0")
+
+    def __init__(self, prof: "StageProfiler"):
+        self.prof = prof
+
+    def __enter__(self):
+        prof = self.prof
+        prof.frame_idx += 1
+        self.t0 = time.perf_counter_ns()
+        if prof._t_first is None:
+            prof._t_first = self.t0
+        return self
+
+    def __exit__(self, *exc):
+        prof = self.prof
+        prof._t_last = time.perf_counter_ns()
+        prof.record(prof.FRAME, (prof._t_last - self.t0) / 1e6)
+        return False
+
+
+class StageProfiler:
+    """Collects per-frame stage latencies (ms)."""
+
+    FRAME = "frame"  # end-to-end stage name
+
+    def __init__(self, enabled: bool = True, dump_path: Optional[Path] = None, name: str = "run"):
+        self.enabled = enabled
+        self.dump_path = Path(dump_path) if dump_path else None
+        self.name = name
+        self.samples: Dict[str, List[tuple]] = {}
+        self.frame_idx = -1
+        self._t_first = None
+        self._t_last = None
+        self._t_open = None   # start of the frame opened by next_frame()
+
+    @classmethod
+    def from_env(cls, name: str = "run", var: str = "GHOSTDET_PROFILE") -> "StageProfiler":
+        value = os.environ.get(var, "1").strip()
+        if value.lower() in ("0", "off", "false", "no"):
+            return cls(enabled=False, name=name)
+        if value.lower() in ("json", "csv"):
+            dump = PROFILE_DIR / f"{name}.{value.lower()}"
+        else:
+            dump = value if value.lower().endswith((".json", ".csv")) else None
+        return cls(enabled=True, dump_path=dump, name=name)
+
+    # ── Recording ────────────────────────────────────────────
+    def stage(self, name: str):
+        """Time a block as one sample of `name` for the current frame."""
+        if not self.enabled:
+            return _NULL
+        return _StageTimer(self, name)
+
+    def frame(self):
+        """End-to-end timer for one frame; advances the frame index."""
+        if not self.enabled:
+            return _NULL
+        return _FrameTimer(self)
+
+    def next_frame(self):
+        """
+        Loop hook (alternative to `with prof.frame()`): closes the previous frame
+        and starts timing the next one. Call at the top of the frame loop.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.end_frame(now)
+        if self._t_first is None:
+            self._t_first = now
+        self.frame_idx += 1
+        self._t_open = now
+
+    def end_frame(self, now: Optional[int] = None):
+        """Close the frame opened by next_frame() (called by report())."""
+        if self._t_open is None:
+            return
+        self._t_last = now or time.perf_counter_ns()
+        self.record(self.FRAME, (self._t_last - self._t_open) / 1e6)
+        self._t_open = None
+
+    def record(self, name: str, ms: float):
+        """Add an externally measured sample (e.g. Ultralytics Results.speed)."""
+        if self.enabled:
+            self.samples.setdefault(name, []).append((self.frame_idx, ms))
+
+    def fps(self) -> float:
+        """End-to-end frames per second so far (wall clock, first → last frame)."""
+        n = len(self.samples.get(self.FRAME, ()))
+        if not n or self._t_last is None:
+            return 0.0
+        return n / max((self._t_last - self._t_first) / 1e9, 1e-9)
+
+    # ── Reporting ────────────────────────────────────────────
+    def summary(self) -> Dict[str, dict]:
+        out = {}
+        for name, rows in self.samples.items():
+            ms = np.array([r[1] for r in rows])
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            out[name] = {
+                "n": int(len(ms)),
+                "mean": float(ms.mean()),
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+                "max": float(ms.max()),
+                "total_s": float(ms.sum() / 1000),
+            }
+        return out
+
+    def print_summary(self):
+        if not self.enabled or not self.samples:
+            return
+        stats = self.summary()
+        total = stats.get(self.FRAME, {}).get("total_s") or sum(s["total_s"] for s in stats.values())
+        print(f"\n=== Stage latency: {self.name} (ms) ===")
+        print(f"{'stage':<14} | {'n':>6} | {'mean':>8} | {'p50':>8} | {'p95':>8} | {'p99':>8} | {'max':>8} | {'share':>6}")
+        print("-" * 88)
+        for name, s in stats.items():
+            share = s["total_s"] / total * 100 if total and name != self.FRAME else 100.0
+            print(f"{name:<14} | {s['n']:>6d} | {s['mean']:>8.2f} | {s['p50']:>8.2f} | {s['p95']:>8.2f} | "
+                  f"{s['p99']:>8.2f} | {s['max']:>8.2f} | {share:>5.1f}%")
+        if self.FRAME in stats:
+            print(f"End-to-end: {stats[self.FRAME]['n']} frames → {self.fps():.2f} FPS")
+
+    def dump(self, path: Optional[Path] = None):
+        path = Path(path or self.dump_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".csv":
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["stage", "frame", "ms"])
+                for name, rows in self.samples.items():
+                    writer.writerows((name, fi, f"{ms:.4f}") for fi, ms in rows)
+        else:
+            stats = self.summary()
+            for name, rows in self.samples.items():
+                ms = np.array([r[1] for r in rows])
+                stats[name]["histogram"] = {
+                    "edges_ms": HIST_EDGES_MS.tolist(),
+                    "counts": np.histogram(ms, bins=HIST_EDGES_MS)[0].tolist(),
+                }
+                stats[name]["samples"] = rows
+            path.write_text(json.dumps({"name": self.name, "fps": self.fps(), "stages": stats}, indent=1))
+        print(f" Profile saved: {path}")
+
+    def report(self):
+        """Print the summary table and dump if a path was configured."""
+        self.end_frame()
+        self.print_summary()
+        if self.enabled and self.dump_path and self.samples:
+            self.dump()